@@ -0,0 +1,286 @@
+import time
+import weakref
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.run_config import RunConfig
+from google.adk.events import Event
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.tools import BaseTool
+from google.adk.tools.tool_context import ToolContext
+from google.genai.types import Content
+
+# Per-invocation accounting: tokens, time spent in model calls, tools and agents, and
+# the events emitted. AccountingRunner is a drop-in Runner that keeps an
+# InvocationAccount for every invocation it starts:
+#
+#   runner = AccountingRunner(agent=root_agent, app_name="App", session_service=...)
+#   async for event in runner.run_async(user_id=..., session_id=..., new_message=...):
+#       invocation_id = event.invocation_id
+#   print(runner.get_account(invocation_id).to_record())
+#
+# Token budgets complement RunConfig.max_llm_calls: with a budget set (on the runner,
+# or per run with ExtendedRunConfig.token_budget) a model call is refused with
+# TokenBudgetExceededError once the invocation has used that many tokens.
+#
+# The runner adds its callbacks in front of the existing ones on every agent in the
+# tree, so callbacks that answer for the model or a tool (like the caches in
+# llm_cache.py) are not counted as model or tool time. Agent times are inclusive: a
+# parent's time includes the sub-agents it ran.
+#
+# Agent trees are often module-level objects shared by several runners. The callbacks
+# are installed once per agent, however many AccountingRunners use it, and look the
+# invocation up among the accounts of every AccountingRunner: for invocations of a
+# plain Runner sharing the tree they find nothing and do nothing. run_async marks the
+# run it starts, and the first agent callback of the invocation opens its account.
+
+
+class TokenBudgetExceededError(Exception):
+    """Raised when an invocation has used up its token budget."""
+
+
+@dataclass
+class InvocationAccount:
+    invocation_id: str
+    app_name: str
+    user_id: str
+    session_id: str
+    root_agent: str
+    token_budget: Optional[int] = None
+    started_at: float = field(default_factory=time.time)
+    wall_ms: float = 0.0
+    finished: bool = False
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    total_tokens: int = 0
+    model_calls: int = 0
+    model_errors: int = 0
+    model_ms: float = 0.0
+    events: int = 0
+    partial_events: int = 0
+    # Breakdowns by agent and tool name.
+    model_ms_by_agent: dict[str, float] = field(default_factory=dict)
+    tokens_by_agent: dict[str, int] = field(default_factory=dict)
+    tool_calls: dict[str, int] = field(default_factory=dict)
+    tool_ms: dict[str, float] = field(default_factory=dict)
+    agent_ms: dict[str, float] = field(default_factory=dict)
+    events_by_author: dict[str, int] = field(default_factory=dict)
+    # Start times of model calls, tool calls and agents still running.
+    _started: dict[tuple[str, str], float] = field(default_factory=dict, repr=False)
+
+    def to_record(self) -> dict[str, Any]:
+        """Returns the account as a flat, JSON-ready metrics record."""
+        return {
+            "invocation_id": self.invocation_id,
+            "app_name": self.app_name,
+            "user_id": self.user_id,
+            "session_id": self.session_id,
+            "root_agent": self.root_agent,
+            "started_at": round(self.started_at, 3),
+            "wall_ms": round(self.wall_ms, 2),
+            "finished": self.finished,
+            "token_budget": self.token_budget,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "total_tokens": self.total_tokens,
+            "model_calls": self.model_calls,
+            "model_errors": self.model_errors,
+            "model_ms": round(self.model_ms, 2),
+            "events": self.events,
+            "partial_events": self.partial_events,
+            "model_ms_by_agent": {k: round(v, 2) for k, v in self.model_ms_by_agent.items()},
+            "tokens_by_agent": dict(self.tokens_by_agent),
+            "tool_calls": dict(self.tool_calls),
+            "tool_ms": {k: round(v, 2) for k, v in self.tool_ms.items()},
+            "agent_ms": {k: round(v, 2) for k, v in self.agent_ms.items()},
+            "events_by_author": dict(self.events_by_author),
+        }
+
+
+def _elapsed_ms(started: Optional[float]) -> float:
+    return (time.perf_counter() - started) * 1000 if started is not None else 0.0
+
+
+# invocation_id -> account, for the invocations of every AccountingRunner. An account
+# drops out when its runner no longer keeps it.
+_live_accounts: "weakref.WeakValueDictionary[str, InvocationAccount]" = weakref.WeakValueDictionary()
+# The AccountingRunner run starting in this context, as (runner, user_id, session_id,
+# token_budget), until the first agent callback of its invocation opens the account.
+# Runner has no public hook that sees the invocation id before the agent runs.
+_starting: ContextVar[Optional[tuple]] = ContextVar("accounting_starting", default=None)
+
+
+class AccountingRunner(Runner):
+    """Runner that records an InvocationAccount for each invocation."""
+
+    def __init__(self, *, token_budget: Optional[int] = None, max_accounts: int = 10_000, **kwargs):
+        super().__init__(**kwargs)
+        self.token_budget = token_budget
+        self.max_accounts = max_accounts
+        self._accounts: "OrderedDict[str, InvocationAccount]" = OrderedDict()
+        self._instrument(self.agent)
+
+    def get_account(self, invocation_id: str) -> Optional[InvocationAccount]:
+        return self._accounts.get(invocation_id)
+
+    def latest_account(self, session_id: str) -> Optional[InvocationAccount]:
+        """The most recently started invocation of a session."""
+        for account in reversed(self._accounts.values()):
+            if account.session_id == session_id:
+                return account
+        return None
+
+    def accounts(self) -> list[InvocationAccount]:
+        return list(self._accounts.values())
+
+    def _open_account(
+        self, invocation_id: str, user_id: str, session_id: str, token_budget: Optional[int]
+    ) -> InvocationAccount:
+        account = self._accounts[invocation_id] = _live_accounts[invocation_id] = InvocationAccount(
+            invocation_id=invocation_id,
+            app_name=self.app_name,
+            user_id=user_id,
+            session_id=session_id,
+            root_agent=self.agent.name,
+            token_budget=token_budget,
+        )
+        while len(self._accounts) > self.max_accounts:
+            self._accounts.popitem(last=False)
+        return account
+
+    async def run_async(
+        self,
+        *,
+        user_id: str,
+        session_id: str,
+        new_message: Content,
+        run_config: RunConfig = RunConfig(),
+    ) -> AsyncGenerator[Event, None]:
+        start = time.perf_counter()
+        account: Optional[InvocationAccount] = None
+        budget = getattr(run_config, "token_budget", None) or self.token_budget
+        _starting.set((self, user_id, session_id, budget))
+        try:
+            async for event in super().run_async(
+                user_id=user_id, session_id=session_id, new_message=new_message, run_config=run_config
+            ):
+                if account is None:
+                    account = self._accounts.get(event.invocation_id)
+                if account is not None:
+                    account.events += 1
+                    account.partial_events += bool(event.partial)
+                    account.events_by_author[event.author] = account.events_by_author.get(event.author, 0) + 1
+                yield event
+        finally:
+            _starting.set(None)
+            if account is not None:
+                account.wall_ms = _elapsed_ms(start)
+                account.finished = True
+                account._started.clear()
+
+    def _instrument(self, agent: BaseAgent):
+        # Once per agent: the callbacks serve every AccountingRunner.
+        if _before_agent not in agent.canonical_before_agent_callbacks:
+            agent.before_agent_callback = [_before_agent, *agent.canonical_before_agent_callbacks]
+            agent.after_agent_callback = [_after_agent, *agent.canonical_after_agent_callbacks]
+            if isinstance(agent, LlmAgent):
+                agent.before_model_callback = [_before_model, *agent.canonical_before_model_callbacks]
+                agent.after_model_callback = [_after_model, *agent.canonical_after_model_callbacks]
+                agent.before_tool_callback = [_before_tool, *agent.canonical_before_tool_callbacks]
+                agent.after_tool_callback = [_after_tool, *agent.canonical_after_tool_callbacks]
+        for sub_agent in agent.sub_agents:
+            self._instrument(sub_agent)
+
+
+# --- Callbacks ---
+
+def _account(invocation_id: str) -> Optional[InvocationAccount]:
+    account = _live_accounts.get(invocation_id)
+    starting = _starting.get()
+    if account is None and starting is not None:
+        # Taken once, so runs nested in this one (e.g. by AgentTool) are not accounted to it.
+        _starting.set(None)
+        runner, user_id, session_id, token_budget = starting
+        account = runner._open_account(invocation_id, user_id, session_id, token_budget)
+    return account
+
+
+def _before_agent(callback_context: CallbackContext) -> Optional[Content]:
+    account = _account(callback_context.invocation_id)
+    if account is not None:
+        account._started[("agent", callback_context.agent_name)] = time.perf_counter()
+    return None
+
+
+def _after_agent(callback_context: CallbackContext) -> Optional[Content]:
+    account = _live_accounts.get(callback_context.invocation_id)
+    if account is not None:
+        name = callback_context.agent_name
+        elapsed = _elapsed_ms(account._started.pop(("agent", name), None))
+        account.agent_ms[name] = account.agent_ms.get(name, 0.0) + elapsed
+    return None
+
+
+def _before_model(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    account = _live_accounts.get(callback_context.invocation_id)
+    if account is None:
+        return None
+    if account.token_budget is not None and account.total_tokens >= account.token_budget:
+        raise TokenBudgetExceededError(
+            f"Token budget of {account.token_budget} exceeded: invocation"
+            f" {account.invocation_id} has used {account.total_tokens} tokens."
+        )
+    account._started[("model", callback_context.agent_name)] = time.perf_counter()
+    return None
+
+
+def _after_model(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    # Streaming chunks arrive here too; the call ends with the final response.
+    if llm_response.partial:
+        return None
+    account = _live_accounts.get(callback_context.invocation_id)
+    if account is None:
+        return None
+    name = callback_context.agent_name
+    elapsed = _elapsed_ms(account._started.pop(("model", name), None))
+    account.model_calls += 1
+    account.model_errors += bool(llm_response.error_code)
+    account.model_ms += elapsed
+    account.model_ms_by_agent[name] = account.model_ms_by_agent.get(name, 0.0) + elapsed
+    usage = llm_response.usage_metadata
+    if usage is not None:
+        prompt = usage.prompt_token_count or 0
+        completion = usage.candidates_token_count or 0
+        total = usage.total_token_count or prompt + completion
+        account.prompt_tokens += prompt
+        account.completion_tokens += completion
+        account.cached_tokens += usage.cached_content_token_count or 0
+        account.total_tokens += total
+        account.tokens_by_agent[name] = account.tokens_by_agent.get(name, 0) + total
+    return None
+
+
+def _before_tool(tool: BaseTool, args: dict[str, Any], tool_context: ToolContext) -> Optional[dict]:
+    account = _live_accounts.get(tool_context.invocation_id)
+    if account is not None:
+        account._started[("tool", tool_context.function_call_id or tool.name)] = time.perf_counter()
+    return None
+
+
+def _after_tool(
+    tool: BaseTool, args: dict[str, Any], tool_context: ToolContext, tool_response: Any
+) -> Optional[dict]:
+    account = _live_accounts.get(tool_context.invocation_id)
+    if account is not None:
+        elapsed = _elapsed_ms(account._started.pop(("tool", tool_context.function_call_id or tool.name), None))
+        account.tool_calls[tool.name] = account.tool_calls.get(tool.name, 0) + 1
+        account.tool_ms[tool.name] = account.tool_ms.get(tool.name, 0.0) + elapsed
+    return None
@@ -0,0 +1,141 @@
+import importlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
+
+if TYPE_CHECKING:
+    from google.adk.agents import BaseAgent
+
+# A registry of root agents that are declared up front but only built on first use.
+#
+# Most chapter modules build their agents (and toolsets, code executors, model clients)
+# at import time, so importing a package that re-exports `root_agent` pays for all of
+# it. A server or serverless function that hosts many agents should only pay for the
+# one a request needs:
+#
+#   agent_registry.register("spotify", "building_intelligent_agents.chapter7.spotify_agent:spotify_agent")
+#   agent_registry.register("container", build_container_agent)  # any zero-argument factory
+#   agent = agent_registry.get("spotify")  # imports and builds on first call, then cached
+#
+# A target is either a callable or a "module:attribute" path. A path is imported on
+# first use; if the attribute is itself a factory rather than an agent, it is called.
+# Packages can expose a lazy `root_agent` for `adk web` / `adk run` with:
+#
+#   __getattr__ = agent_registry.module_getattr(root_agent="chapter1")
+#
+# This module deliberately imports nothing from ADK, so declaring agents is free.
+
+AgentTarget = Union[str, Callable[[], Optional["BaseAgent"]]]
+
+
+@dataclass
+class _Entry:
+    target: AgentTarget
+    agent: Optional["BaseAgent"] = None
+    built: bool = False
+    build_ms: Optional[float] = None
+
+
+class AgentRegistry:
+    """Root agents declared by factory or import path and built once, on first use."""
+
+    def __init__(self):
+        self._entries: dict[str, _Entry] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, target: AgentTarget, replace: bool = False):
+        """
+        Declares an agent without building it.
+
+        :param name: The name the agent is looked up by.
+        :param target: A zero-argument factory, or a "module:attribute" path.
+        :param replace: Allow replacing an existing declaration (and drop its built agent).
+        """
+        if isinstance(target, str) and ":" not in target:
+            raise ValueError(f"Agent target '{target}' must be a callable or a 'module:attribute' path.")
+        with self._lock:
+            if name in self._entries and not replace:
+                raise ValueError(f"Agent '{name}' is already registered.")
+            self._entries[name] = _Entry(target=target)
+
+    def factory(self, name: str) -> Callable:
+        """Decorator form of `register` for factory functions."""
+        def _decorator(fn: Callable[[], Optional["BaseAgent"]]):
+            self.register(name, fn)
+            return fn
+        return _decorator
+
+    def get(self, name: str) -> Optional["BaseAgent"]:
+        """Returns the agent, building it on the first call. Factories may return None."""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                raise KeyError(f"No agent registered as '{name}'. Known agents: {', '.join(self.names())}.")
+            if not entry.built:
+                start = time.perf_counter()
+                entry.agent = _resolve(entry.target)
+                entry.build_ms = (time.perf_counter() - start) * 1000
+                entry.built = True
+            return entry.agent
+
+    def is_built(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        return entry is not None and entry.built
+
+    def names(self) -> list[str]:
+        return sorted(self._entries)
+
+    def module_getattr(self, **attributes: str) -> Callable[[str], Any]:
+        """
+        A module-level `__getattr__` (PEP 562) that resolves the given attributes lazily.
+
+        `module_getattr(root_agent="chapter1")` makes `package.root_agent` build the
+        agent registered as "chapter1" when it is first accessed.
+        """
+        def __getattr__(attribute: str) -> Any:
+            if attribute in attributes:
+                return self.get(attributes[attribute])
+            raise AttributeError(f"module has no attribute '{attribute}'")
+        return __getattr__
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                name: {"built": entry.built, "build_ms": round(entry.build_ms, 2) if entry.build_ms is not None else None}
+                for name, entry in sorted(self._entries.items())
+            }
+
+
+def _resolve(target: AgentTarget) -> Optional["BaseAgent"]:
+    if callable(target):
+        return target()
+    module_name, _, attribute = target.partition(":")
+    value = getattr(importlib.import_module(module_name), attribute)
+    # Imported lazily as well, so only resolving an agent pays for importing ADK.
+    from google.adk.agents import BaseAgent
+
+    if value is None or isinstance(value, BaseAgent):
+        return value
+    if callable(value):
+        return value()
+    raise TypeError(f"'{target}' is neither an agent nor an agent factory.")
+
+
+agent_registry = AgentRegistry()
+
+# The root agents the chapter packages expose to `adk web` / `adk run`.
+_BOOK_AGENTS = {
+    "chapter1": "chapter1.simple_assistant:simple_assistant_agent",
+    "chapter7": "chapter7.calendar_agent:calendar_agent",
+    "chapter7.spotify": "chapter7.spotify_agent:spotify_agent",
+    "chapter8.mcp_filesystem": "chapter8.mcp_filesystem_agent:mcp_agent",
+    "chapter9.container": "chapter9.container_executor_agent:build_container_agent",
+    "chapter10.self_hosted": "chapter10.litellm_self_hosted_agent:build_self_hosted_agent",
+    "chapter14": "chapter14.langgraph_integration:orchestrator",
+    "chapter17": "chapter17.scoped_state_demo:state_demo_agent",
+    "chapter20": "chapter20.eval_agent:root_agent",
+    "chapter21.echo": "chapter21.my_simple_echo_agent.agent:root_agent",
+}
+for _name, _target in _BOOK_AGENTS.items():
+    agent_registry.register(_name, f"building_intelligent_agents.{_target}")
@@ -0,0 +1,3 @@
+# Benchmarks for the shared runtime helpers in building_intelligent_agents.
+# Each module is runnable on its own, e.g.:
+#   python -m building_intelligent_agents.benchmarks.session_provisioning
@@ -0,0 +1,85 @@
+import argparse
+import threading
+import time
+from typing import Callable
+
+from google.adk.agents import Agent
+from google.adk.runners import InMemoryRunner
+from google.genai.types import Content, Part
+
+from building_intelligent_agents.fake_llm import FakeLlm
+from building_intelligent_agents.utils import (
+    AgentHost,
+    SessionSpec,
+    create_sessions_bulk_sync,
+)
+
+# Throughput of synchronous callers driving an agent through `Runner.run` (one thread
+# and one event loop per call) versus a shared `AgentHost` loop. The offline FakeLlm
+# answers without delay, so the numbers reflect the sync-to-async bridge only.
+
+bench_agent = Agent(
+    name="host_bench_agent",
+    model=FakeLlm(model="fake", ttft_ms=0, tokens_per_sec=0, response_tokens=4),
+    instruction="Reply briefly.",
+)
+
+
+def _drive(callers: int, turns: int, run_turn: Callable[[str, str], None]) -> float:
+    def _caller(index: int):
+        for _ in range(turns):
+            run_turn(f"user_{index}", f"session_{index}")
+
+    threads = [threading.Thread(target=_caller, args=(i,)) for i in range(callers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return callers * turns / (time.perf_counter() - start)
+
+
+def _new_runner(callers: int) -> InMemoryRunner:
+    runner = InMemoryRunner(agent=bench_agent, app_name="HostBench")
+    specs = [SessionSpec(user_id=f"user_{i}", session_id=f"session_{i}") for i in range(callers)]
+    create_sessions_bulk_sync(runner, specs)
+    return runner
+
+
+def bench_runner_run(callers: int, turns: int) -> float:
+    runner = _new_runner(callers)
+    message = Content(role="user", parts=[Part(text="ping")])
+
+    def _turn(user_id: str, session_id: str):
+        for _ in runner.run(user_id=user_id, session_id=session_id, new_message=message):
+            pass
+
+    return _drive(callers, turns, _turn)
+
+
+def bench_agent_host(host: AgentHost, callers: int, turns: int) -> float:
+    runner = _new_runner(callers)
+    message = Content(role="user", parts=[Part(text="ping")])
+
+    def _turn(user_id: str, session_id: str):
+        for _ in host.run(runner, user_id=user_id, session_id=session_id, new_message=message):
+            pass
+
+    return _drive(callers, turns, _turn)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AgentHost vs Runner.run throughput benchmark.")
+    parser.add_argument("--turns", type=int, default=50, help="Turns per caller thread.")
+    parser.add_argument("--callers", type=int, nargs="+", default=[1, 8, 64])
+    args = parser.parse_args()
+
+    host = AgentHost()
+    try:
+        print(f"{'callers':>8} {'Runner.run turns/s':>20} {'AgentHost turns/s':>20} {'speedup':>8}")
+        for callers in args.callers:
+            baseline = bench_runner_run(callers, args.turns)
+            hosted = bench_agent_host(host, callers, args.turns)
+            print(f"{callers:>8} {baseline:>20.0f} {hosted:>20.0f} {hosted / baseline:>7.1f}x")
+    finally:
+        host.shutdown()
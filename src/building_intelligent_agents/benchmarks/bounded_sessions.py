@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import BaseSessionService, InMemorySessionService
+from google.genai.types import Content, Part
+
+from building_intelligent_agents.sessions import BoundedInMemorySessionService
+
+# Memory held by a session service after many visitors each start a session, take a
+# couple of turns and leave, for the stock InMemorySessionService and for
+# BoundedInMemorySessionService with a memory cap; plus what reading a session back
+# from the spill directory costs compared to a resident one.
+
+APP = "VisitorBench"
+
+
+async def _visit(service: BaseSessionService, visitor: int, turns: int):
+    session = await service.create_session(app_name=APP, user_id=f"visitor_{visitor}")
+    for turn in range(turns):
+        for author, text in (("user", "Where is my order? " * 4), ("support_agent", "Let me look that up. " * 40)):
+            await service.append_event(
+                session,
+                Event(
+                    invocation_id=f"inv_{turn}",
+                    author=author,
+                    content=Content(role="user" if author == "user" else "model", parts=[Part(text=text)]),
+                    actions=EventActions(state_delta={"turns": turn + 1}),
+                ),
+            )
+    # Only the key: the visitor has left, and nothing else should keep the session alive.
+    return session.user_id, session.id, len(session.events)
+
+
+async def _time_read_ms(service: BaseSessionService, visit: tuple[str, str, int]) -> float:
+    user_id, session_id, events = visit
+    start = time.perf_counter()
+    fetched = await service.get_session(app_name=APP, user_id=user_id, session_id=session_id)
+    assert fetched is not None and len(fetched.events) == events
+    return (time.perf_counter() - start) * 1000
+
+
+async def _measure(service: BaseSessionService, visitors: int, turns: int) -> tuple[float, float, float, float]:
+    """(seconds to serve all visitors, MiB held, ms to read the newest, ms to read the oldest session)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    visits = [await _visit(service, i, turns) for i in range(visitors)]
+    elapsed = time.perf_counter() - start
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # The newest visitor's session is resident; the first one has been spilled (if capped).
+    newest = await _time_read_ms(service, visits[-1])
+    oldest = await _time_read_ms(service, visits[0])
+    return elapsed, held / 2**20, newest, oldest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory held by abandoned sessions, with and without a cap.")
+    parser.add_argument("--visitors", type=int, default=5000)
+    parser.add_argument("--turns", type=int, default=2)
+    parser.add_argument("--max-mib", type=float, default=4.0, help="Memory cap of the bounded service.")
+    args = parser.parse_args()
+
+    bounded = BoundedInMemorySessionService(max_bytes=int(args.max_mib * 2**20))
+    services = {"stock": InMemorySessionService(), f"bounded {args.max_mib:g} MiB": bounded}
+    print(f"{args.visitors} visitors, {args.turns} turns each")
+    print(f"{'service':<18} {'seconds':>8} {'MiB held':>9} {'read newest ms':>15} {'read oldest ms':>15}")
+    for name, service in services.items():
+        elapsed, mib, newest, oldest = asyncio.run(_measure(service, args.visitors, args.turns))
+        print(f"{name:<18} {elapsed:>8.2f} {mib:>9.1f} {newest:>15.3f} {oldest:>15.3f}")
+    print(f"bounded: {bounded.stats()}")
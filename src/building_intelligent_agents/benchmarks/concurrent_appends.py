@@ -0,0 +1,109 @@
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import BaseSessionService, InMemorySessionService
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.genai.types import Content, Part
+
+from building_intelligent_agents.sessions import (
+    FakeRedis,
+    RedisSessionService,
+    ShardedInMemorySessionService,
+    SqliteSessionService,
+)
+
+# Stress test for concurrent appends to one session, as when the beverage assistant of
+# chapter 6 gets the user's get_user_choice answer while another message for the same
+# session is still being handled. Each writer repeatedly reads the session, "runs"
+# for a moment, and appends an event that sets its own key and, for a share of the
+# turns, increments a counter every writer shares (read-modify-write on its copy).
+# A writer whose append is refused reads the session again and redoes the turn.
+#
+# Afterwards the session must hold every event, every writer's last value, and a counter
+# equal to the number of increments appended; "lost" counts what is missing. With
+# on_conflict="merge" only the appends that touched the counter concurrently are
+# redone; with "reject", every append from a copy another writer got ahead of is.
+
+APP = "ConcurrencyBench"
+# Writers need the state, not the history; this keeps reads from dominating the run.
+_LAST_EVENT = GetSessionConfig(num_recent_events=1)
+
+
+async def _stress(
+    service: BaseSessionService, writers: int, turns: int, shared: float, think_ms: float
+) -> dict[str, float]:
+    session = await service.create_session(app_name=APP, user_id="user_0", state={"orders": 0})
+    rng = random.Random(0)
+    retries = 0
+    increments = 0
+
+    async def writer(w: int):
+        nonlocal retries, increments
+        for turn in range(turns):
+            increment = rng.random() < shared
+            while True:
+                copy = await service.get_session(
+                    app_name=APP, user_id="user_0", session_id=session.id, config=_LAST_EVENT
+                )
+                await asyncio.sleep(rng.random() * think_ms / 1000)
+                delta = {f"writer_{w}": turn}
+                if increment:
+                    delta["orders"] = copy.state["orders"] + 1
+                event = Event(
+                    invocation_id=f"inv_{w}_{turn}",
+                    author="beverage_assistant",
+                    content=Content(role="model", parts=[Part(text="You chose coffee! Excellent!")]),
+                    actions=EventActions(state_delta=delta),
+                )
+                try:
+                    await service.append_event(copy, event)
+                    break
+                except ValueError:
+                    retries += 1
+            increments += increment
+
+    start = time.perf_counter()
+    await asyncio.gather(*(writer(w) for w in range(writers)))
+    elapsed = time.perf_counter() - start
+    stored = await service.get_session(app_name=APP, user_id="user_0", session_id=session.id)
+    total = writers * turns
+    return {
+        "appends/s": total / elapsed,
+        "retries": retries,
+        "lost events": total - len(stored.events),
+        "lost writes": sum(stored.state.get(f"writer_{w}") != turns - 1 for w in range(writers)),
+        "lost increments": increments - stored.state["orders"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent appends to one session, per service and policy.")
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--turns", type=int, default=50, help="Appends per writer.")
+    parser.add_argument("--shared", type=float, default=0.1, help="Share of turns that increment the shared counter.")
+    parser.add_argument("--think-ms", type=float, default=2.0, help="Most time between reading and appending.")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="adk-concurrency-")
+    factories = {
+        ("InMemorySessionService", "-"): lambda: InMemorySessionService(),
+        ("ShardedInMemory", "reject"): lambda: ShardedInMemorySessionService(on_conflict="reject"),
+        ("ShardedInMemory", "merge"): lambda: ShardedInMemorySessionService(on_conflict="merge"),
+        ("SqliteSessionService", "reject"): lambda: SqliteSessionService(f"{directory}/reject.db", on_conflict="reject"),
+        ("SqliteSessionService", "merge"): lambda: SqliteSessionService(f"{directory}/merge.db", on_conflict="merge"),
+        ("RedisSessionService", "reject"): lambda: RedisSessionService(FakeRedis(latency=0.0002), on_conflict="reject"),
+        ("RedisSessionService", "merge"): lambda: RedisSessionService(FakeRedis(latency=0.0002), on_conflict="merge"),
+    }
+    print(
+        f"{args.writers} writers x {args.turns} appends to one session,"
+        f" {args.shared:.0%} incrementing a shared counter, up to {args.think_ms} ms between read and append"
+    )
+    columns = ["appends/s", "retries", "lost events", "lost writes", "lost increments"]
+    print(f"{'service':<24} {'policy':<7} " + " ".join(f"{c:>15}" for c in columns))
+    for (name, policy), factory in factories.items():
+        row = asyncio.run(_stress(factory(), args.writers, args.turns, args.shared, args.think_ms))
+        print(f"{name:<24} {policy:<7} " + " ".join(f"{row[c]:>15.0f}" for c in columns))
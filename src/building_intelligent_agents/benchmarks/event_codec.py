@@ -0,0 +1,153 @@
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Callable
+
+from google.adk.events import Event, EventActions
+from google.genai.types import Content, FunctionCall, FunctionResponse, Part
+
+from building_intelligent_agents.sessions import (
+    BinaryEventCodec,
+    JsonEventCodec,
+    SessionReadConfig,
+    SqliteSessionService,
+    decode_event,
+)
+
+# Storage size and load latency of JsonEventCodec and BinaryEventCodec on sessions
+# shaped like those of the chapter agents: chapter7's petstore agent (OpenAPI tool calls
+# whose responses are lists of Pet objects), chapter13's loop refinement (drafts, a
+# quality-check tool and state deltas), and a plain chat. For each: total encoded size,
+# time to decode every event, time to peek at every event (authors and timestamps, as a
+# session list or tail view needs), and get_session / peek_events of the last 50 events
+# through SqliteSessionService.
+
+APP = "CodecBench"
+
+
+def _petstore_turn(i: int) -> list[Event]:
+    pets = {
+        "pets": [
+            {
+                "id": i * 100 + j,
+                "name": f"doggie-{j}",
+                "category": {"id": 1, "name": "Dogs"},
+                "photoUrls": [f"https://petstore3.swagger.io/photos/{i}/{j}.jpg"],
+                "tags": [{"id": j % 5, "name": ["friendly", "playful", "calm", "small", "large"][j % 5]}],
+                "status": "available",
+            }
+            for j in range(15)
+        ]
+    }
+    return [
+        Event(author="user", invocation_id=f"inv_{i}", content=Content(role="user", parts=[Part(text="Which pets are available?")])),
+        Event(
+            author="petstore_agent", invocation_id=f"inv_{i}",
+            content=Content(role="model", parts=[Part(function_call=FunctionCall(name="findPetsByStatus", args={"status": "available"}))]),
+        ),
+        Event(
+            author="petstore_agent", invocation_id=f"inv_{i}",
+            content=Content(role="user", parts=[Part(function_response=FunctionResponse(name="findPetsByStatus", response=pets))]),
+        ),
+        Event(
+            author="petstore_agent", invocation_id=f"inv_{i}",
+            content=Content(role="model", parts=[Part(text="There are 15 available dogs, including " + ", ".join(p["name"] for p in pets["pets"]) + ".")]),
+        ),
+    ]
+
+
+def _loop_refinement_turn(i: int) -> list[Event]:
+    draft = "ADK is a toolkit for building, evaluating and deploying agents. " * (4 + i % 6)
+    return [
+        Event(
+            author="draft_refiner", invocation_id=f"inv_{i}",
+            content=Content(role="model", parts=[Part(function_call=FunctionCall(name="check_draft_quality", args={"draft": draft}))]),
+        ),
+        Event(
+            author="draft_refiner", invocation_id=f"inv_{i}",
+            content=Content(role="user", parts=[Part(function_response=FunctionResponse(
+                name="check_draft_quality",
+                response={"quality": "poor", "feedback": "Needs more detail about ADK benefits.", "action": "refine"},
+            ))]),
+            actions=EventActions(state_delta={"loop_iteration": i, "current_draft": draft}),
+        ),
+    ]
+
+
+def _chat_turn(i: int) -> list[Event]:
+    return [
+        Event(author="user", invocation_id=f"inv_{i}", content=Content(role="user", parts=[Part(text=f"Question {i}: what is the capital of France?")])),
+        Event(author="assistant", invocation_id=f"inv_{i}", content=Content(role="model", parts=[Part(text="The capital of France is Paris.")])),
+    ]
+
+
+PROFILES: dict[str, Callable[[int], list[Event]]] = {
+    "chapter7 petstore": _petstore_turn,
+    "chapter13 loop": _loop_refinement_turn,
+    "chat": _chat_turn,
+}
+
+
+def _session_events(profile: Callable[[int], list[Event]], count: int) -> list[Event]:
+    events = []
+    i = 0
+    while len(events) < count:
+        events += profile(i)
+        i += 1
+    return events[:count]
+
+
+def _time_ms(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+async def _sqlite_ms(path: str, codec, events: list[Event]) -> tuple[float, float, float]:
+    """(database MiB, best ms of 5 to get the last 50 events, and to peek at them)."""
+    service = SqliteSessionService(path, codec=codec)
+    session = await service.create_session(app_name=APP, user_id="u")
+    for event in events:
+        await service.append_event(session, event)
+    key = dict(app_name=APP, user_id="u", session_id=session.id, config=SessionReadConfig(num_recent_events=50))
+    get_ms = peek_ms = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        await service.get_session(**key)
+        get_ms = min(get_ms, (time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        await service.peek_events(**key)
+        peek_ms = min(peek_ms, (time.perf_counter() - start) * 1000)
+    service._writer.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    service.close()
+    return os.path.getsize(path) / 2**20, get_ms, peek_ms
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JSON vs binary event encoding: size and load latency.")
+    parser.add_argument("--events", type=int, default=1000, help="Events per session.")
+    args = parser.parse_args()
+
+    codecs = {"json": JsonEventCodec(), "binary": BinaryEventCodec()}
+    print(f"{args.events} events per session")
+    print(
+        f"{'session':<18} {'codec':<7} {'KiB':>8} {'encode ms':>10} {'decode ms':>10} {'peek ms':>8}"
+        f" {'db MiB':>7} {'get 50 ms':>10} {'peek 50 ms':>11}"
+    )
+    with tempfile.TemporaryDirectory() as workdir:
+        for profile_name, profile in PROFILES.items():
+            events = _session_events(profile, args.events)
+            for codec_name, codec in codecs.items():
+                encoded = []
+                encode_ms = _time_ms(lambda: encoded.extend(codec.encode(e) for e in events))
+                decode_ms = _time_ms(lambda: [decode_event(data) for data in encoded])
+                peek_ms = _time_ms(lambda: [(p["author"], p["timestamp"]) for p in map(codec.peek, encoded)])
+                assert decode_event(encoded[-1]) == events[-1]
+                db_path = os.path.join(workdir, f"{profile_name.split()[0]}_{codec_name}.db")
+                db_mib, get_ms, peek50_ms = asyncio.run(_sqlite_ms(db_path, codec, events))
+                print(
+                    f"{profile_name:<18} {codec_name:<7} {sum(map(len, encoded)) / 1024:>8.0f} {encode_ms:>10.1f}"
+                    f" {decode_ms:>10.1f} {peek_ms:>8.1f} {db_mib:>7.2f} {get_ms:>10.2f} {peek50_ms:>11.2f}"
+                )
@@ -0,0 +1,68 @@
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import BaseSessionService, DatabaseSessionService
+from google.genai.types import Content, Part
+
+from building_intelligent_agents.sessions import GroupCommitDatabaseSessionService
+
+# Events/sec appended to a SQLite DatabaseSessionService (the setup of
+# chapter16/custom_runner_setup.py) by N concurrent sessions, with the stock
+# per-event commit and with group commit at a few batch delays.
+
+APP = "GroupCommitBench"
+
+
+def _event(i: int) -> Event:
+    return Event(
+        invocation_id=f"inv_{i}",
+        author="assistant",
+        content=Content(role="model", parts=[Part(text=f"Reply number {i}. " * 8)]),
+        actions=EventActions(state_delta={"turns": i}),
+    )
+
+
+async def _measure(service: BaseSessionService, sessions: int, events_per_session: int) -> float:
+    created = [await service.create_session(app_name=APP, user_id=f"u_{i}") for i in range(sessions)]
+
+    async def _append_all(session):
+        for i in range(events_per_session):
+            await service.append_event(session, _event(i))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_append_all(s) for s in created))
+    elapsed = time.perf_counter() - start
+
+    # Everything the appends reported as written must be readable.
+    for s in created:
+        stored = await service.get_session(app_name=APP, user_id=s.user_id, session_id=s.id)
+        assert len(stored.events) == events_per_session and stored.state["turns"] == events_per_session - 1
+    return sessions * events_per_session / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Group commit vs per-event commit on SQLite.")
+    parser.add_argument("--events", type=int, default=2000, help="Events appended per run.")
+    parser.add_argument("--batch-size", type=int, default=128)
+    args = parser.parse_args()
+
+    delays = (1.0, 5.0, 20.0)
+    print(f"{args.events} events per run, events/sec (batch size {args.batch_size})")
+    print(f"{'sessions':>8} {'per-event':>10} " + " ".join(f"{f'group {d:g} ms':>13}" for d in delays))
+    with tempfile.TemporaryDirectory() as workdir:
+        for sessions in (1, 8, 32, 128):
+            per_session = max(1, args.events // sessions)
+            url = lambda name: f"sqlite:///{os.path.join(workdir, f'{name}_{sessions}.db')}"
+            row = [asyncio.run(_measure(DatabaseSessionService(db_url=url("stock")), sessions, per_session))]
+            for delay in delays:
+                service = GroupCommitDatabaseSessionService(
+                    db_url=url(f"group_{delay:g}"), max_batch_size=args.batch_size, max_batch_delay_ms=delay
+                )
+                row.append(asyncio.run(_measure(service, sessions, per_session)))
+                service.close()
+            print(f"{sessions:>8} " + " ".join(f"{rate:>{10 if i == 0 else 13}.0f}" for i, rate in enumerate(row)))
+        print(f"last run: {service.stats()}")
@@ -0,0 +1,80 @@
+import argparse
+import asyncio
+import statistics
+import time
+
+from google.adk.agents import Agent
+from google.adk.agents.run_config import RunConfig
+from google.adk.runners import InMemoryRunner
+from google.adk.tools import FunctionTool
+from google.genai.types import Content, Part
+
+from building_intelligent_agents.fake_llm import FakeLlm
+from building_intelligent_agents.history_compaction import HistoryCompactionConfig, HistoryCompactor
+from building_intelligent_agents.run_config import ExtendedRunConfig
+
+# Prompt tokens and turn latency over one long session, with and without history
+# compaction. Every turn calls a tool that returns a ~2 KB record, like the order and
+# profile lookups in the chapter examples. The offline model charges prompt
+# processing time per token, so a growing history shows up as growing latency.
+
+
+def lookup_order(order_id: str) -> dict:
+    """Looks up an order and returns its full record."""
+    return {
+        "order_id": order_id,
+        "status": "shipped",
+        "items": [{"sku": f"SKU-{i:04d}", "name": f"Item number {i}", "quantity": i % 3 + 1} for i in range(25)],
+    }
+
+
+def _make_agent(prefill_tokens_per_sec: float) -> Agent:
+    return Agent(
+        name="order_assistant",
+        model=FakeLlm(model="fake", ttft_ms=20, prefill_tokens_per_sec=prefill_tokens_per_sec),
+        instruction="Answer questions about the user's orders using the lookup tool.",
+        tools=[FunctionTool(func=lookup_order)],
+    )
+
+
+async def _run_session(agent: Agent, turns: int, run_config: RunConfig) -> tuple[list[int], list[float]]:
+    runner = InMemoryRunner(agent=agent, app_name="CompactionBench")
+    await runner.session_service.create_session(app_name="CompactionBench", user_id="u", session_id="s")
+    prompt_tokens, latencies = [], []
+    for turn in range(turns):
+        message = Content(role="user", parts=[Part(text=f"What is the status of order {turn}?")])
+        tokens = 0
+        start = time.perf_counter()
+        async for event in runner.run_async(user_id="u", session_id="s", new_message=message, run_config=run_config):
+            if event.usage_metadata and event.usage_metadata.prompt_token_count:
+                tokens += event.usage_metadata.prompt_token_count
+        latencies.append((time.perf_counter() - start) * 1000)
+        prompt_tokens.append(tokens)
+    return prompt_tokens, latencies
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="History compaction token/latency benchmark.")
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--keep-last-turns", type=int, default=4)
+    parser.add_argument("--prefill-tokens-per-sec", type=float, default=20_000)
+    args = parser.parse_args()
+
+    full_tokens, full_ms = asyncio.run(
+        _run_session(_make_agent(args.prefill_tokens_per_sec), args.turns, RunConfig())
+    )
+    # The compactor has no configuration of its own; the RunConfig enables it.
+    compactor = HistoryCompactor()
+    run_config = ExtendedRunConfig(history_compaction=HistoryCompactionConfig(keep_last_turns=args.keep_last_turns))
+    compact_tokens, compact_ms = asyncio.run(
+        _run_session(compactor.attach(_make_agent(args.prefill_tokens_per_sec)), args.turns, run_config)
+    )
+
+    print(f"{'turn':>5} {'full tokens':>12} {'compact tokens':>15} {'full ms':>9} {'compact ms':>11}")
+    for turn in sorted({1, 5, 10, args.turns // 2, args.turns}):
+        i = turn - 1
+        print(f"{turn:>5} {full_tokens[i]:>12} {compact_tokens[i]:>15} {full_ms[i]:>9.1f} {compact_ms[i]:>11.1f}")
+    saved = 1 - sum(compact_tokens) / sum(full_tokens)
+    print(f"total prompt tokens: {sum(full_tokens)} -> {sum(compact_tokens)} ({saved:.0%} saved)")
+    print(f"mean turn latency: {statistics.fmean(full_ms):.1f} ms -> {statistics.fmean(compact_ms):.1f} ms")
+    print(f"compactor stats: {compactor.stats()}")
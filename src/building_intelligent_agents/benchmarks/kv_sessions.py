@@ -0,0 +1,99 @@
+import argparse
+import asyncio
+import time
+
+from google.adk.events import Event, EventActions
+from google.genai.types import Content, Part
+
+from building_intelligent_agents.sessions.kv import FakeRedis, RedisSessionService
+
+# RedisSessionService against the in-process FakeRedis, with a simulated network round
+# trip: append and read throughput with many sessions active at once, the round trips
+# and commands each operation costs, and what happens when several writers append to
+# the same session concurrently (conflicts are detected, no append is lost silently).
+
+APP = "KVBench"
+
+
+def _event(i: int) -> Event:
+    return Event(
+        invocation_id=f"inv_{i}",
+        author="support_agent",
+        content=Content(role="model", parts=[Part(text="Let me look that up. " * 10)]),
+        actions=EventActions(state_delta={"turns": i, "user:last_seen": i}),
+    )
+
+
+async def _throughput(rtt_ms: float, sessions: int, appends: int) -> dict[str, float]:
+    client = FakeRedis(latency=rtt_ms / 1000)
+    service = RedisSessionService(client)
+    created = [await service.create_session(app_name=APP, user_id=f"user_{i}") for i in range(sessions)]
+
+    async def run(session):
+        for i in range(appends):
+            await service.append_event(session, _event(i))
+
+    round_trips, commands = client.round_trips, client.commands
+    start = time.perf_counter()
+    await asyncio.gather(*(run(session) for session in created))
+    append_seconds = time.perf_counter() - start
+    total = sessions * appends
+    append_rt, append_cmds = (client.round_trips - round_trips) / total, (client.commands - commands) / total
+
+    round_trips = client.round_trips
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(service.get_session(app_name=APP, user_id=s.user_id, session_id=s.id) for s in created)
+    )
+    read_seconds = time.perf_counter() - start
+    return {
+        "appends/s": total / append_seconds,
+        "RT/append": append_rt,
+        "cmds/append": append_cmds,
+        "reads/s": sessions / read_seconds,
+        "RT/read": (client.round_trips - round_trips) / sessions,
+    }
+
+
+async def _contention(rtt_ms: float, writers: int, rounds: int) -> tuple[int, int, int]:
+    """(appends that succeeded, conflicts, events stored) for writers racing on one session."""
+    service = RedisSessionService(FakeRedis(latency=rtt_ms / 1000))
+    session = await service.create_session(app_name=APP, user_id="shared")
+
+    async def writer(w: int) -> int:
+        done = 0
+        for i in range(rounds):
+            # Each writer re-reads its copy, as a worker handling the next message would.
+            copy = await service.get_session(app_name=APP, user_id="shared", session_id=session.id)
+            try:
+                await service.append_event(copy, _event(w * rounds + i))
+                done += 1
+            except ValueError:
+                pass
+        return done
+
+    succeeded = sum(await asyncio.gather(*(writer(w) for w in range(writers))))
+    stored = await service.get_session(app_name=APP, user_id="shared", session_id=session.id)
+    return succeeded, service.conflicts, len(stored.events)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="RedisSessionService throughput over FakeRedis.")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--appends", type=int, default=20, help="Appends per session.")
+    parser.add_argument("--rtt-ms", type=float, nargs="+", default=[0.0, 0.2, 1.0])
+    parser.add_argument("--writers", type=int, default=8, help="Concurrent writers in the contention test.")
+    args = parser.parse_args()
+
+    print(f"{args.sessions} sessions x {args.appends} appends, concurrently")
+    columns = ["appends/s", "RT/append", "cmds/append", "reads/s", "RT/read"]
+    print(f"{'RTT ms':>7} " + " ".join(f"{c:>12}" for c in columns))
+    for rtt_ms in args.rtt_ms:
+        row = asyncio.run(_throughput(rtt_ms, args.sessions, args.appends))
+        print(f"{rtt_ms:>7.1f} " + " ".join(f"{row[c]:>12.1f}" for c in columns))
+
+    print(f"\n{args.writers} writers x 25 appends racing on one session")
+    print(f"{'RTT ms':>7} {'succeeded':>10} {'conflicts':>10} {'stored':>7}")
+    for rtt_ms in args.rtt_ms:
+        succeeded, conflicts, stored = asyncio.run(_contention(rtt_ms, args.writers, 25))
+        print(f"{rtt_ms:>7.1f} {succeeded:>10} {conflicts:>10} {stored:>7}")
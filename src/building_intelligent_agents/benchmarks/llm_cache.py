@@ -0,0 +1,91 @@
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from google.adk.agents import Agent
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.adk.tools import FunctionTool
+from google.genai.types import Content, Part
+
+from building_intelligent_agents.fake_llm import FakeLlm
+from building_intelligent_agents.llm_cache import LlmResponseCache
+from building_intelligent_agents.utils import SessionSpec, create_sessions_bulk
+
+# Turn latency of a calculator-style FAQ agent with and without the LLM response
+# cache. The offline model is given a realistic time-to-first-token so the saving of
+# a skipped round-trip is visible.
+
+FAQ_PROMPTS = ["What is 5 plus 3?", "Calculate 10 divided by 2?", "What is 7 times 6?"]
+
+
+def simple_calculator(operand1: float, operand2: float, operation: str) -> float | str:
+    """Performs 'add', 'subtract', 'multiply' or 'divide' on two numbers."""
+    operations = {
+        "add": lambda: operand1 + operand2,
+        "subtract": lambda: operand1 - operand2,
+        "multiply": lambda: operand1 * operand2,
+        "divide": lambda: operand1 / operand2 if operand2 else "Error: Cannot divide by zero.",
+    }
+    return operations[operation]() if operation in operations else f"Error: Invalid operation '{operation}'."
+
+
+def _make_agent(ttft_ms: float) -> Agent:
+    return Agent(
+        name="math_wiz",
+        model=FakeLlm(model="fake", ttft_ms=ttft_ms, tokens_per_sec=200),
+        instruction="You are a helpful assistant that can perform basic calculations...",
+        tools=[FunctionTool(func=simple_calculator)],
+    )
+
+
+async def _measure(agent: Agent, users: int) -> list[float]:
+    runner = InMemoryRunner(agent=agent, app_name="CacheBench")
+    # A fresh session per question models FAQ traffic: many users, same first question.
+    specs = [SessionSpec(user_id=f"u_{i}", session_id=f"s_{i}_{p}") for i in range(users) for p in range(len(FAQ_PROMPTS))]
+    await create_sessions_bulk(runner, specs)
+    latencies = []
+    for spec in specs:
+        prompt = FAQ_PROMPTS[int(spec.session_id.rsplit("_", 1)[1])]
+        start = time.perf_counter()
+        async for _ in runner.run_async(
+            user_id=spec.user_id, session_id=spec.session_id,
+            new_message=Content(role="user", parts=[Part(text=prompt)]),
+        ):
+            pass
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LLM response cache latency benchmark.")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--ttft-ms", type=float, default=300.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, "llm_cache.db")
+        uncached = asyncio.run(_measure(_make_agent(args.ttft_ms), args.users))
+
+        cache = LlmResponseCache(max_bytes=8 * 1024 * 1024, ttl_seconds=3600, sqlite_path=db_path)
+        cached = asyncio.run(_measure(cache.attach(_make_agent(args.ttft_ms)), args.users))
+
+        # A new process would start with an empty memory tier but a warm SQLite tier.
+        restarted = LlmResponseCache(max_bytes=8 * 1024 * 1024, ttl_seconds=3600, sqlite_path=db_path)
+        from_disk = asyncio.run(_measure(restarted.attach(_make_agent(args.ttft_ms)), args.users))
+
+        cache.put("bench", LlmResponse(content=Content(role="model", parts=[Part(text="8")])))
+        start = time.perf_counter()
+        for _ in range(10_000):
+            cache.get("bench")
+        hit_us = (time.perf_counter() - start) / 10_000 * 1e6
+
+    print(f"{'mode':<12} {'turns':>6} {'p50 ms':>10} {'mean ms':>10}")
+    for label, values in (("uncached", uncached), ("cached", cached), ("warm disk", from_disk)):
+        print(f"{label:<12} {len(values):>6} {statistics.median(values):>10.2f} {statistics.fmean(values):>10.2f}")
+    print(f"in-memory cache hit lookup: {hit_us:.1f} us")
+    print(f"cache stats: {cache.stats()}")
+    print(f"restarted cache stats: {restarted.stats()}")
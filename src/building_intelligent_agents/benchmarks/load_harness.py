@@ -0,0 +1,272 @@
+import argparse
+import asyncio
+import contextlib
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.memory import InMemoryMemoryService
+from google.adk.sessions import InMemorySessionService
+from google.genai.types import Content, Part
+
+from building_intelligent_agents.accounting import AccountingRunner
+
+# Concurrent load harness for the chapter agents. It replaces the sequential
+# test_all.sh / test_allv2.sh runners for performance work: each target agent is
+# imported, N simulated users drive it concurrently through Runner.run_async against
+# the offline FakeLlm, and the results are written as stable, diffable JSON.
+#
+#   python -m building_intelligent_agents.benchmarks.load_harness --users 16 --output load.json
+#   python -m building_intelligent_agents.benchmarks.load_harness --compare load.json
+#
+# Every target runs in its own worker process so that peak RSS is attributable to
+# one agent. Workers are forked from a parent that has already imported ADK, so they
+# start in milliseconds; their peak RSS therefore includes that shared baseline.
+# Chapter modules read DEFAULT_LLM at import time, so the offline model is selected
+# before any of them is imported.
+
+DEFAULT_OFFLINE_LLM = "fake-gemini-2.0-flash"
+
+
+@dataclass(frozen=True)
+class LoadTarget:
+    """A chapter agent to load-test: where to import it from and what to send it."""
+    name: str
+    module: str
+    attribute: str
+    prompts: tuple[str, ...]
+
+
+TARGETS: tuple[LoadTarget, ...] = (
+    LoadTarget("simple_assistant", "chapter1.simple_assistant", "simple_assistant_agent",
+               ("Hello! What can you do?", "Tell me a fun fact.")),
+    LoadTarget("greeting_agent", "chapter2.hello_adk_agent", "greeting_agent",
+               ("Hi there!",)),
+    LoadTarget("callback_demo_agent", "chapter4.callback_agent", "callback_demo_agent",
+               ("Hello ADK!", "Another message.")),
+    LoadTarget("dynamic_greeter_agent", "chapter4.dynamic_greeter", "dynamic_greeter_agent",
+               ("Good morning!",)),
+    LoadTarget("calculator_agent", "chapter5.calculator", "calculator_agent",
+               ("What is 5 plus 3?", "Calculate 10 divided by 2?")),
+    LoadTarget("stateful_agent", "chapter5.stateful_tool", "stateful_agent",
+               ("Remember that my favourite colour is blue.", "What did I ask you to remember?")),
+    LoadTarget("profile_agent", "chapter5.user_profile_tool", "profile_agent",
+               ("My name is Ada and I like chess.", "What do you know about me?")),
+    LoadTarget("search_savvy_agent", "chapter6.search_agent", "search_savvy_agent",
+               ("What is the capital of France?",)),
+    LoadTarget("streaming_demo_agent", "chapter10.streaming_agent", "streaming_demo_agent",
+               ("Tell me a story.",)),
+    LoadTarget("hr_assistant_react", "chapter11.react_planner_agent", "hr_assistant_react",
+               ("How many vacation days do I have left?",)),
+    LoadTarget("iterative_refinement_loop", "chapter13.loop_refinement", "iterative_refinement_loop",
+               ("Draft a short paragraph about the benefits of ADK.",)),
+    LoadTarget("analysis_orchestrator", "chapter13.parallel_analysis", "analysis_orchestrator",
+               ("This ADK framework is incredibly powerful and flexible!",)),
+    LoadTarget("user_onboarding_pipeline", "chapter13.sequential_pipeline", "user_onboarding_pipeline",
+               ("Sign me up: Ada Lovelace, ada@example.com",)),
+    LoadTarget("state_demo_agent", "chapter17.scoped_state_demo", "state_demo_agent",
+               ("Set my theme to 'dark' and app language to 'English'.",)),
+)
+
+
+@dataclass
+class TargetResult:
+    name: str
+    users: int
+    turns: int
+    errors: int
+    latency_ms: dict[str, float]
+    events_per_sec: float
+    llm_calls_per_turn: float
+    tokens_per_turn: float
+    tool_ms_per_turn: float
+    peak_rss_mb: float
+    first_error: Optional[str] = None
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+async def _drive_target(target: LoadTarget, users: int, rounds: int) -> TargetResult:
+    from building_intelligent_agents.utils import SessionSpec, create_sessions_bulk
+
+    module = importlib.import_module(f"building_intelligent_agents.{target.module}")
+    agent = getattr(module, target.attribute)
+    runner = AccountingRunner(
+        app_name=f"Load_{target.name}",
+        agent=agent,
+        artifact_service=InMemoryArtifactService(),
+        session_service=InMemorySessionService(),
+        memory_service=InMemoryMemoryService(),
+    )
+    specs = [SessionSpec(user_id=f"user_{i}", session_id=f"session_{i}") for i in range(users)]
+    for result in await create_sessions_bulk(runner, specs):
+        if not result.ok:
+            raise RuntimeError(f"Could not create session {result.spec.session_id}: {result.error}")
+
+    latencies: list[float] = []
+    llm_calls = 0
+    tokens = 0
+    tool_ms = 0.0
+    events = 0
+    errors = 0
+    first_error: Optional[str] = None
+
+    async def _user(spec: SessionSpec):
+        nonlocal llm_calls, tokens, tool_ms, events, errors, first_error
+        for _ in range(rounds):
+            for prompt in target.prompts:
+                message = Content(role="user", parts=[Part(text=prompt)])
+                start = time.perf_counter()
+                try:
+                    async for _ in runner.run_async(
+                        user_id=spec.user_id, session_id=spec.session_id, new_message=message
+                    ):
+                        events += 1
+                except Exception as e:
+                    errors += 1
+                    first_error = first_error or f"{type(e).__name__}: {e}"
+                    continue
+                latencies.append((time.perf_counter() - start) * 1000)
+                account = runner.latest_account(spec.session_id)
+                llm_calls += account.model_calls
+                tokens += account.total_tokens
+                tool_ms += sum(account.tool_ms.values())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_user(spec) for spec in specs))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    completed = len(latencies)
+    return TargetResult(
+        name=target.name,
+        users=users,
+        turns=completed,
+        errors=errors,
+        latency_ms={
+            "p50": round(_percentile(latencies, 50), 2),
+            "p95": round(_percentile(latencies, 95), 2),
+            "p99": round(_percentile(latencies, 99), 2),
+        },
+        events_per_sec=round(events / elapsed, 1) if elapsed else 0.0,
+        llm_calls_per_turn=round(llm_calls / completed, 2) if completed else 0.0,
+        tokens_per_turn=round(tokens / completed, 1) if completed else 0.0,
+        tool_ms_per_turn=round(tool_ms / completed, 2) if completed else 0.0,
+        peak_rss_mb=0.0,
+        first_error=first_error,
+    )
+
+
+def _run_target_in_worker(target: LoadTarget, users: int, rounds: int) -> dict[str, Any]:
+    # Chapter modules print while importing and from their tools; keep worker output quiet.
+    # OpenTelemetry also logs a harmless traceback whenever a LoopAgent stops early.
+    logging.getLogger("opentelemetry.context").setLevel(logging.CRITICAL)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        result = asyncio.run(_drive_target(target, users, rounds))
+    # ru_maxrss is reported in kilobytes on Linux and bytes on macOS.
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result.peak_rss_mb = round(peak_rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    return asdict(result)
+
+
+def run_suite(
+    targets: list[LoadTarget], users: int, rounds: int, workers: Optional[int] = None
+) -> dict[str, Any]:
+    """Run every target in its own process and return the JSON-ready report."""
+    os.environ.setdefault("DEFAULT_LLM", DEFAULT_OFFLINE_LLM)
+    os.environ.setdefault("DEFAULT_REASONING_LLM", os.environ["DEFAULT_LLM"])
+    # Import the shared helpers (and with them the offline model registration) once in
+    # the parent so forked workers inherit them instead of re-importing ADK.
+    importlib.import_module("building_intelligent_agents.utils")
+    start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(start_method)
+    report: dict[str, Any] = {
+        "config": {
+            "users": users,
+            "rounds": rounds,
+            "model": os.environ["DEFAULT_LLM"],
+        },
+        "agents": {},
+    }
+    with context.Pool(processes=workers or os.cpu_count(), maxtasksperchild=1) as pool:
+        pending = {t.name: pool.apply_async(_run_target_in_worker, (t, users, rounds)) for t in targets}
+        for name, async_result in pending.items():
+            try:
+                report["agents"][name] = async_result.get()
+            except Exception as e:
+                report["agents"][name] = {"name": name, "failed": f"{type(e).__name__}: {e}"}
+    return report
+
+
+def compare_reports(baseline: dict[str, Any], current: dict[str, Any], tolerance: float) -> list[str]:
+    """Return a description of every metric that regressed by more than `tolerance` (0.2 = 20%)."""
+    regressions = []
+    for name, result in current["agents"].items():
+        before = baseline.get("agents", {}).get(name)
+        if not before or "failed" in before:
+            continue
+        if "failed" in result:
+            regressions.append(f"{name}: failed ({result['failed']})")
+            continue
+        checks = [
+            ("latency_ms.p95", before["latency_ms"]["p95"], result["latency_ms"]["p95"], True),
+            ("llm_calls_per_turn", before["llm_calls_per_turn"], result["llm_calls_per_turn"], True),
+            ("tokens_per_turn", before.get("tokens_per_turn", 0), result["tokens_per_turn"], True),
+            ("peak_rss_mb", before["peak_rss_mb"], result["peak_rss_mb"], True),
+            ("events_per_sec", before["events_per_sec"], result["events_per_sec"], False),
+        ]
+        for metric, old, new, higher_is_worse in checks:
+            if not old:
+                continue
+            change = (new - old) / old
+            if (change > tolerance) if higher_is_worse else (change < -tolerance):
+                regressions.append(f"{name}: {metric} {old} -> {new} ({change:+.0%})")
+        if result["errors"] > before["errors"]:
+            regressions.append(f"{name}: errors {before['errors']} -> {result['errors']}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent load harness for the chapter agents.")
+    parser.add_argument("--users", type=int, default=16, help="Concurrent simulated users per agent.")
+    parser.add_argument("--rounds", type=int, default=2, help="Times each user sends the target's prompts.")
+    parser.add_argument("--targets", nargs="*", help="Subset of target names to run (default: all).")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count).")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+    parser.add_argument("--compare", help="Baseline JSON report; exit non-zero on regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression.")
+    args = parser.parse_args()
+
+    selected = [t for t in TARGETS if not args.targets or t.name in args.targets]
+    report = run_suite(selected, args.users, args.rounds, args.workers)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    failed = [name for name, result in report["agents"].items() if "failed" in result]
+    if failed:
+        print(f"[FAIL] Targets that could not run: {', '.join(failed)}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare_reports(json.load(f), report, args.tolerance)
+        for line in regressions:
+            print(f"[REGRESSION] {line}", file=sys.stderr)
+        sys.exit(1 if regressions or failed else 0)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,146 @@
+import argparse
+import random
+import statistics
+import time
+
+from google.adk.models.llm_response import LlmResponse
+from google.genai.types import Content, Part
+
+from building_intelligent_agents.prompt_cache import SimilarPromptCache, jaccard, normalize_prompt, shingles
+
+# Precision, recall and lookup latency of the near-duplicate prompt cache on a
+# synthetic paraphrase corpus. Every base question is cached once; then paraphrases
+# of it (case, punctuation, filler words, typos) should hit, while questions from the
+# same templates with different slot values ("capital of Spain" after caching
+# "capital of France") must not.
+
+TEMPLATES = [
+    ("What is the capital of {}?", ["France", "Germany", "Italy", "Japan", "Brazil", "Canada", "Kenya", "Norway", "Peru", "Egypt", "Spain", "India"]),
+    ("How do I reset my password for {}?", ["email", "the VPN", "Slack", "the HR portal", "payroll", "GitHub", "Jira", "the wiki"]),
+    ("What are the opening hours of the {} office?", ["Berlin", "London", "Paris", "Tokyo", "Toronto", "Sydney", "Madrid", "Dublin"]),
+    ("Summarize the refund policy for {}.", ["laptops", "headphones", "gift cards", "subscriptions", "furniture", "books", "software", "tickets"]),
+    ("Who is the manager of the {} team?", ["marketing", "security", "platform", "design", "sales", "finance", "support", "research"]),
+    ("How many vacation days do {} employees get?", ["new", "part-time", "senior", "remote", "contract", "full-time"]),
+]
+
+PREFIXES = ["", "", "Hey, ", "Quick question: ", "Please tell me: ", "Could you tell me "]
+SUFFIXES = ["", "", " Thanks!", " thank you", " please"]
+
+
+def _typo(rng: random.Random, text: str) -> str:
+    words = text.split(" ")
+    candidates = [i for i, w in enumerate(words) if len(w) > 5]
+    if not candidates:
+        return text
+    i = rng.choice(candidates)
+    j = rng.randrange(1, len(words[i]) - 2)
+    word = words[i]
+    words[i] = word[:j] + word[j + 1] + word[j] + word[j + 2:]
+    return " ".join(words)
+
+
+def paraphrase(rng: random.Random, text: str) -> str:
+    text = rng.choice(PREFIXES) + text + rng.choice(SUFFIXES)
+    if rng.random() < 0.5:
+        text = text.lower()
+    if rng.random() < 0.5:
+        text = text.replace("?", "").replace(".", "")
+    if rng.random() < 0.3:
+        text = _typo(rng, text)
+    return text
+
+
+def build_corpus(seed: int, paraphrases_per_question: int):
+    rng = random.Random(seed)
+    cached, positives, negatives = [], [], []
+    for template, values in TEMPLATES:
+        # Half the slot values are cached; the other half only appear as negatives.
+        for i, value in enumerate(values):
+            question = template.format(value)
+            if i % 2 == 0:
+                base_id = len(cached)
+                cached.append(question)
+                positives.extend((paraphrase(rng, question), base_id) for _ in range(paraphrases_per_question))
+            else:
+                negatives.extend(paraphrase(rng, question) for _ in range(paraphrases_per_question))
+    return cached, positives, negatives
+
+
+def _answer(base_id: int) -> LlmResponse:
+    return LlmResponse(content=Content(role="model", parts=[Part(text=f"answer {base_id}")]))
+
+
+def _answer_id(response: LlmResponse) -> int:
+    return int(response.content.parts[0].text.split(" ")[1])
+
+
+def evaluate(threshold: float, bands: int, cached, positives, negatives, filler: list[str]):
+    cache = SimilarPromptCache(threshold=threshold, bands=bands, max_entries=len(cached) + len(filler))
+    for base_id, question in enumerate(cached):
+        cache.store("ctx", question, _answer(base_id))
+    for i, question in enumerate(filler):
+        cache.store("ctx", question, _answer(-1 - i))
+
+    correct = wrong = 0
+    latencies = []
+    for prompt, base_id in positives:
+        start = time.perf_counter()
+        match = cache.lookup("ctx", prompt)
+        latencies.append((time.perf_counter() - start) * 1e6)
+        if match is not None:
+            correct += _answer_id(match[1]) == base_id
+            wrong += _answer_id(match[1]) != base_id
+    false_hits = 0
+    for prompt in negatives:
+        start = time.perf_counter()
+        match = cache.lookup("ctx", prompt)
+        latencies.append((time.perf_counter() - start) * 1e6)
+        false_hits += match is not None
+    served = correct + wrong + false_hits
+    latencies.sort()
+    return {
+        "precision": correct / served if served else 1.0,
+        "recall": correct / len(positives),
+        "false_hit_rate": false_hits / len(negatives),
+        "p50_us": statistics.median(latencies),
+        "p99_us": latencies[int(len(latencies) * 0.99)],
+        "candidates_per_lookup": cache.candidates_checked / (cache.hits + cache.misses),
+    }
+
+
+def linear_scan_us(entries: list[str], prompts: list[str], threshold: float) -> float:
+    """Lookup latency without the LSH index: exact Jaccard against every cached prompt."""
+    stored = [shingles(normalize_prompt(e)) for e in entries]
+    start = time.perf_counter()
+    for prompt in prompts:
+        query = shingles(normalize_prompt(prompt))
+        max((jaccard(query, s) for s in stored), default=0.0) >= threshold
+    return (time.perf_counter() - start) / len(prompts) * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Near-duplicate prompt cache precision/latency benchmark.")
+    parser.add_argument("--paraphrases", type=int, default=20, help="Paraphrases generated per question.")
+    parser.add_argument("--filler", type=int, default=5000, help="Unrelated cached prompts, to make the index realistic.")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    cached, positives, negatives = build_corpus(args.seed, args.paraphrases)
+    rng = random.Random(args.seed)
+    vocabulary = "order invoice shipping account report schedule meeting budget laptop policy contract travel expense badge parking".split()
+    filler = [" ".join(rng.choice(vocabulary) for _ in range(rng.randint(4, 9))) + "?" for _ in range(args.filler)]
+
+    print(f"corpus: {len(cached)} cached questions + {len(filler)} filler, "
+          f"{len(positives)} paraphrases, {len(negatives)} near-miss negatives")
+    print(f"{'threshold':>9} {'bands':>5} {'precision':>9} {'recall':>7} {'false hit':>9} "
+          f"{'p50 us':>8} {'p99 us':>8} {'cands':>6}")
+    for bands in (16, 32):
+        for threshold in (0.5, 0.6, 0.7, 0.8, 0.9):
+            r = evaluate(threshold, bands, cached, positives, negatives, filler)
+            print(f"{threshold:>9.1f} {bands:>5} {r['precision']:>9.3f} {r['recall']:>7.3f} "
+                  f"{r['false_hit_rate']:>9.3f} {r['p50_us']:>8.1f} {r['p99_us']:>8.1f} "
+                  f"{r['candidates_per_lookup']:>6.1f}")
+
+    sample = [p for p, _ in positives[:200]]
+    print(f"linear scan over {len(cached) + len(filler)} prompts: "
+          f"{linear_scan_us(cached + filler, sample, 0.7):.1f} us per lookup")
@@ -0,0 +1,136 @@
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+# A local HTTP server that rate-limits like a public API: each Authorization header
+# gets `rate` requests per second (with a burst of `rate`), and requests over the limit
+# get 429 with Retry-After. Every response carries X-RateLimit-Limit/Remaining/Reset.
+#
+#   python -m building_intelligent_agents.benchmarks.rate_limit_stub --port 8765 --rate 5
+#   curl -H "Authorization: Bearer a" "http://127.0.0.1:8765/v1/search?q=test&type=track"
+
+STUB_OPENAPI_SPEC = """
+openapi: 3.0.0
+info:
+  title: Rate-limited search stub
+  version: v1
+servers:
+  - url: {base_url}/v1
+components:
+  securitySchemes:
+    ApiKeyAuth:
+      type: apiKey
+      in: header
+      name: Authorization
+security:
+  - ApiKeyAuth: []
+paths:
+  /search:
+    get:
+      operationId: searchForItem
+      description: Search the catalog.
+      parameters:
+        - name: q
+          in: query
+          required: true
+          schema:
+            type: string
+        - name: type
+          in: query
+          required: true
+          schema:
+            type: string
+      responses:
+        '200':
+          description: Search results.
+          content:
+            application/json:
+              schema:
+                type: object
+        '429':
+          description: Rate limited.
+"""
+
+
+class _Window:
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+
+class RateLimitStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, rate: float = 5.0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.rate = rate
+        self.ok = 0
+        self.throttled = 0
+        self._windows: dict[str, _Window] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def admit(self, key: str) -> tuple[bool, int, float]:
+        """Returns (allowed, remaining, seconds until a token is available) for `key`."""
+        with self._lock:
+            window = self._windows.setdefault(key, _Window(self.rate))
+            now = time.monotonic()
+            window.tokens = min(window.rate, window.tokens + (now - window.updated) * window.rate)
+            window.updated = now
+            if window.tokens >= 1:
+                window.tokens -= 1
+                self.ok += 1
+                return True, int(window.tokens), (1 - window.tokens % 1) / window.rate
+            self.throttled += 1
+            return False, 0, (1 - window.tokens) / window.rate
+
+    def start(self) -> "RateLimitStubServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: RateLimitStubServer
+
+    def do_GET(self):
+        allowed, remaining, reset = self.server.admit(self.headers.get("Authorization", "anonymous"))
+        body = json.dumps({"tracks": {"items": [{"name": "Stub Track"}]}} if allowed else {"error": "rate limited"})
+        self.send_response(200 if allowed else 429)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("X-RateLimit-Limit", str(int(self.server.rate)))
+        self.send_header("X-RateLimit-Remaining", str(remaining))
+        self.send_header("X-RateLimit-Reset", f"{reset:.3f}")
+        if not allowed:
+            self.send_header("Retry-After", f"{reset:.3f}")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body.encode("utf-8"))
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local HTTP server that answers 429 over a per-key rate.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=float, default=5.0, help="Requests per second per Authorization header.")
+    args = parser.parse_args()
+    server = RateLimitStubServer(port=args.port, rate=args.rate)
+    print(f"Serving on {server.base_url} at {args.rate:g} requests/s per key")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,104 @@
+import argparse
+import asyncio
+import time
+from typing import Optional
+
+from fastapi.openapi.models import APIKey, APIKeyIn
+from google.adk.agents import Agent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.auth import AuthCredential, AuthCredentialTypes
+from google.adk.sessions import InMemorySessionService
+from google.adk.tools.openapi_tool import OpenAPIToolset
+from google.adk.tools.tool_context import ToolContext
+
+from building_intelligent_agents.benchmarks.rate_limit_stub import STUB_OPENAPI_SPEC, RateLimitStubServer
+from building_intelligent_agents.rate_limiter import AdaptiveRateLimiter, RateLimitedOpenAPIToolset
+
+# Successful calls per second and 429s for concurrent workers calling an OpenAPI tool
+# against the local stub (benchmarks/rate_limit_stub.py), which allows `--server-rate`
+# requests per second per API key:
+#   * fixed sleep:  each worker sleeps 1 s between calls, as chapter7/spotify_agent.py did;
+#   * no limiter:   workers call as fast as they can and count the 429s;
+#   * adaptive:     RateLimitedOpenAPIToolset, started at a deliberately wrong rate.
+
+
+def _toolset(base_url: str, api_key: str, limiter: Optional[AdaptiveRateLimiter]) -> OpenAPIToolset:
+    kwargs = dict(
+        spec_str=STUB_OPENAPI_SPEC.replace("{base_url}", base_url),
+        spec_str_type="yaml",
+        auth_scheme=APIKey(type="apiKey", name="Authorization", **{"in": APIKeyIn.header}),
+        auth_credential=AuthCredential(auth_type=AuthCredentialTypes.API_KEY, api_key=api_key),
+    )
+    return RateLimitedOpenAPIToolset(limiter, **kwargs) if limiter else OpenAPIToolset(**kwargs)
+
+
+async def _tool_context() -> ToolContext:
+    """A ToolContext for calling the tool directly, outside of an agent run."""
+    session_service = InMemorySessionService()
+    session = await session_service.create_session(app_name="RateLimitBench", user_id="bench")
+    agent = Agent(name="bench_agent", model="fake")
+    return ToolContext(InvocationContext(
+        session_service=session_service, invocation_id="bench", agent=agent, session=session
+    ))
+
+
+async def _measure(
+    server: RateLimitStubServer, mode: str, workers: int, duration: float, initial_rate: float
+) -> dict[str, float]:
+    api_key = f"Bearer {mode}"
+    limiter = AdaptiveRateLimiter(rate=initial_rate, max_rate=server.rate * 4) if mode == "adaptive" else None
+    tool = (await _toolset(server.base_url, api_key, limiter).get_tools())[0]
+    tool_context = await _tool_context()
+    ok = throttled = 0
+    deadline = time.perf_counter() + duration
+
+    async def _worker():
+        nonlocal ok, throttled
+        while time.perf_counter() < deadline:
+            result = await tool.run_async(args={"q": "test", "type": "track"}, tool_context=tool_context)
+            if "error" in result:
+                throttled += 1
+            else:
+                ok += 1
+            if mode == "fixed sleep":
+                await asyncio.sleep(1)
+            elif mode == "no limiter":
+                # The stock tool blocks the event loop; yield so every worker gets turns.
+                await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_worker() for _ in range(workers)))
+    elapsed = time.perf_counter() - start
+    return {
+        "ok_per_sec": ok / elapsed,
+        "errors": throttled,
+        "retries": limiter.retries if limiter else 0,
+        "final_rate": limiter.bucket(server.base_url.split("//")[1], api_key).rate if limiter else 0.0,
+    }
+
+
+async def main(args):
+    server = RateLimitStubServer(rate=args.server_rate).start()
+    try:
+        print(f"{args.workers} workers for {args.duration:g} s against a stub allowing {args.server_rate:g} requests/s per key")
+        print(f"{'mode':<30} {'ok/s':>7} {'429 errors':>11} {'retries':>8} {'final rate':>11}")
+        for mode, initial_rate in (
+            ("fixed sleep", 0.0),
+            ("no limiter", 0.0),
+            ("adaptive", args.server_rate * 4),
+            ("adaptive", args.server_rate / 4),
+        ):
+            r = await _measure(server, mode, args.workers, args.duration, initial_rate)
+            label = f"{mode} (start {initial_rate:g}/s)" if initial_rate else mode
+            print(f"{label:<30} {r['ok_per_sec']:>7.2f} {r['errors']:>11} {r['retries']:>8} {r['final_rate']:>11.2f}")
+        print(f"stub totals: {server.ok} ok, {server.throttled} throttled")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Adaptive rate limiter benchmark against a local 429 stub.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per mode.")
+    parser.add_argument("--server-rate", type=float, default=5.0, help="Requests per second the stub allows per key.")
+    asyncio.run(main(parser.parse_args()))
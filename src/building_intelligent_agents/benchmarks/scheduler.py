@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import statistics
+import time
+from typing import AsyncGenerator, Callable
+
+from google.adk.agents import Agent, LoopAgent
+from google.adk.events import Event
+from google.adk.runners import InMemoryRunner, Runner
+from google.genai.types import Content, Part
+
+from building_intelligent_agents.fake_llm import FakeLlm
+from building_intelligent_agents.scheduler import SchedulerOverloadedError, TurnScheduler
+
+# One heavy tenant floods the process with LoopAgent turns while light tenants send
+# short chat turns. Compares a plain shared semaphore (first come, first served) with
+# TurnScheduler's per-user limits and fair queuing, then shows load shedding and
+# per-session serialization.
+
+RunFn = Callable[..., AsyncGenerator[Event, None]]
+
+
+def _message(text: str) -> Content:
+    return Content(role="user", parts=[Part(text=text)])
+
+
+def _make_runners(ttft_ms: float) -> tuple[Runner, Runner]:
+    step = Agent(name="refiner", model=FakeLlm(model="fake", ttft_ms=ttft_ms), instruction="Refine the draft.")
+    heavy = InMemoryRunner(agent=LoopAgent(name="refinement_loop", sub_agents=[step], max_iterations=4), app_name="LoopApp")
+    light = InMemoryRunner(
+        agent=Agent(name="chat", model=FakeLlm(model="fake", ttft_ms=ttft_ms), instruction="Chat briefly."),
+        app_name="ChatApp",
+    )
+    return heavy, light
+
+
+async def _turn(run: RunFn, runner: Runner, user_id: str, session_id: str) -> float:
+    session = await runner.session_service.get_session(app_name=runner.app_name, user_id=user_id, session_id=session_id)
+    if session is None:
+        await runner.session_service.create_session(app_name=runner.app_name, user_id=user_id, session_id=session_id)
+    start = time.perf_counter()
+    async for _ in run(runner, user_id=user_id, session_id=session_id, new_message=_message("Go.")):
+        pass
+    return (time.perf_counter() - start) * 1000
+
+
+async def _scenario(run: RunFn, heavy_turns: int, light_users: int, ttft_ms: float) -> dict[str, float]:
+    heavy, light = _make_runners(ttft_ms)
+    start = time.perf_counter()
+    heavy_tasks = [asyncio.create_task(_turn(run, heavy, "bulk_user", f"bulk_{i}")) for i in range(heavy_turns)]
+    await asyncio.sleep(ttft_ms / 1000)
+
+    async def _light_user(i: int) -> list[float]:
+        return [await _turn(run, light, f"chat_user_{i}", f"chat_{i}") for _ in range(3)]
+
+    light_latencies = sorted(x for xs in await asyncio.gather(*(_light_user(i) for i in range(light_users))) for x in xs)
+    await asyncio.gather(*heavy_tasks)
+    return {
+        "light_p50": statistics.median(light_latencies),
+        "light_p95": light_latencies[int(0.95 * (len(light_latencies) - 1))],
+        "makespan_s": time.perf_counter() - start,
+    }
+
+
+def _semaphore_run(limit: int) -> RunFn:
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(runner: Runner, **kwargs) -> AsyncGenerator[Event, None]:
+        async with semaphore:
+            async for event in runner.run_async(**kwargs):
+                yield event
+    return run
+
+
+async def _shedding_demo(burst: int, ttft_ms: float) -> dict:
+    _, light = _make_runners(ttft_ms)
+    scheduler = TurnScheduler(max_concurrency=8, max_per_user=8, max_queue_depth=32)
+    results = await asyncio.gather(
+        *(_turn(scheduler.run_async, light, f"u{i % 50}", f"s{i}") for i in range(burst)), return_exceptions=True
+    )
+    rejected = sum(isinstance(r, SchedulerOverloadedError) for r in results)
+    return {"burst": burst, "rejected": rejected, **scheduler.stats()}
+
+
+async def _interleaving(run: RunFn, messages: int, ttft_ms: float) -> bool:
+    """Sends concurrent messages to one session; True if their events interleave."""
+    _, light = _make_runners(ttft_ms)
+    await light.session_service.create_session(app_name=light.app_name, user_id="u", session_id="shared")
+    await asyncio.gather(*(_turn(run, light, "u", "shared") for _ in range(messages)))
+    session = await light.session_service.get_session(app_name=light.app_name, user_id="u", session_id="shared")
+    seen, previous = set(), None
+    for event in session.events:
+        if event.invocation_id != previous:
+            if event.invocation_id in seen:
+                return True
+            seen.add(event.invocation_id)
+            previous = event.invocation_id
+    return False
+
+
+async def main(args):
+    fifo = await _scenario(_semaphore_run(args.concurrency), args.heavy_turns, args.light_users, args.ttft_ms)
+    # Fair queuing alone keeps every slot busy; the per-user cap also reserves slots
+    # for other tenants, at the cost of the heavy tenant's throughput.
+    uncapped = await _scenario(
+        TurnScheduler(max_concurrency=args.concurrency, max_per_user=args.concurrency).run_async,
+        args.heavy_turns, args.light_users, args.ttft_ms,
+    )
+    scheduler = TurnScheduler(max_concurrency=args.concurrency, max_per_user=args.max_per_user)
+    fair = await _scenario(scheduler.run_async, args.heavy_turns, args.light_users, args.ttft_ms)
+
+    print(f"{args.heavy_turns} LoopAgent turns from one user, {args.light_users} chat users x 3 turns, "
+          f"{args.concurrency} slots")
+    print(f"{'mode':<28} {'light p50 ms':>13} {'light p95 ms':>13} {'makespan s':>11}")
+    rows = (
+        ("shared semaphore", fifo),
+        ("fair queuing only", uncapped),
+        (f"fair queuing, {args.max_per_user} per user", fair),
+    )
+    for label, r in rows:
+        print(f"{label:<28} {r['light_p50']:>13.1f} {r['light_p95']:>13.1f} {r['makespan_s']:>11.2f}")
+    print(f"scheduler stats: {scheduler.stats()}")
+
+    print(f"load shedding: {await _shedding_demo(200, args.ttft_ms)}")
+    print(f"events interleaved without scheduler: {await _interleaving(lambda r, **kw: r.run_async(**kw), 5, args.ttft_ms)}")
+    print(f"events interleaved with scheduler:    {await _interleaving(TurnScheduler().run_async, 5, args.ttft_ms)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-tenant turn scheduler benchmark.")
+    parser.add_argument("--heavy-turns", type=int, default=48)
+    parser.add_argument("--light-users", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--max-per-user", type=int, default=4)
+    parser.add_argument("--ttft-ms", type=float, default=50.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,84 @@
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import BaseSessionService, DatabaseSessionService, InMemorySessionService
+from google.adk.sessions.base_session_service import GetSessionConfig
+
+from building_intelligent_agents.sessions import ShardedInMemorySessionService, SqliteSessionService
+
+# Cost of building a session's state view, which Runner does at the start of every
+# turn, when an app has sizeable `app:` state (a catalog, feature flags, prompts) shared
+# by every session, as the number of sessions grows. Also the cost of one `app:` update
+# and of the first read after it, which has to pick the update up.
+
+APP = "ScopedBench"
+# The sessions have no events; this keeps the services that honour it from even looking.
+_NO_EVENTS = GetSessionConfig(num_recent_events=1)
+
+
+def _app_state(keys: int) -> dict:
+    return {
+        f"app:product_{i}": {"name": f"Product {i}", "price": i * 1.5, "tags": ["a", "b", "c"]} for i in range(keys)
+    }
+
+
+async def _measure(service: BaseSessionService, sessions: int, app_keys: int, reads: int) -> tuple[float, float, float]:
+    """(µs per state read, µs for an app: update, µs for the first read after it)."""
+    first = await service.create_session(app_name=APP, user_id="user_0")
+    # Through an event: the stock InMemorySessionService only shares app: keys written by events.
+    await service.append_event(first, Event(author="admin", actions=EventActions(state_delta=_app_state(app_keys))))
+    keys = [("user_0", first.id)]
+    for i in range(1, sessions):
+        user_id = f"user_{i % 100}"
+        session = await service.create_session(app_name=APP, user_id=user_id, state={"turns": 0, "user:theme": "dark"})
+        keys.append((user_id, session.id))
+    rng = random.Random(0)
+    sample = [rng.choice(keys) for _ in range(reads)]
+
+    async def read(user_id, session_id):
+        session = await service.get_session(
+            app_name=APP, user_id=user_id, session_id=session_id, config=_NO_EVENTS
+        )
+        assert len(session.state) >= app_keys
+
+    for key in sample[:10]:
+        await read(*key)
+    start = time.perf_counter()
+    for key in sample:
+        await read(*key)
+    per_read = (time.perf_counter() - start) / reads * 1e6
+
+    session = await service.get_session(app_name=APP, user_id="user_0", session_id=first.id)
+    start = time.perf_counter()
+    await service.append_event(session, Event(author="admin", actions=EventActions(state_delta={"app:sale": True})))
+    update = (time.perf_counter() - start) * 1e6
+    start = time.perf_counter()
+    await read(*sample[0])
+    after_update = (time.perf_counter() - start) * 1e6
+    return per_read, update, after_update
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="State view cost with shared app: state, by session count.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--app-keys", type=int, default=200, help="Keys of app: state.")
+    parser.add_argument("--reads", type=int, default=500)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="adk-scoped-")
+    factories = {
+        "InMemorySessionService": lambda n: InMemorySessionService(),
+        "ShardedInMemory": lambda n: ShardedInMemorySessionService(),
+        "DatabaseSessionService": lambda n: DatabaseSessionService(f"sqlite:///{directory}/db_{n}.db"),
+        "SqliteSessionService": lambda n: SqliteSessionService(f"{directory}/wal_{n}.db"),
+    }
+    print(f"app: state of {args.app_keys} keys; {args.reads} reads of random sessions")
+    print(f"{'service':<24} {'sessions':>9} {'µs/read':>9} {'µs/app update':>14} {'µs/read after':>14}")
+    for name, factory in factories.items():
+        for sessions in args.sessions:
+            per_read, update, after = asyncio.run(_measure(factory(sessions), sessions, args.app_keys, args.reads))
+            print(f"{name:<24} {sessions:>9} {per_read:>9.1f} {update:>14.1f} {after:>14.1f}")
@@ -0,0 +1,130 @@
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import event as sqlalchemy_event
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import BaseSessionService
+from google.genai.types import Content, Part
+
+from building_intelligent_agents.sessions import (
+    CachedSessionService,
+    FakeRedis,
+    FastReadDatabaseSessionService,
+    RedisSessionService,
+    SqliteSessionService,
+)
+
+# What CachedSessionService saves per Runner turn in front of a database: each turn
+# reads the session and appends a user and a model event, as Runner does. Turns are
+# spread over several workers, each with its own cache over the shared database; a
+# session's next turn goes to the same worker with probability --sticky, so the other
+# turns find a copy that another worker has since made stale.
+#
+# Then, per backend, whether the read after each kind of write through the cache is a
+# hit: after create_session, and after appends writing session, `user:` and `app:`
+# state, for the written session and for another cached session of the same user.
+
+APP = "CacheBench"
+
+
+def _event(author: str, turn: int) -> Event:
+    return Event(
+        invocation_id=f"inv_{turn}",
+        author=author,
+        content=Content(role="user" if author == "user" else "model", parts=[Part(text="Where is my order? " * 5)]),
+        actions=EventActions(state_delta={"turns": turn} if author != "user" else {}),
+    )
+
+
+async def _run(db_path: str, workers: int, cached: bool, sessions: int, turns: int, sticky: float) -> dict[str, float]:
+    backend = FastReadDatabaseSessionService(f"sqlite:///{db_path}")
+    statements = 0
+
+    def count(*args):
+        nonlocal statements
+        statements += 1
+
+    sqlalchemy_event.listen(backend.db_engine, "before_cursor_execute", count)
+    services: list[BaseSessionService] = [
+        CachedSessionService(backend) if cached else backend for _ in range(workers)
+    ]
+    rng = random.Random(0)
+    keys = [(await services[0].create_session(app_name=APP, user_id=f"user_{i}")).id for i in range(sessions)]
+    home = {session_id: 0 for session_id in keys}
+
+    statements = 0
+    start = time.perf_counter()
+    for turn in range(turns):
+        for i, session_id in enumerate(keys):
+            if rng.random() >= sticky:
+                home[session_id] = rng.randrange(workers)
+            service = services[home[session_id]]
+            session = await service.get_session(app_name=APP, user_id=f"user_{i}", session_id=session_id)
+            await service.append_event(session, _event("user", turn))
+            await service.append_event(session, _event("support_agent", turn))
+    elapsed = time.perf_counter() - start
+    total = sessions * turns
+    row = {"ms/turn": elapsed / total * 1000, "SQL/turn": statements / total}
+    if cached:
+        hits = sum(s.stats()["hits"] for s in services)
+        reads = hits + sum(s.stats()["misses"] for s in services)
+        row["hit rate"] = hits / reads
+        row["reads saved/turn"] = hits / total
+        row["invalidations"] = sum(s.stats()["invalidations"] for s in services)
+    return row
+
+
+async def _hits_after_writes(backend: BaseSessionService) -> dict[str, bool]:
+    service = CachedSessionService(backend)
+    session = await service.create_session(app_name=APP, user_id="user_0")
+    other = await service.create_session(app_name=APP, user_id="user_0")
+    hits = {}
+
+    async def read(name: str, session_id: str):
+        before = service.hits
+        await service.get_session(app_name=APP, user_id="user_0", session_id=session_id)
+        hits[name] = service.hits > before
+
+    await read("create", session.id)
+    writes = (("session key", {"turns": 1}), ("user: key", {"user:orders": 1}), ("app: key", {"app:open": True}))
+    for name, delta in writes:
+        session = await service.get_session(app_name=APP, user_id="user_0", session_id=session.id)
+        event = Event(invocation_id="inv", author="support_agent", actions=EventActions(state_delta=delta))
+        await service.append_event(session, event)
+        await read(name, session.id)
+        await read(f"{name}, other", other.id)
+    return hits
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backend work saved by CachedSessionService.")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--sticky", type=float, default=0.9, help="Chance a turn goes to the previous worker.")
+    args = parser.parse_args()
+
+    print(f"{args.sessions} sessions x {args.turns} turns, {args.workers} workers, sticky={args.sticky}")
+    columns = ["ms/turn", "SQL/turn", "hit rate", "reads saved/turn", "invalidations"]
+    print(f"{'service':<10} " + " ".join(f"{c:>16}" for c in columns))
+    with tempfile.TemporaryDirectory() as directory:
+        for name, cached in (("database", False), ("cached", True)):
+            row = asyncio.run(
+                _run(os.path.join(directory, f"{name}.db"), args.workers, cached, args.sessions, args.turns, args.sticky)
+            )
+            print(f"{name:<10} " + " ".join(f"{row[c]:>16.3f}" if c in row else f"{'-':>16}" for c in columns))
+
+        print("\nHit on the read after a write through the cache")
+        backends = {
+            "FastReadDatabase": lambda: FastReadDatabaseSessionService(f"sqlite:///{os.path.join(directory, 'hits.db')}"),
+            "SqliteSessionService": lambda: SqliteSessionService(os.path.join(directory, "hits_wal.db")),
+            "RedisSessionService": lambda: RedisSessionService(FakeRedis()),
+        }
+        for name, factory in backends.items():
+            hits = asyncio.run(_hits_after_writes(factory()))
+            print(f"{name:<22} " + ", ".join(f"{write}: {'hit' if hit else 'miss'}" for write, hit in hits.items()))
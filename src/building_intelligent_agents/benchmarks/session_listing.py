@@ -0,0 +1,70 @@
+import argparse
+import asyncio
+import tempfile
+import time
+
+from google.adk.sessions import BaseSessionService, DatabaseSessionService
+
+from building_intelligent_agents.sessions import (
+    FastReadDatabaseSessionService,
+    ShardedInMemorySessionService,
+    SqliteSessionService,
+    list_sessions_page,
+)
+
+# Listing the sessions of one user with a growing number of sessions, as an admin
+# dashboard does: list_sessions (everything at once) against list_sessions_page, for the
+# first page and for pages further back reached by following cursors. Every session
+# has some state, which a metadata listing should not read.
+
+APP = "ListingBench"
+_STATE = {"cart": [{"sku": f"sku_{i}", "qty": i} for i in range(20)], "notes": "Customer prefers tea. " * 20}
+
+
+async def _measure(service: BaseSessionService, sessions: int, limit: int, pages: int) -> dict[str, float]:
+    # Other users' sessions too, so the user's sessions are a slice of the table.
+    for i in range(sessions):
+        await service.create_session(app_name=APP, user_id="power_user", state=_STATE)
+        if i % 10 == 0:
+            await service.create_session(app_name=APP, user_id=f"user_{i}", state=_STATE)
+
+    start = time.perf_counter()
+    listed = await service.list_sessions(app_name=APP, user_id="power_user")
+    full = time.perf_counter() - start
+    assert len(listed.sessions) == sessions
+
+    start = time.perf_counter()
+    page = await list_sessions_page(service, app_name=APP, user_id="power_user", limit=limit)
+    first = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(pages):
+        page = await list_sessions_page(
+            service, app_name=APP, user_id="power_user", limit=limit, cursor=page.next_cursor
+        )
+    following = (time.perf_counter() - start) / pages
+    assert len(page.sessions) == limit
+    return {"list_sessions ms": full * 1000, "first page ms": first * 1000, "next page ms": following * 1000}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="list_sessions against list_sessions_page, by session count.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1000, 10000, 30000])
+    parser.add_argument("--limit", type=int, default=50, help="Sessions per page.")
+    parser.add_argument("--pages", type=int, default=10, help="Pages followed after the first.")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="adk-listing-")
+    factories = {
+        "DatabaseSessionService": lambda n: DatabaseSessionService(f"sqlite:///{directory}/stock_{n}.db"),
+        "FastReadDatabase": lambda n: FastReadDatabaseSessionService(f"sqlite:///{directory}/fast_{n}.db"),
+        "SqliteSessionService": lambda n: SqliteSessionService(f"{directory}/wal_{n}.db"),
+        "ShardedInMemory": lambda n: ShardedInMemorySessionService(),
+    }
+    print(f"One user's sessions, pages of {args.limit}")
+    columns = ["list_sessions ms", "first page ms", "next page ms"]
+    print(f"{'service':<24} {'sessions':>9} " + " ".join(f"{c:>17}" for c in columns))
+    for name, factory in factories.items():
+        for sessions in args.sessions:
+            row = asyncio.run(_measure(factory(sessions), sessions, args.limit, args.pages))
+            print(f"{name:<24} {sessions:>9} " + " ".join(f"{row[c]:>17.2f}" for c in columns))
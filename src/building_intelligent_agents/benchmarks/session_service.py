@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import threading
+import time
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import BaseSessionService, InMemorySessionService
+from google.genai.types import Content, Part
+
+from building_intelligent_agents.sessions import ShardedInMemorySessionService
+
+# append_event + get_session throughput of the stock InMemorySessionService and
+# ShardedInMemorySessionService at 1-256 concurrent sessions, first on one event loop
+# (as InMemoryRunner.run_async uses it) and then from several threads with their own
+# loops (as Runner.run and AgentHost use it), where the stock service is unsynchronized.
+# Every turn appends a user event, a model event with a state delta, then reads the
+# session back, like a Runner turn does.
+
+APP = "SessionBench"
+
+
+def _event(author: str, turn: int, text: str, state_delta: dict) -> Event:
+    return Event(
+        invocation_id=f"inv_{turn}",
+        author=author,
+        content=Content(role="user" if author == "user" else "model", parts=[Part(text=text)]),
+        actions=EventActions(state_delta=state_delta),
+    )
+
+
+async def _session_turns(service: BaseSessionService, user_id: str, turns: int) -> int:
+    session = await service.create_session(app_name=APP, user_id=user_id)
+    ops = 0
+    for turn in range(turns):
+        await service.append_event(session, _event("user", turn, f"message {turn}", {}))
+        await service.append_event(
+            session, _event("assistant", turn, f"reply {turn}", {"turns": turn + 1, "user:last_turn": turn})
+        )
+        session = await service.get_session(app_name=APP, user_id=user_id, session_id=session.id)
+        ops += 3
+        # Yield like a model call would, so sessions interleave.
+        await asyncio.sleep(0)
+    return ops
+
+
+async def _concurrent(service: BaseSessionService, sessions: int, turns: int, prefix: str = "u") -> int:
+    results = await asyncio.gather(*(_session_turns(service, f"{prefix}_{i}", turns) for i in range(sessions)))
+    return sum(results)
+
+
+def bench_event_loop(service: BaseSessionService, sessions: int, turns: int) -> float:
+    start = time.perf_counter()
+    ops = asyncio.run(_concurrent(service, sessions, turns))
+    return ops / (time.perf_counter() - start)
+
+
+def bench_threads(service: BaseSessionService, threads: int, sessions: int, turns: int) -> tuple[float, int]:
+    """Ops/sec with `threads` loops sharing the service, and the number of lost events."""
+    ops = [0] * threads
+
+    def _worker(i: int):
+        ops[i] = asyncio.run(_concurrent(service, sessions // threads, turns, prefix=f"t{i}"))
+
+    workers = [threading.Thread(target=_worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    async def _count_events() -> int:
+        total = 0
+        for i in range(threads):
+            for j in range(sessions // threads):
+                listed = await service.list_sessions(app_name=APP, user_id=f"t{i}_{j}")
+                for s in listed.sessions:
+                    session = await service.get_session(app_name=APP, user_id=s.user_id, session_id=s.id)
+                    total += len(session.events)
+        return total
+
+    expected = (sessions // threads) * threads * turns * 2
+    return sum(ops) / elapsed, expected - asyncio.run(_count_events())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Session service append/get throughput under concurrency.")
+    parser.add_argument("--turns", type=int, default=20, help="Turns per session.")
+    parser.add_argument("--shards", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    services = {
+        "stock": InMemorySessionService,
+        f"sharded x{args.shards}": lambda: ShardedInMemorySessionService(num_shards=args.shards),
+    }
+    print(f"one event loop, {args.turns} turns per session (ops = appends + gets per second)")
+    print(f"{'sessions':>8} " + " ".join(f"{name:>14}" for name in services))
+    for sessions in (1, 4, 16, 64, 256):
+        rates = [bench_event_loop(make(), sessions, args.turns) for make in services.values()]
+        print(f"{sessions:>8} " + " ".join(f"{rate:>14.0f}" for rate in rates))
+
+    print(f"\n{args.threads} threads, one event loop each")
+    print(f"{'sessions':>8} " + " ".join(f"{name + ' ops/s':>20} {'lost':>5}" for name in services))
+    for sessions in (args.threads, 64, 256):
+        row = [bench_threads(make(), args.threads, sessions, args.turns) for make in services.values()]
+        print(f"{sessions:>8} " + " ".join(f"{rate:>20.0f} {lost:>5}" for rate, lost in row))
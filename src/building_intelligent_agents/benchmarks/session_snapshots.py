@@ -0,0 +1,82 @@
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import BaseSessionService, InMemorySessionService
+from google.genai.types import Content, FunctionResponse, Part
+
+from building_intelligent_agents.sessions import ShardedInMemorySessionService
+
+# get_session latency and memory allocated per read for sessions whose events carry
+# large tool responses (like the OpenAPI payloads of chapter7's petstore/spotify tools):
+# the stock InMemorySessionService and ShardedInMemorySessionService with deep copies
+# both copy every event on every read; snapshots share them.
+
+APP = "SnapshotBench"
+
+
+def _pets(i: int, count: int) -> dict:
+    return {
+        "pets": [
+            {"id": i * count + j, "name": f"pet-{j}", "status": "available", "tags": [{"id": j, "name": "friendly"}]}
+            for j in range(count)
+        ]
+    }
+
+
+async def _fill(service: BaseSessionService, events: int, payload_items: int):
+    session = await service.create_session(app_name=APP, user_id="u")
+    for i in range(events):
+        await service.append_event(
+            session,
+            Event(
+                invocation_id=f"inv_{i}",
+                author="petstore_agent",
+                content=Content(
+                    role="user",
+                    parts=[Part(function_response=FunctionResponse(name="findPetsByStatus", response=_pets(i, payload_items)))],
+                ),
+                actions=EventActions(state_delta={"calls": i}),
+            ),
+        )
+    return session
+
+
+async def _measure(service: BaseSessionService, events: int, payload_items: int, repeat: int) -> tuple[float, float]:
+    """(ms per read, KiB allocated per read)."""
+    session = await _fill(service, events, payload_items)
+    key = dict(app_name=APP, user_id="u", session_id=session.id)
+    await service.get_session(**key)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await service.get_session(**key)
+    latency_ms = (time.perf_counter() - start) * 1000 / repeat
+
+    tracemalloc.start()
+    snapshot = await service.get_session(**key)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(snapshot.events) == events
+    return latency_ms, allocated / 1024
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deep-copy vs snapshot session reads.")
+    parser.add_argument("--payload-items", type=int, default=20, help="Pets in each tool response.")
+    parser.add_argument("--repeat", type=int, default=10, help="Reads timed per measurement.")
+    args = parser.parse_args()
+
+    services = {
+        "stock": InMemorySessionService,
+        "sharded, deep copy": lambda: ShardedInMemorySessionService(copy_events_on_read=True),
+        "sharded, snapshot": ShardedInMemorySessionService,
+    }
+    print(f"tool responses with {args.payload_items} pets each")
+    print(f"{'service':<20} {'events':>7} {'ms/read':>10} {'KiB/read':>10}")
+    for events in (100, 1000):
+        for name, make in services.items():
+            latency_ms, kib = asyncio.run(_measure(make(), events, args.payload_items, args.repeat))
+            print(f"{name:<20} {events:>7} {latency_ms:>10.3f} {kib:>10.1f}")
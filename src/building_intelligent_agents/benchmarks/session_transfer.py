@@ -0,0 +1,115 @@
+import argparse
+import asyncio
+import os
+import resource
+import tempfile
+import time
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import Session
+from google.genai.types import Content, Part
+from pydantic_core import to_json
+
+from building_intelligent_agents.sessions import SqliteSessionService, export_sessions, import_sessions
+from building_intelligent_agents.sessions.jsonl import FORMAT, VERSION, encode_session_lines
+
+# Throughput and peak memory of moving a large session corpus through the JSONL format
+# (sessions/jsonl.py): a synthetic export file is imported into a SqliteSessionService
+# and exported back out. Import uses SqliteSessionService.restore_session (one
+# transaction per session); the "replay" row imports a slice of the corpus through
+# create_session + append_event instead, as for services without restore_session.
+
+APP = "TransferBench"
+
+
+def _write_corpus(path: str, sessions: int, events_per_session: int) -> int:
+    """Writes the export file one session at a time; returns its size."""
+    with open(path, "wb") as f:
+        f.write(to_json({"format": FORMAT, "version": VERSION}) + b"\n")
+        for i in range(sessions):
+            events = [
+                Event(
+                    invocation_id=f"inv_{j // 2}",
+                    author="user" if j % 2 == 0 else "support_agent",
+                    content=Content(role="user" if j % 2 == 0 else "model", parts=[Part(text=f"Message {j} " * 8)]),
+                    actions=EventActions(state_delta={"turns": j // 2 + 1}),
+                    timestamp=1.7e9 + i + j / 1000,
+                )
+                for j in range(events_per_session)
+            ]
+            f.write(
+                encode_session_lines(
+                    Session(
+                        app_name=APP, user_id=f"user_{i % 1000}", id=f"session_{i}",
+                        state={"turns": events_per_session // 2}, events=events, last_update_time=events[-1].timestamp,
+                    )
+                )
+            )
+        return f.tell()
+
+
+class _ReplayOnly:
+    """Hides restore_session, so import falls back to create_session + append_event."""
+
+    def __init__(self, service: SqliteSessionService):
+        self._service = service
+
+    def __getattr__(self, name):
+        if name == "restore_session":
+            raise AttributeError(name)
+        return getattr(self._service, name)
+
+
+def _slice(path: str, out: str, sessions: int):
+    with open(path, "rb") as f, open(out, "wb") as o:
+        for line in f:
+            o.write(line)
+            if line.startswith(b'{"type":"end"'):
+                sessions -= 1
+                if sessions == 0:
+                    break
+
+
+def _peak_rss_mib() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JSONL session import/export throughput.")
+    parser.add_argument("--sessions", type=int, default=10_000)
+    parser.add_argument("--events", type=int, default=100, help="Events per session.")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--replay-sessions", type=int, default=100, help="Sessions imported by replay.")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="adk-transfer-")
+    print(f"peak RSS after imports: {_peak_rss_mib():.0f} MiB")
+    corpus = os.path.join(directory, "corpus.jsonl")
+    start = time.perf_counter()
+    size = _write_corpus(corpus, args.sessions, args.events)
+    print(
+        f"corpus: {args.sessions} sessions x {args.events} events, {size / 2**20:.0f} MiB,"
+        f" written in {time.perf_counter() - start:.1f}s; peak RSS {_peak_rss_mib():.0f} MiB"
+    )
+
+    print(f"{'phase':<8} {'sessions':>9} {'events':>10} {'seconds':>8} {'events/s':>10} {'MiB/s':>7} {'peak RSS MiB':>13}")
+
+    def report(phase, result):
+        print(
+            f"{phase:<8} {result.sessions:>9} {result.events:>10} {result.seconds:>8.1f} {result.events_per_second:>10.0f}"
+            f" {result.bytes / 2**20 / result.seconds:>7.1f} {_peak_rss_mib():>13.0f}"
+        )
+
+    service = SqliteSessionService(os.path.join(directory, "sessions.db"))
+    report("import", asyncio.run(import_sessions(service, corpus, workers=args.workers)))
+    report(
+        "export",
+        asyncio.run(export_sessions(service, os.path.join(directory, "export.jsonl"), app_name=APP, workers=args.workers)),
+    )
+    service.close()
+
+    replay_corpus = os.path.join(directory, "replay.jsonl")
+    _slice(corpus, replay_corpus, args.replay_sessions)
+    replay_service = SqliteSessionService(os.path.join(directory, "replay.db"))
+    report("replay", asyncio.run(import_sessions(_ReplayOnly(replay_service), replay_corpus, workers=args.workers)))
+    replay_service.close()
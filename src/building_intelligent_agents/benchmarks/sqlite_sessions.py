@@ -0,0 +1,101 @@
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import BaseSessionService, DatabaseSessionService
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.genai.types import Content, Part
+
+from building_intelligent_agents.sessions import SqliteSessionService
+
+# Mixed read/write load on a SQLite session store: writer tasks append events to their
+# sessions while reader tasks fetch the last N events of random sessions and list a
+# user's sessions, as a UI polling conversations next to live agents does. Reports
+# append and read throughput and read latency for the stock DatabaseSessionService (the
+# setup of chapter16/custom_runner_setup.py) and for SqliteSessionService.
+
+APP = "SqliteBench"
+
+
+def _event(i: int) -> Event:
+    return Event(
+        invocation_id=f"inv_{i}",
+        author="assistant",
+        content=Content(role="model", parts=[Part(text=f"Reply number {i}. " * 8)]),
+        actions=EventActions(state_delta={"turns": i, "user:last_turn": i}),
+    )
+
+
+async def _measure(service: BaseSessionService, writers: int, readers: int, seconds: float, history: int) -> dict:
+    sessions = [await service.create_session(app_name=APP, user_id=f"u_{i}") for i in range(writers)]
+    for session in sessions:
+        for i in range(history):
+            await service.append_event(session, _event(i))
+
+    appended = 0
+    latencies: list[float] = []
+    deadline = time.perf_counter() + seconds
+
+    async def _write(session):
+        nonlocal appended
+        i = history
+        while time.perf_counter() < deadline:
+            await service.append_event(session, _event(i))
+            appended += 1
+            i += 1
+            await asyncio.sleep(0)
+
+    async def _read(r: int):
+        config = GetSessionConfig(num_recent_events=20)
+        n = r
+        while time.perf_counter() < deadline:
+            session = sessions[n % len(sessions)]
+            start = time.perf_counter()
+            if n % 5 == 0:
+                await service.list_sessions(app_name=APP, user_id=session.user_id)
+            else:
+                fetched = await service.get_session(
+                    app_name=APP, user_id=session.user_id, session_id=session.id, config=config
+                )
+                assert len(fetched.events) == 20
+            latencies.append((time.perf_counter() - start) * 1000)
+            n += 7
+            await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_write(s) for s in sessions), *(_read(r) for r in range(readers)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "appends/s": appended / elapsed,
+        "reads/s": len(latencies) / elapsed,
+        "read p50 ms": statistics.median(latencies),
+        "read p95 ms": latencies[int(len(latencies) * 0.95)],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mixed read/write load on SQLite session services.")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration of each run.")
+    parser.add_argument("--writers", type=int, default=8, help="Sessions being appended to.")
+    parser.add_argument("--readers", type=int, default=8, help="Concurrent reader tasks.")
+    parser.add_argument("--history", type=int, default=200, help="Events per session before the run.")
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers, {args.readers} readers, {args.history} events of history, {args.seconds:g}s per run")
+    columns = ("appends/s", "reads/s", "read p50 ms", "read p95 ms")
+    print(f"{'service':<28} " + " ".join(f"{c:>12}" for c in columns))
+    with tempfile.TemporaryDirectory() as workdir:
+        services = {
+            "DatabaseSessionService": lambda: DatabaseSessionService(
+                db_url=f"sqlite:///{os.path.join(workdir, 'stock.db')}"
+            ),
+            "SqliteSessionService": lambda: SqliteSessionService(os.path.join(workdir, "wal.db"), readers=4),
+        }
+        for name, make in services.items():
+            result = asyncio.run(_measure(make(), args.writers, args.readers, args.seconds, args.history))
+            print(f"{name:<28} " + " ".join(f"{result[c]:>12.1f}" for c in columns))
@@ -0,0 +1,114 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+# Cold-start cost of importing the package's modules, measured like a serverless cold
+# start: every target runs in a fresh interpreter with `-X importtime`, and the report
+# shows the wall time, the cumulative import time and the heaviest imports it pulled in.
+# With a budget the run fails (exit code 1) when any target exceeds it, so this can run
+# in CI:
+#
+#   python -m benchmarks.startup --budget-ms 1500
+#   python -m benchmarks.startup building_intelligent_agents.chapter7 --budget building_intelligent_agents.chapter7=200
+#   python -m benchmarks.startup --agent chapter1   # import and build one registered agent
+
+DEFAULT_TARGETS = [
+    "building_intelligent_agents",
+    "building_intelligent_agents.agent_registry",
+    "building_intelligent_agents.utils",
+    "building_intelligent_agents.chapter1",
+    "building_intelligent_agents.chapter7",
+    "building_intelligent_agents.chapter9.container_executor_agent",
+    "building_intelligent_agents.chapter10.litellm_self_hosted_agent",
+]
+
+
+@dataclass
+class ImportReport:
+    target: str
+    wall_ms: float = 0.0
+    import_ms: float = 0.0
+    # (cumulative ms, module) of the heaviest imports, most expensive first.
+    heaviest: list[tuple[float, str]] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, float, float, int]]:
+    """(module, self ms, cumulative ms, nesting depth) for each `-X importtime` line."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        # Nested imports are indented by two spaces per level.
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((name.strip(), float(self_us) / 1000, float(cumulative_us) / 1000, depth))
+    return rows
+
+
+def measure(code: str, target: str, top: int) -> ImportReport:
+    report = ImportReport(target=target)
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, env=os.environ.copy()
+    )
+    report.wall_ms = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        report.error = (result.stderr.strip().splitlines() or ["failed"])[-1]
+        return report
+    rows = parse_importtime(result.stderr)
+    # Top-level rows (depth 0) are what the interpreter imported for the target,
+    # including interpreter startup (encodings, site) which is the same for every run.
+    report.import_ms = sum(cumulative for _, _, cumulative, depth in rows if depth == 0)
+    report.heaviest = sorted(((cumulative, name) for name, _, cumulative, depth in rows if depth == 1), reverse=True)[:top]
+    return report
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Per-module import time with an optional budget.")
+    parser.add_argument("targets", nargs="*", help="Modules to import (default: the package and chapter entry points).")
+    parser.add_argument("--agent", action="append", default=[], help="Also import and build this registered agent.")
+    parser.add_argument("--budget-ms", type=float, help="Fail if any target's import time exceeds this.")
+    parser.add_argument("--budget", action="append", default=[], metavar="TARGET=MS", help="Budget for one target.")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest imports to list per target.")
+    args = parser.parse_args(argv)
+
+    budgets = {}
+    for spec in args.budget:
+        target, _, ms = spec.rpartition("=")
+        budgets[target] = float(ms)
+
+    jobs = [(target, f"import {target}") for target in args.targets or DEFAULT_TARGETS]
+    jobs += [
+        (f"agent:{name}", f"from building_intelligent_agents.agent_registry import agent_registry; agent_registry.get({name!r})")
+        for name in args.agent
+    ]
+
+    failed = []
+    print(f"{'target':<66} {'wall ms':>9} {'import ms':>10} {'budget':>8}")
+    for target, code in jobs:
+        report = measure(code, target, args.top)
+        budget = budgets.get(target, args.budget_ms)
+        if report.error:
+            print(f"{target:<66} {'error':>9}  {report.error}")
+            continue
+        over = budget is not None and report.import_ms > budget
+        if over:
+            failed.append(target)
+        budget_text = "" if budget is None else f"{budget:.0f}{' !' if over else ''}"
+        print(f"{target:<66} {report.wall_ms:>9.0f} {report.import_ms:>10.0f} {budget_text:>8}")
+        for cumulative, name in report.heaviest:
+            print(f"    {name:<62} {cumulative:>20.1f}")
+
+    if failed:
+        print(f"\nImport-time budget exceeded by: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
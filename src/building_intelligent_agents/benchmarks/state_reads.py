@@ -0,0 +1,72 @@
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import BaseSessionService
+from google.genai.types import Content, Part
+
+from building_intelligent_agents.sessions import (
+    FastReadDatabaseSessionService,
+    SessionReadConfig,
+    ShardedInMemorySessionService,
+    SqliteSessionService,
+)
+
+# Cost of polling a session during a run (as chapter13/loop_refinement.py does after
+# every event) as its history grows: a full get_session, get_state, and the last 10
+# events, per backend. get_state and the tail read should stay flat.
+
+APP = "StateReadBench"
+
+
+async def _fill(service: BaseSessionService, events: int):
+    session = await service.create_session(app_name=APP, user_id="u", state={"topic": "ADK"})
+    for i in range(events):
+        await service.append_event(
+            session,
+            Event(
+                invocation_id=f"inv_{i}",
+                author="draft_refiner",
+                content=Content(role="model", parts=[Part(text=f"Draft number {i}. " * 8)]),
+                actions=EventActions(state_delta={"loop_iteration": i}),
+            ),
+        )
+    return session
+
+
+async def _time_ms(read, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await read()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+async def _measure(service: BaseSessionService, events: int, repeat: int) -> list[float]:
+    session = await _fill(service, events)
+    key = dict(app_name=APP, user_id="u", session_id=session.id)
+    return [
+        await _time_ms(lambda: service.get_session(**key), repeat),
+        await _time_ms(lambda: service.get_state(**key), repeat),
+        await _time_ms(lambda: service.get_session(**key, config=SessionReadConfig(num_recent_events=10)), repeat),
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Full vs state-only vs tail session reads.")
+    parser.add_argument("--repeat", type=int, default=20, help="Reads timed per measurement.")
+    args = parser.parse_args()
+
+    print(f"{'backend':<16} {'events':>7} {'get_session ms':>15} {'get_state ms':>13} {'last 10 ms':>11}")
+    with tempfile.TemporaryDirectory() as workdir:
+        backends = {
+            "sharded": lambda n: ShardedInMemorySessionService(),
+            "sqlite": lambda n: SqliteSessionService(os.path.join(workdir, f"wal_{n}.db")),
+            "database": lambda n: FastReadDatabaseSessionService(f"sqlite:///{os.path.join(workdir, f'db_{n}.db')}"),
+        }
+        for name, make in backends.items():
+            for events in (10, 100, 1000):
+                full, state, tail = asyncio.run(_measure(make(events), events, args.repeat))
+                print(f"{name:<16} {events:>7} {full:>15.3f} {state:>13.3f} {tail:>11.3f}")
@@ -0,0 +1,146 @@
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Optional
+
+from google.adk.agents import Agent
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.sessions import InMemorySessionService
+from google.genai.types import Content, Part
+
+from building_intelligent_agents.fake_llm import FakeLlm
+from building_intelligent_agents.run_config import ExtendedRunConfig
+from building_intelligent_agents.streaming import StreamingOptions, StreamingRunner
+from building_intelligent_agents.utils import SessionSpec, create_sessions_bulk
+
+# Events/sec and CPU per streamed response for many concurrent SSE streams, with and
+# without chunk coalescing. The consumer does what an SSE gateway does for every
+# event it receives: serialize it and frame it as "data: ...".
+
+
+def _make_runner(response_tokens: int, tokens_per_sec: float) -> StreamingRunner:
+    agent = Agent(
+        name="streaming_story_teller",
+        model=FakeLlm(model="fake", ttft_ms=50, tokens_per_sec=tokens_per_sec, response_tokens=response_tokens),
+        instruction="You are a storyteller. Respond with a detailed story.",
+    )
+    return StreamingRunner(agent=agent, app_name="StreamBench", session_service=InMemorySessionService())
+
+
+async def _stream(
+    runner: StreamingRunner, spec: SessionSpec, run_config: RunConfig, consumer_delay_ms: float
+) -> dict[str, float]:
+    """Consumes one response; returns its frame count, gateway time, TTFT and chunk gaps."""
+    frames = 0
+    gateway_s = 0.0
+    ttft_ms = None
+    gaps = []
+    start = last = time.perf_counter()
+    async for event in runner.run_async(
+        user_id=spec.user_id, session_id=spec.session_id,
+        new_message=Content(role="user", parts=[Part(text="Tell me a story.")]), run_config=run_config,
+    ):
+        received = time.perf_counter()
+        if event.partial:
+            if ttft_ms is None:
+                ttft_ms = (received - start) * 1000
+            else:
+                gaps.append((received - last) * 1000)
+            last = received
+        frame = f"data: {event.model_dump_json(exclude_none=True)}\n\n".encode("utf-8")
+        frames += bool(frame)
+        gateway_s += time.perf_counter() - received
+        if consumer_delay_ms:
+            await asyncio.sleep(consumer_delay_ms / 1000)
+    gaps.sort()
+    return {
+        "frames": frames,
+        "gateway_ms": gateway_s * 1000,
+        "ttft_ms": ttft_ms or 0.0,
+        "gap_ms_p95": gaps[int(0.95 * (len(gaps) - 1))] if gaps else 0.0,
+    }
+
+
+async def _close_early(buffered: int, timeout: float = 5.0) -> float:
+    """Seconds to close a stream after one event while its buffer is full; fails on a hang."""
+    runner = _make_runner(response_tokens=400, tokens_per_sec=100_000.0)
+    spec = SessionSpec(user_id="u_close", session_id="s_close")
+    await create_sessions_bulk(runner, [spec])
+    run_config = ExtendedRunConfig(
+        streaming_mode=StreamingMode.SSE, streaming=StreamingOptions(max_buffered_events=buffered)
+    )
+    stream = runner.run_async(
+        user_id=spec.user_id, session_id=spec.session_id,
+        new_message=Content(role="user", parts=[Part(text="Tell me a story.")]), run_config=run_config,
+    )
+    await stream.__anext__()
+    # Let the producer fill the buffer and block on it.
+    await asyncio.sleep(0.2)
+    start = time.perf_counter()
+    await asyncio.wait_for(stream.aclose(), timeout)
+    return time.perf_counter() - start
+
+
+async def _measure(
+    streams: int, response_tokens: int, tokens_per_sec: float,
+    options: Optional[StreamingOptions], consumer_delay_ms: float = 0.0,
+) -> dict[str, float]:
+    runner = _make_runner(response_tokens, tokens_per_sec)
+    specs = [SessionSpec(user_id=f"u_{i}", session_id=f"s_{i}") for i in range(streams)]
+    await create_sessions_bulk(runner, specs)
+    run_config = ExtendedRunConfig(streaming_mode=StreamingMode.SSE, streaming=options)
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    results = await asyncio.gather(*(_stream(runner, spec, run_config, consumer_delay_ms) for spec in specs))
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    events = sum(r["frames"] for r in results)
+    summary = {
+        "events": events,
+        "events_per_sec": events / wall,
+        "gateway_cpu_ms_per_response": statistics.fmean(r["gateway_ms"] for r in results),
+        "cpu_ms_per_response": cpu / streams * 1000,
+        "ttft_ms_p50": statistics.median(r["ttft_ms"] for r in results),
+        "gap_ms_p95": statistics.median(r["gap_ms_p95"] for r in results),
+    }
+    if options is not None:
+        records = [runner.latest_stream_metrics(spec.session_id).to_record() for spec in specs]
+        summary["producer_blocked_ms"] = statistics.fmean(r["producer_blocked_ms"] for r in records)
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SSE streaming coalescing benchmark.")
+    parser.add_argument("--streams", type=int, default=32, help="Concurrent streamed responses.")
+    parser.add_argument("--response-tokens", type=int, default=400)
+    parser.add_argument("--tokens-per-sec", type=float, default=400.0, help="Generation speed per stream.")
+    args = parser.parse_args()
+
+    modes = [
+        ("raw partials", None),
+        ("lockstep, no coalescing", StreamingOptions()),
+        ("buffered 64, no coalescing", StreamingOptions(max_buffered_events=64)),
+        ("coalesce 256 B", StreamingOptions(coalesce_bytes=256)),
+        ("coalesce 100 ms", StreamingOptions(coalesce_ms=100)),
+        ("coalesce 256 B | 100 ms", StreamingOptions(coalesce_bytes=256, coalesce_ms=100)),
+    ]
+    print(f"{args.streams} concurrent streams x {args.response_tokens} tokens at {args.tokens_per_sec:.0f} tokens/s")
+    print(f"{'mode':<26} {'events':>7} {'events/s':>9} {'gateway cpu ms':>15} {'total cpu ms':>13} "
+          f"{'ttft p50':>9} {'gap p95':>8}")
+    for label, options in modes:
+        r = asyncio.run(_measure(args.streams, args.response_tokens, args.tokens_per_sec, options))
+        print(f"{label:<26} {r['events']:>7} {r['events_per_sec']:>9.0f} {r['gateway_cpu_ms_per_response']:>15.2f} "
+              f"{r['cpu_ms_per_response']:>13.2f} {r['ttft_ms_p50']:>9.1f} {r['gap_ms_p95']:>8.1f}")
+    print("(cpu columns are per streamed response; gateway cpu is the time spent framing events)")
+
+    # A consumer that takes 10 ms per event cannot keep up with 400 tokens/s; a small
+    # buffer makes the producer wait instead of queueing the whole response.
+    print("\nslow consumer (10 ms per event), no coalescing:")
+    for buffered in (1, 8, 1024):
+        r = asyncio.run(_measure(4, args.response_tokens, args.tokens_per_sec,
+                                 StreamingOptions(max_buffered_events=buffered), consumer_delay_ms=10.0))
+        print(f"  max_buffered_events={buffered:<5} producer blocked {r['producer_blocked_ms']:.0f} ms per stream")
+
+    # Closing a stream early (a client disconnecting) must not wait for the producer.
+    for buffered in (1, 8):
+        seconds = asyncio.run(_close_early(buffered))
+        print(f"  closed early with a full buffer of {buffered}: {seconds * 1000:.1f} ms")
@@ -1 +1,4 @@
-from .simple_assistant import simple_assistant_agent as root_agent
\ No newline at end of file
+# root_agent is built on first access, so importing the package stays cheap.
+from building_intelligent_agents.agent_registry import agent_registry
+__getattr__ = agent_registry.module_getattr(root_agent="chapter1")
+#from .simple_assistant import simple_assistant_agent as root_agent
\ No newline at end of file
@@ -8,8 +8,11 @@ except ImportError:
 from google.adk.runners import InMemoryRunner
 from google.genai.types import Content, Part
 import os
+from typing import Optional
+
 import requests
 
+from building_intelligent_agents.agent_registry import agent_registry
 from building_intelligent_agents.utils import create_session
 
 # Assume you have a self-hosted LLM (e.g., using TGI or vLLM)
@@ -20,8 +23,16 @@ SELF_HOSTED_API_BASE = os.getenv("MY_SELF_HOSTED_LLM_API_BASE", "<http://localho
 # For TGI/vLLM, it's often just the "model" you want to hit at that endpoint.
 SELF_HOSTED_MODEL_NAME = os.getenv("MY_SELF_HOSTED_LLM_MODEL_NAME", "custom/my-model")
 
-self_hosted_agent = None
-if LITELLM_AVAILABLE:
+def build_self_hosted_agent() -> Optional[Agent]:
+    """
+    Checks that the endpoint is up and builds the agent. Kept out of module import so
+    importing this module makes no network calls; use
+    `agent_registry.get("chapter10.self_hosted")` (or access `self_hosted_agent`).
+    """
+    if not LITELLM_AVAILABLE:
+        print("Skipping LiteLLM self-hosted example as LiteLLM library is not available.")
+        return None
+
     # Check if the self-hosted endpoint is accessible
     endpoint_running = False
     try:
@@ -55,12 +66,21 @@ if LITELLM_AVAILABLE:
                 instruction="You are an assistant powered by a self-hosted LLM."
             )
             print("Self-hosted LLM agent (via LiteLLM) initialized.")
+            return self_hosted_agent
         except Exception as e:
             print(f"Error initializing LiteLlm agent for self-hosted endpoint: {e}")
-else:
-    print("Skipping LiteLLM self-hosted example as LiteLLM library is not available.")
+    return None
+
+
+def __getattr__(name: str):
+    # `self_hosted_agent` is built on first access rather than at import.
+    if name == "self_hosted_agent":
+        return agent_registry.get("chapter10.self_hosted")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == "__main__":
+    self_hosted_agent = build_self_hosted_agent()
     if self_hosted_agent:
         runner = InMemoryRunner(agent=self_hosted_agent, app_name="LiteLLM_SelfHosted_App")
         user_id="selfhost_user"
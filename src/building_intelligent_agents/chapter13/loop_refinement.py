@@ -1,9 +1,11 @@
 from google.adk.agents import Agent, LoopAgent # Import LoopAgent
 from google.adk.tools import FunctionTool, ToolContext, exit_loop # Import exit_loop
-from google.adk.runners import InMemoryRunner
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.runners import Runner
 from google.genai.types import Content, Part
 import asyncio
 
+from building_intelligent_agents.sessions import ShardedInMemorySessionService, get_session_state
 from building_intelligent_agents.utils import load_environment_variables, create_session, DEFAULT_LLM
 load_environment_variables()
 
@@ -49,7 +51,14 @@ iterative_refinement_loop = LoopAgent(
 
 # --- Running the LoopAgent ---
 if __name__ == "__main__":
-    runner = InMemoryRunner(agent=iterative_refinement_loop, app_name="LoopRefineApp")
+    # Same services as InMemoryRunner, with a session service whose get_state reads only the
+    # state, so peeking at it after every event does not copy the whole history.
+    runner = Runner(
+        agent=iterative_refinement_loop,
+        app_name="LoopRefineApp",
+        session_service=ShardedInMemorySessionService(),
+        artifact_service=InMemoryArtifactService(),
+    )
     session_id = "s_loop_refine"
     user_id = "loop_user"
 
@@ -75,10 +84,10 @@ if __name__ == "__main__":
             # A better way for LoopAgent might be an initial context-setting agent before the loop.
             # For this example, we'll have the drafting_agent look for 'current_draft' in state.
         ):
-            current_session = await runner.session_service.get_session(
-                app_name="LoopRefineApp", user_id=user_id, session_id=session_id
+            current_state = await get_session_state(
+                runner.session_service, app_name="LoopRefineApp", user_id=user_id, session_id=session_id
             )
-            print(f"  EVENT from [{event.author}] (Loop Iteration {current_session.state.get('loop_iteration', 0)}):") # HACK: Peeking into state
+            print(f"  EVENT from [{event.author}] (Loop Iteration {current_state.get('loop_iteration', 0)}):") # HACK: Peeking into state
             if event.actions and event.actions.escalate:
                 print("    ESCALATE signal received. Loop will terminate.")
 
@@ -91,6 +100,6 @@ if __name__ == "__main__":
 
         print("\n--- Final Output from Loop (last substantive text from sub-agent) ---")
 
-        print(f"\nFinal session state: {current_session.state}")
+        print(f"\nFinal session state: {current_state}")
 
     asyncio.run(main())
\ No newline at end of file
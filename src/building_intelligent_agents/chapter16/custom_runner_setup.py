@@ -39,6 +39,11 @@ DATABASE_URL = os.getenv("ADK_DATABASE_URL", "sqlite:///./adk_sessions_chapter15
 if GOOGLE_CLOUD_PROJECT and GCS_BUCKET_NAME and DATABASE_URL:
     try:
         db_session_svc = DatabaseSessionService(db_url=DATABASE_URL)
+        # Under concurrent load, commit appended events in batches instead of one transaction each
+        # (from building_intelligent_agents.sessions import GroupCommitDatabaseSessionService):
+        # db_session_svc = GroupCommitDatabaseSessionService(db_url=DATABASE_URL, max_batch_delay_ms=5)
+        # Or, on a single node, SQLite in WAL mode with a reader pool (SqliteSessionService):
+        # db_session_svc = SqliteSessionService(DATABASE_URL, readers=4)
         gcs_artifact_svc = GcsArtifactService(bucket_name=GCS_BUCKET_NAME, project=GOOGLE_CLOUD_PROJECT)
         # memory_svc_persistent = VertexAiRagMemoryService(...) # Or other persistent memory
 
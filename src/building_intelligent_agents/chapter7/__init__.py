@@ -1,4 +1,7 @@
-from .calendar_agent import calendar_agent as root_agent
+# root_agent is built on first access, so importing the package stays cheap.
+from building_intelligent_agents.agent_registry import agent_registry
+__getattr__ = agent_registry.module_getattr(root_agent="chapter7")
+#from .calendar_agent import calendar_agent as root_agent
 #from .apihub_agent import apihub_connected_agent as root_agent
 #from .openapi_petstore_agent import petstore_agent as root_agent
 #from .spotify_agent import spotify_agent as root_agent
\ No newline at end of file
@@ -1,12 +1,12 @@
 import asyncio
 
 from google.adk.agents import Agent
-from google.adk.tools.openapi_tool import OpenAPIToolset
 from google.adk.auth import AuthCredential, AuthCredentialTypes
 from fastapi.openapi.models import APIKey, APIKeyIn
 from google.adk.runners import InMemoryRunner
 from google.genai.types import Content, Part
 
+from building_intelligent_agents.rate_limiter import AdaptiveRateLimiter, RateLimitedOpenAPIToolset
 from building_intelligent_agents.utils import load_environment_variables, create_session, DEFAULT_LLM
 load_environment_variables()
 
@@ -142,7 +142,12 @@ spotify_api_key_credential = AuthCredential(
 )
 
 # --- Toolset Setup ---
-spotify_toolset = OpenAPIToolset(
+# Spotify's limits are per app token, so calls share one adaptive limiter: it slows down
+# on 429 responses (honoring Retry-After) and speeds back up while calls succeed.
+spotify_rate_limiter = AdaptiveRateLimiter(rate=5, max_rate=20)
+
+spotify_toolset = RateLimitedOpenAPIToolset(
+    spotify_rate_limiter,
     spec_str=SPOTIFY_API_SPEC_STR,
     spec_str_type="yaml",
     auth_scheme=spotify_api_key_auth_scheme,
@@ -213,7 +218,6 @@ if __name__ == "__main__":
                         if part.text:
                             print(part.text, end="", flush=True)
             print("\n" + "-" * 70) # Separator for readability
-            # Optional: Add a small delay if you're making many API calls in a loop
-            await asyncio.sleep(1) # Helps avoid hitting rate limits if prompts are processed very fast
+        print(f"Rate limiter: {spotify_rate_limiter.stats()}")
 
     asyncio.run(main_loop())
\ No newline at end of file
@@ -11,14 +11,22 @@ from google.adk.runners import InMemoryRunner
 from google.genai.types import Content, Part
 import os
 import atexit # To ensure container cleanup
+from typing import Optional
 
+from building_intelligent_agents.agent_registry import agent_registry
 from building_intelligent_agents.utils import load_environment_variables, create_session, DEFAULT_LLM
 load_environment_variables()
 
-container_agent = None
-container_executor_instance = None # To manage its lifecycle
+def build_container_agent() -> Optional[Agent]:
+    """
+    Builds the Docker image and the agent. Kept out of module import because building
+    the image takes minutes; use `agent_registry.get("chapter9.container")` (or access
+    `container_agent`) to build it once per process.
+    """
+    if not DOCKER_AVAILABLE:
+        print("Skipping ContainerCodeExecutor example as Docker SDK is not available.")
+        return None
 
-if DOCKER_AVAILABLE:
     # Option 1: Use a pre-existing Python image from Docker Hub
     # container_executor_instance = ContainerCodeExecutor(image="python:3.10-slim")
 
@@ -66,14 +74,21 @@ if DOCKER_AVAILABLE:
 
         # atexit.register(cleanup_container)
 
+        return container_agent
     except Exception as e:
         print(f"Failed to initialize ContainerCodeExecutor. Is Docker running and configured? Error: {e}")
-        container_agent = None # Fallback
-else:
-    print("Skipping ContainerCodeExecutor example as Docker SDK is not available.")
+        return None # Fallback
+
+
+def __getattr__(name: str):
+    # `container_agent` is built on first access rather than at import.
+    if name == "container_agent":
+        return agent_registry.get("chapter9.container")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
+    container_agent = build_container_agent()
     if not container_agent:
         print("Container Agent not initialized. Exiting.")
     else:
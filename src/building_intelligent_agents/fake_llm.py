@@ -0,0 +1,242 @@
+import asyncio
+import json
+import os
+import random
+import re
+from typing import Any, AsyncGenerator, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from pydantic import Field
+
+from building_intelligent_agents.tokens import estimate_request_tokens, estimate_tokens
+
+# An offline, deterministic stand-in for a real model, used for load testing and
+# profiling without network access. It is registered with the LLMRegistry in
+# building_intelligent_agents.utils, so any agent built with DEFAULT_LLM picks it up:
+#
+#   DEFAULT_LLM=fake python -m building_intelligent_agents.chapter5.calculator
+#
+# Model names "fake" and "fake-<anything>" resolve to FakeLlm. Built-in tools such as
+# google_search check the model name, so "fake-gemini-2.0-flash" keeps them working.
+#
+# Behaviour is configured through environment variables (or the matching fields when
+# constructing FakeLlm directly):
+#   FAKE_LLM_SEED                 Seed mixed into every response (default 0).
+#   FAKE_LLM_TTFT_MS              Delay before the first token (default 0).
+#   FAKE_LLM_TOKENS_PER_SEC       Generation speed, 0 means instant (default 0).
+#   FAKE_LLM_PREFILL_TOKENS_PER_SEC  Prompt processing speed, added to the time to
+#                                 first token; 0 means instant (default 0).
+#   FAKE_LLM_RESPONSE_TOKENS      Length of generated text answers (default 24).
+#   FAKE_LLM_ERROR_RATE           Probability of returning an error response (default 0).
+#   FAKE_LLM_FUNCTION_CALL_RATE   Probability of calling a tool when one is available (default 1).
+#   FAKE_LLM_SCRIPT               Path to a JSON script of canned responses (see below).
+#
+# A script is a list of rules. The first rule whose "match" regex is found in the
+# latest user message is used; a rule without "match" always applies. Each rule lists
+# the steps of one turn: step N answers the Nth model call since that user message.
+#
+#   [
+#     {"match": "plus", "steps": [
+#         {"function_call": {"name": "simple_calculator",
+#                            "args": {"operand1": 5, "operand2": 3, "operation": "add"}}},
+#         {"text": "5 plus 3 is 8."}]},
+#     {"steps": [{"error": {"code": "RESOURCE_EXHAUSTED", "message": "Quota exceeded."}}]}
+#   ]
+
+_WORDS = (
+    "agent", "tool", "session", "event", "state", "model", "response", "request",
+    "the", "a", "of", "to", "and", "is", "in", "for", "with", "on", "as", "by",
+    "result", "value", "user", "answer", "data", "quickly", "clearly", "here",
+)
+
+# Calling this with a made-up agent name would abort the run, so it is never chosen
+# at random. Scripts can still call it explicitly.
+_UNSCRIPTED_EXCLUDED_TOOLS = {"transfer_to_agent"}
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _load_script_from_env() -> Optional[list[dict[str, Any]]]:
+    path = os.getenv("FAKE_LLM_SCRIPT")
+    if not path:
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class FakeLlm(BaseLlm):
+    """A scripted or seeded offline model with configurable latency and error rate."""
+
+    seed: int = Field(default_factory=lambda: _env_int("FAKE_LLM_SEED", 0))
+    ttft_ms: float = Field(default_factory=lambda: _env_float("FAKE_LLM_TTFT_MS", 0.0))
+    tokens_per_sec: float = Field(default_factory=lambda: _env_float("FAKE_LLM_TOKENS_PER_SEC", 0.0))
+    prefill_tokens_per_sec: float = Field(default_factory=lambda: _env_float("FAKE_LLM_PREFILL_TOKENS_PER_SEC", 0.0))
+    response_tokens: int = Field(default_factory=lambda: _env_int("FAKE_LLM_RESPONSE_TOKENS", 24))
+    error_rate: float = Field(default_factory=lambda: _env_float("FAKE_LLM_ERROR_RATE", 0.0))
+    function_call_rate: float = Field(default_factory=lambda: _env_float("FAKE_LLM_FUNCTION_CALL_RATE", 1.0))
+    script: Optional[list[dict[str, Any]]] = Field(default_factory=_load_script_from_env)
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"fake", r"fake-.*"]
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        user_text, step, last_was_function_response = _turn_position(llm_request.contents)
+        rng = random.Random(f"{self.seed}|{self.model}|{user_text}|{step}")
+        usage = types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=estimate_request_tokens(llm_request),
+        )
+
+        delay = self.ttft_ms / 1000
+        if self.prefill_tokens_per_sec > 0:
+            delay += usage.prompt_token_count / self.prefill_tokens_per_sec
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        reply = self._scripted_step(user_text, step)
+        if reply is None:
+            reply = self._seeded_step(rng, llm_request, last_was_function_response)
+
+        if "error" in reply:
+            error = reply["error"]
+            yield LlmResponse(
+                error_code=error.get("code", "FAKE_ERROR"),
+                error_message=error.get("message", "Injected error from FakeLlm."),
+                usage_metadata=usage,
+            )
+            return
+
+        if "function_call" in reply:
+            call = reply["function_call"]
+            usage.candidates_token_count = estimate_tokens(json.dumps(call))
+            usage.total_token_count = usage.prompt_token_count + usage.candidates_token_count
+            await self._simulate_generation(usage.candidates_token_count)
+            yield LlmResponse(
+                content=types.Content(
+                    role="model",
+                    parts=[types.Part(function_call=types.FunctionCall(
+                        name=call["name"], args=call.get("args", {})
+                    ))],
+                ),
+                usage_metadata=usage,
+            )
+            return
+
+        tokens = reply["text"].split(" ")
+        usage.candidates_token_count = len(tokens)
+        usage.total_token_count = usage.prompt_token_count + usage.candidates_token_count
+        if stream:
+            for i, token in enumerate(tokens):
+                await self._simulate_generation(1)
+                yield LlmResponse(
+                    content=types.Content(role="model", parts=[types.Part(text=token if i == 0 else " " + token)]),
+                    partial=True,
+                )
+        else:
+            await self._simulate_generation(len(tokens))
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=reply["text"])]),
+            usage_metadata=usage,
+        )
+
+    async def _simulate_generation(self, token_count: int):
+        if self.tokens_per_sec > 0 and token_count > 0:
+            await asyncio.sleep(token_count / self.tokens_per_sec)
+
+    def _scripted_step(self, user_text: str, step: int) -> Optional[dict[str, Any]]:
+        if not self.script:
+            return None
+        for rule in self.script:
+            pattern = rule.get("match")
+            if pattern is None or re.search(pattern, user_text, re.IGNORECASE):
+                steps = rule.get("steps", [])
+                if not steps:
+                    return None
+                # Past the end of the script the last step is repeated, unless it is a
+                # function call, which would otherwise loop forever.
+                if step < len(steps):
+                    return steps[step]
+                return None if "function_call" in steps[-1] else steps[-1]
+        return None
+
+    def _seeded_step(
+        self, rng: random.Random, llm_request: LlmRequest, last_was_function_response: bool
+    ) -> dict[str, Any]:
+        if rng.random() < self.error_rate:
+            return {"error": {"code": "RESOURCE_EXHAUSTED", "message": "Injected error from FakeLlm."}}
+
+        declarations = [
+            d for d in _function_declarations(llm_request)
+            if d.name not in _UNSCRIPTED_EXCLUDED_TOOLS
+        ]
+        if declarations and not last_was_function_response and rng.random() < self.function_call_rate:
+            declaration = rng.choice(declarations)
+            return {"function_call": {"name": declaration.name, "args": _fake_args(rng, declaration.parameters)}}
+
+        words = [rng.choice(_WORDS) for _ in range(max(1, self.response_tokens))]
+        return {"text": " ".join(words).capitalize() + "."}
+
+
+def _turn_position(contents: list[types.Content]) -> tuple[str, int, bool]:
+    """Returns the latest user text, the model step within that turn, and whether the
+    last content is a function response."""
+    user_text = ""
+    step = 0
+    for content in reversed(contents):
+        parts = content.parts or []
+        texts = [p.text for p in parts if p.text]
+        if content.role == "user" and texts and not any(p.function_response for p in parts):
+            user_text = " ".join(texts)
+            break
+        if content.role == "model":
+            step += 1
+    last_was_function_response = bool(
+        contents and any(p.function_response for p in (contents[-1].parts or []))
+    )
+    return user_text, step, last_was_function_response
+
+
+def _function_declarations(llm_request: LlmRequest) -> list[types.FunctionDeclaration]:
+    if not llm_request.config or not llm_request.config.tools:
+        return []
+    declarations = []
+    for tool in llm_request.config.tools:
+        if isinstance(tool, types.Tool) and tool.function_declarations:
+            declarations.extend(tool.function_declarations)
+    return declarations
+
+
+def _fake_args(rng: random.Random, schema: Optional[types.Schema]) -> dict[str, Any]:
+    if not schema or not schema.properties:
+        return {}
+    required = schema.required or list(schema.properties.keys())
+    return {name: _fake_value(rng, schema.properties[name]) for name in required if name in schema.properties}
+
+
+def _fake_value(rng: random.Random, schema: types.Schema) -> Any:
+    if schema.enum:
+        return rng.choice(schema.enum)
+    if schema.type == types.Type.INTEGER:
+        return rng.randint(0, 100)
+    if schema.type == types.Type.NUMBER:
+        return round(rng.uniform(0, 100), 2)
+    if schema.type == types.Type.BOOLEAN:
+        return rng.random() < 0.5
+    if schema.type == types.Type.ARRAY:
+        return [_fake_value(rng, schema.items)] if schema.items else []
+    if schema.type == types.Type.OBJECT:
+        return _fake_args(rng, schema)
+    return rng.choice(_WORDS)
@@ -0,0 +1,219 @@
+import inspect
+import time
+from typing import Any, Awaitable, Callable, Optional, Union
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai.types import Content, FunctionResponse, Part
+from pydantic import BaseModel, Field
+
+from building_intelligent_agents.tokens import estimate_request_tokens
+
+# Every model call sends the agent's whole conversation history, so long sessions
+# (the interactive loops in chapter5 or chapter9) get slower and more expensive with
+# every turn. HistoryCompactor trims the history in a before_model_callback, after ADK
+# has built the request and before it is sent:
+#
+#   * The last `keep_last_turns` turns are sent verbatim. A turn starts at a user
+#     message and includes every tool call and agent reply that follows it, so a
+#     function_call is never separated from its function_response.
+#   * Older turns are folded into a rolling summary, which is added to the system
+#     instruction. The summary is kept in session state (under
+#     "history_summary_<agent name>") so each turn only summarizes what is new.
+#   * Tool results in kept turns other than the most recent `keep_tool_results_turns`
+#     are replaced by a short placeholder; the call and response parts stay in place.
+#
+#   compactor = HistoryCompactor(HistoryCompactionConfig(keep_last_turns=4))
+#   compactor.attach(profile_agent)
+#
+# A RunConfig can also carry a HistoryCompactionConfig (see run_config.py); for that
+# run it takes precedence over the agent's own configuration. Attach a compactor
+# without a config to let RunConfig alone decide.
+
+SUMMARY_STATE_PREFIX = "history_summary_"
+
+Summarizer = Callable[[str, list[Content]], Union[str, Awaitable[str]]]
+
+
+class HistoryCompactionConfig(BaseModel):
+    """How much conversation history is sent to the model verbatim."""
+    enabled: bool = True
+    keep_last_turns: int = Field(default=6, ge=1)
+    keep_tool_results_turns: int = Field(default=1, ge=1)
+    # Tool results shorter than this are cheaper to keep than to replace.
+    min_elided_chars: int = 200
+    max_summary_chars: int = 2000
+
+
+def extractive_summary(previous: str, folded: list[Content], max_line_chars: int = 160) -> str:
+    """
+    Default summarizer: one line per user message, tool call and agent reply.
+
+    It costs no model call. Pass an async function calling a model as `summarizer`
+    for abstractive summaries.
+    """
+    lines = [previous] if previous else []
+    for content in folded:
+        for part in content.parts or []:
+            if part.function_call:
+                lines.append(f"- Called tool {part.function_call.name}.")
+            elif part.text and part.text.strip():
+                who = "User" if content.role == "user" else "Assistant"
+                text = " ".join(part.text.split())
+                if len(text) > max_line_chars:
+                    text = text[:max_line_chars - 3] + "..."
+                lines.append(f"- {who}: {text}")
+    return "\n".join(lines)
+
+
+def turn_starts(contents: list[Content]) -> list[int]:
+    """Indexes of the contents that start a turn: user messages that are not tool results
+    and do not follow a model message with an unanswered function call."""
+    starts = []
+    for i, content in enumerate(contents):
+        parts = content.parts or []
+        if content.role != "user" or not parts or any(p.function_response for p in parts):
+            continue
+        if i > 0 and any(p.function_call for p in contents[i - 1].parts or []):
+            continue
+        starts.append(i)
+    return starts
+
+
+def _content_chars(content: Content) -> int:
+    return sum(len(str(p.function_response.response)) for p in content.parts or [] if p.function_response)
+
+
+def _elide_tool_results(content: Content, min_chars: int) -> tuple[Content, int]:
+    if _content_chars(content) < min_chars:
+        return content, 0
+    parts = []
+    elided = 0
+    for part in content.parts or []:
+        response = part.function_response
+        if response is not None and len(str(response.response)) >= min_chars:
+            parts.append(Part(function_response=FunctionResponse(
+                id=response.id,
+                name=response.name,
+                response={"status": "elided", "note": "Older tool result removed from the history."},
+            )))
+            elided += 1
+        else:
+            parts.append(part)
+    return Content(role=content.role, parts=parts), elided
+
+
+class HistoryCompactor:
+    """Compacts an agent's conversation history before each model call."""
+
+    def __init__(
+        self,
+        config: Optional[HistoryCompactionConfig] = None,
+        summarizer: Optional[Summarizer] = None,
+    ):
+        self.config = config
+        self.summarizer = summarizer or extractive_summary
+        self.requests = 0
+        self.compacted_requests = 0
+        self.turns_folded = 0
+        self.tool_results_elided = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.compaction_seconds = 0.0
+
+    def effective_config(self, callback_context: CallbackContext) -> Optional[HistoryCompactionConfig]:
+        run_config = callback_context._invocation_context.run_config
+        config = getattr(run_config, "history_compaction", None) or self.config
+        return config if config is not None and config.enabled else None
+
+    async def before_model_callback(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        config = self.effective_config(callback_context)
+        if config is None:
+            return None
+        start = time.perf_counter()
+        self.requests += 1
+        tokens_before = estimate_request_tokens(llm_request)
+        contents = llm_request.contents
+        starts = turn_starts(contents)
+
+        cut = 0
+        if len(starts) > config.keep_last_turns:
+            folded_turns = len(starts) - config.keep_last_turns
+            cut = starts[folded_turns]
+            summary = await self._rolling_summary(callback_context, contents, starts, folded_turns, config)
+            if summary:
+                llm_request.append_instructions(
+                    [f"Summary of the earlier conversation (older turns are not shown):\n{summary}"]
+                )
+            self.turns_folded += folded_turns
+
+        kept = contents[cut:]
+        kept_starts = [s - cut for s in starts if s >= cut]
+        # Tool results are only kept in full for the most recent turns.
+        elide_before = (
+            kept_starts[-config.keep_tool_results_turns]
+            if len(kept_starts) >= config.keep_tool_results_turns else 0
+        )
+        elided = 0
+        for i in range(elide_before):
+            kept[i], count = _elide_tool_results(kept[i], config.min_elided_chars)
+            elided += count
+        llm_request.contents = kept
+
+        if cut or elided:
+            self.compacted_requests += 1
+        self.tool_results_elided += elided
+        self.tokens_before += tokens_before
+        self.tokens_after += estimate_request_tokens(llm_request)
+        self.compaction_seconds += time.perf_counter() - start
+        return None
+
+    async def _rolling_summary(
+        self,
+        callback_context: CallbackContext,
+        contents: list[Content],
+        starts: list[int],
+        folded_turns: int,
+        config: HistoryCompactionConfig,
+    ) -> str:
+        state_key = SUMMARY_STATE_PREFIX + callback_context.agent_name
+        stored = callback_context.state.get(state_key) or {}
+        summary = stored.get("summary", "")
+        already_folded = stored.get("turns_folded", 0)
+        if already_folded > folded_turns:
+            # The configuration changed to keep more turns; start over.
+            summary, already_folded = "", 0
+        if already_folded == folded_turns:
+            return summary
+
+        begin = starts[already_folded] if already_folded else 0
+        summary = self.summarizer(summary, contents[begin:starts[folded_turns]])
+        if inspect.isawaitable(summary):
+            summary = await summary
+        if len(summary) > config.max_summary_chars:
+            # Keep the most recent part of the summary.
+            summary = "..." + summary[-(config.max_summary_chars - 3):]
+        callback_context.state[state_key] = {"summary": summary, "turns_folded": folded_turns}
+        return summary
+
+    def attach(self, agent: LlmAgent) -> LlmAgent:
+        """Adds compaction as the agent's first before_model callback, so request rewrites
+        and response caches (llm_cache.py, prompt_cache.py) see the compacted history."""
+        agent.before_model_callback = [self.before_model_callback, *agent.canonical_before_model_callbacks]
+        return agent
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "compacted_requests": self.compacted_requests,
+            "turns_folded": self.turns_folded,
+            "tool_results_elided": self.tool_results_elided,
+            "tokens_before": self.tokens_before,
+            "tokens_after": self.tokens_after,
+            "tokens_saved": self.tokens_before - self.tokens_after,
+            "compaction_ms": round(self.compaction_seconds * 1000, 2),
+        }
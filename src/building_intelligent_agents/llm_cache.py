@@ -0,0 +1,285 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from pydantic import BaseModel
+
+# A response cache for LLM calls, built on the before/after model callbacks shown in
+# chapter4/callback_agent.py. When before_model_callback returns an LlmResponse the
+# model is not called at all, so a cache hit costs microseconds instead of seconds.
+#
+#   cache = LlmResponseCache(max_bytes=32 * 1024 * 1024, ttl_seconds=3600,
+#                            sqlite_path="llm_cache.db")
+#   cache.attach(calculator_agent)
+#   ...
+#   print(cache.stats())
+#
+# Note that on a hit ADK skips the remaining before_model callbacks and all
+# after_model callbacks, exactly as for any other callback that answers for the model.
+
+_MAX_PENDING_CALLS = 10_000
+
+# Fields of GenerateContentConfig that do not change what the model returns.
+_CONFIG_FIELDS_EXCLUDED_FROM_KEY = {"labels", "http_options", "tools"}
+
+
+def _json_default(value: Any) -> Any:
+    # response_schema may be a pydantic class and parts may carry raw bytes.
+    if isinstance(value, type) and issubclass(value, BaseModel):
+        return value.model_json_schema()
+    if isinstance(value, bytes):
+        return hashlib.sha256(value).hexdigest()
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", exclude_none=True)
+    return repr(value)
+
+
+def _strip_call_ids(content: dict[str, Any]) -> dict[str, Any]:
+    # ADK assigns random client-side ids to function calls; they never affect the answer.
+    for part in content.get("parts", []):
+        for key in ("function_call", "function_response"):
+            if key in part:
+                part[key].pop("id", None)
+    return content
+
+
+def request_cache_key(llm_request: LlmRequest) -> str:
+    """Returns a canonical SHA-256 hash of everything in the request that shapes the
+    model's answer: model, system instruction, contents, tool declarations and
+    generation config."""
+    config = llm_request.config
+    canonical: dict[str, Any] = {
+        "model": llm_request.model,
+        "contents": [
+            _strip_call_ids(c.model_dump(mode="json", exclude_none=True))
+            for c in llm_request.contents
+        ],
+    }
+    if config is not None:
+        canonical["config"] = config.model_dump(
+            exclude_none=True, exclude=_CONFIG_FIELDS_EXCLUDED_FROM_KEY
+        )
+        canonical["tools"] = [tool.model_dump(mode="json", exclude_none=True) for tool in config.tools or []]
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=_json_default)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class MemoryLruTier:
+    """In-memory LRU store of serialized responses, bounded by entry count and bytes."""
+
+    def __init__(self, max_entries: int = 10_000, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.current_bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+        # key -> (expires_at or None, serialized response)
+        self._entries: "OrderedDict[str, tuple[Optional[float], str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at is not None and expires_at <= time.time():
+                self._remove(key)
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def put(self, key: str, payload: str, ttl_seconds: Optional[float] = None):
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, payload)
+            self.current_bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: str):
+        _, payload = self._entries.pop(key)
+        self.current_bytes -= len(payload)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+
+class SqliteTier:
+    """Optional on-disk tier that survives restarts and is shared by processes on one host."""
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.expirations = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY, payload TEXT NOT NULL, expires_at REAL)"
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            payload, expires_at = row
+            if expires_at is not None and expires_at <= time.time():
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self.expirations += 1
+                return None
+            return payload
+
+    def put(self, key: str, payload: str, ttl_seconds: Optional[float] = None):
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, payload, expires_at) VALUES (?, ?, ?)",
+                (key, payload, expires_at),
+            )
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM llm_cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            )
+            return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class LlmResponseCache:
+    """
+    Exact-match cache of model responses, keyed by `request_cache_key`.
+
+    Lookups go to the in-memory LRU tier first and then to the optional SQLite tier;
+    disk hits are promoted into memory. Only complete, error-free responses are stored.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: Optional[float] = None,
+        sqlite_path: Optional[str] = None,
+    ):
+        self.memory = MemoryLruTier(max_entries=max_entries, max_bytes=max_bytes, ttl_seconds=ttl_seconds)
+        self.disk = SqliteTier(sqlite_path, ttl_seconds=ttl_seconds) if sqlite_path else None
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        # Keys of model calls in flight, so after_model_callback knows where to store
+        # the response: (invocation_id, agent_name) -> key.
+        self._pending: dict[tuple[str, str], str] = {}
+
+    def get(self, key: str) -> Optional[LlmResponse]:
+        payload = self.memory.get(key)
+        if payload is not None:
+            self.hits += 1
+            self.memory_hits += 1
+            return LlmResponse.model_validate_json(payload)
+        if self.disk is not None:
+            payload = self.disk.get(key)
+            if payload is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                self.memory.put(key, payload)
+                return LlmResponse.model_validate_json(payload)
+        self.misses += 1
+        return None
+
+    def put(self, key: str, llm_response: LlmResponse):
+        payload = llm_response.model_dump_json(exclude_none=True)
+        self.memory.put(key, payload)
+        if self.disk is not None:
+            self.disk.put(key, payload)
+        self.stores += 1
+
+    def before_model_callback(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        key = request_cache_key(llm_request)
+        cached = self.get(key)
+        if cached is not None:
+            # No model call happened, so there is no usage to report for this response.
+            cached.usage_metadata = None
+            cached.custom_metadata = {**(cached.custom_metadata or {}), "llm_cache": "hit"}
+            return cached
+        self._pending[(callback_context.invocation_id, callback_context.agent_name)] = key
+        # A model call that raised never reaches after_model_callback; don't let its
+        # key linger forever.
+        if len(self._pending) > _MAX_PENDING_CALLS:
+            self._pending.pop(next(iter(self._pending)))
+        return None
+
+    def after_model_callback(
+        self, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        # Streaming chunks arrive here too; only the final aggregated response is cached.
+        if llm_response.partial:
+            return None
+        key = self._pending.pop((callback_context.invocation_id, callback_context.agent_name), None)
+        if key is None or llm_response.error_code or not llm_response.content:
+            return None
+        self.put(key, llm_response)
+        return None
+
+    def attach(self, agent: LlmAgent) -> LlmAgent:
+        """
+        Adds the cache to an agent's model callbacks.
+
+        The lookup runs after the agent's own before_model callbacks so that request
+        rewrites (like the one in chapter4/callback_agent.py) are part of the key. The
+        store runs before the agent's after_model callbacks so the raw model response
+        is cached.
+        """
+        agent.before_model_callback = [*agent.canonical_before_model_callbacks, self.before_model_callback]
+        agent.after_model_callback = [self.after_model_callback, *agent.canonical_after_model_callbacks]
+        return agent
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.memory.evictions,
+            "expirations": self.memory.expirations + (self.disk.expirations if self.disk else 0),
+            "memory_entries": len(self.memory),
+            "memory_bytes": self.memory.current_bytes,
+        }
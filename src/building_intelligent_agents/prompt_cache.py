@@ -0,0 +1,302 @@
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from building_intelligent_agents.llm_cache import request_cache_key
+
+# An approximate prompt cache for paraphrased questions ("What is the capital of
+# France?" vs "capital of france?"), which an exact-match cache (llm_cache.py) misses.
+#
+# User text is normalized and cut into character shingles. Each prompt gets a MinHash
+# signature, and an LSH index over signature bands finds candidate prompts in
+# roughly constant time. Candidates are confirmed with the exact Jaccard similarity of
+# their shingle sets against a configurable threshold.
+#
+# A cached answer is only reused when everything else in the request matches exactly
+# (model, instructions, tools and the conversation before the latest user message),
+# so an answer is never served into a conversation it was not produced for. Numbers in
+# the prompt must match exactly too: "5 plus 3" and "6 plus 3" are textually close but
+# have different answers.
+#
+#   prompt_cache = SimilarPromptCache(threshold=0.8)
+#   prompt_cache.attach(search_savvy_agent)
+
+_STOP_WORDS = frozenset(
+    "a an the is are was were be of to in on for and or what which who whom whose "
+    "please can could would you me my tell i do does did it its this that hi hey hello "
+    "quick question just thanks thank".split()
+)
+
+_MAX_HASH = (1 << 32) - 1
+
+# Model calls that raised never reach after_model_callback; at most this many are tracked.
+_MAX_PENDING_CALLS = 10_000
+
+
+def normalize_prompt(text: str) -> str:
+    """Lowercases, strips punctuation and stop words, and collapses whitespace."""
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    kept = [w for w in words if w not in _STOP_WORDS]
+    # A prompt made only of stop words keeps them rather than normalizing to nothing.
+    return " ".join(kept or words)
+
+
+def shingles(normalized: str, size: int = 3) -> frozenset[str]:
+    if len(normalized) <= size:
+        return frozenset([normalized]) if normalized else frozenset()
+    return frozenset(normalized[i:i + size] for i in range(len(normalized) - size + 1))
+
+
+def _numbers(normalized: str) -> tuple[str, ...]:
+    return tuple(sorted(re.findall(r"\d+", normalized)))
+
+
+def jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """
+    MinHash signatures over 32-bit shingle hashes.
+
+    Each "permutation" XORs the hashes with a random mask, which is cheaper in pure
+    Python than universal hashing and good enough here: signatures only pick LSH
+    candidates, and every candidate is confirmed with the exact Jaccard similarity.
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        self.num_perm = num_perm
+        rng = random.Random(seed)
+        self._masks = [rng.getrandbits(32) for _ in range(num_perm)]
+
+    def signature(self, shingle_set: frozenset[str]) -> tuple[int, ...]:
+        if not shingle_set:
+            return tuple([_MAX_HASH] * self.num_perm)
+        hashes = [
+            int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "little")
+            for s in shingle_set
+        ]
+        return tuple(min(map(mask.__xor__, hashes)) for mask in self._masks)
+
+
+@dataclass
+class _Entry:
+    context_key: str
+    shingles: frozenset[str]
+    band_keys: tuple[tuple[int, int], ...]
+    payload: str
+    expires_at: Optional[float]
+
+
+class SimilarPromptCache:
+    """
+    Serves a cached LlmResponse when a new user turn is a near-duplicate of one
+    answered before under the same context.
+
+    `bands * rows` must equal `num_perm`. More bands find more candidates (higher
+    recall, more comparisons); the threshold alone decides what is served.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 3,
+        max_entries: int = 10_000,
+        ttl_seconds: Optional[float] = None,
+        cache_function_calls: bool = False,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands.")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.cache_function_calls = cache_function_calls
+        self.hasher = MinHasher(num_perm=num_perm)
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.candidates_checked = 0
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        # entry_id -> expires_at of entries with a TTL, in the order they were stored,
+        # which is the order they expire in.
+        self._expiring: "OrderedDict[int, float]" = OrderedDict()
+        self._buckets: dict[tuple[str, int, int], set[int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        # (invocation_id, agent_name) -> (context_key, prompt) of the model call in flight.
+        self._pending: dict[tuple[str, str], tuple[str, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _band_keys(self, signature: tuple[int, ...]) -> tuple[tuple[int, int], ...]:
+        return tuple(
+            (band, hash(signature[band * self.rows:(band + 1) * self.rows]))
+            for band in range(self.bands)
+        )
+
+    def lookup(self, context_key: str, prompt: str) -> Optional[tuple[float, LlmResponse]]:
+        """Returns (similarity, response) for the most similar cached prompt above the threshold."""
+        normalized = normalize_prompt(prompt)
+        context_key = f"{context_key}|{','.join(_numbers(normalized))}"
+        prompt_shingles = shingles(normalized, self.shingle_size)
+        band_keys = self._band_keys(self.hasher.signature(prompt_shingles))
+        now = time.time()
+        best: Optional[tuple[float, int]] = None
+        with self._lock:
+            candidates: set[int] = set()
+            for band, band_hash in band_keys:
+                candidates |= self._buckets.get((context_key, band, band_hash), set())
+            for entry_id in candidates:
+                entry = self._entries[entry_id]
+                if entry.expires_at is not None and entry.expires_at <= now:
+                    continue
+                self.candidates_checked += 1
+                similarity = jaccard(prompt_shingles, entry.shingles)
+                if similarity >= self.threshold and (best is None or similarity > best[0]):
+                    best = (similarity, entry_id)
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(best[1])
+            payload = self._entries[best[1]].payload
+        return best[0], LlmResponse.model_validate_json(payload)
+
+    def store(self, context_key: str, prompt: str, llm_response: LlmResponse):
+        normalized = normalize_prompt(prompt)
+        context_key = f"{context_key}|{','.join(_numbers(normalized))}"
+        prompt_shingles = shingles(normalized, self.shingle_size)
+        band_keys = self._band_keys(self.hasher.signature(prompt_shingles))
+        ttl = self.ttl_seconds
+        entry = _Entry(
+            context_key=context_key,
+            shingles=prompt_shingles,
+            band_keys=band_keys,
+            payload=llm_response.model_dump_json(exclude_none=True),
+            expires_at=time.time() + ttl if ttl is not None else None,
+        )
+        with self._lock:
+            self._purge_expired(time.time())
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = entry
+            if entry.expires_at is not None:
+                self._expiring[entry_id] = entry.expires_at
+            for band, band_hash in band_keys:
+                self._buckets.setdefault((context_key, band, band_hash), set()).add(entry_id)
+            self.stores += 1
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _purge_expired(self, now: float):
+        # Expired entries are never served, but would otherwise stay until evicted.
+        while self._expiring:
+            entry_id, expires_at = next(iter(self._expiring.items()))
+            if expires_at > now:
+                break
+            self._remove(entry_id)
+            self.expirations += 1
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id)
+        self._expiring.pop(entry_id, None)
+        for band, band_hash in entry.band_keys:
+            bucket_key = (entry.context_key, band, band_hash)
+            bucket = self._buckets.get(bucket_key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[bucket_key]
+
+    def before_model_callback(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        split = _split_latest_user_text(llm_request)
+        if split is None:
+            return None
+        context_key, prompt = split
+        match = self.lookup(context_key, prompt)
+        if match is not None:
+            similarity, cached = match
+            cached.usage_metadata = None
+            cached.custom_metadata = {
+                **(cached.custom_metadata or {}),
+                "prompt_cache": "hit",
+                "prompt_similarity": round(similarity, 3),
+            }
+            return cached
+        self._pending[(callback_context.invocation_id, callback_context.agent_name)] = (context_key, prompt)
+        if len(self._pending) > _MAX_PENDING_CALLS:
+            self._pending.pop(next(iter(self._pending)))
+        return None
+
+    def after_model_callback(
+        self, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        if llm_response.partial:
+            return None
+        pending = self._pending.pop((callback_context.invocation_id, callback_context.agent_name), None)
+        if pending is None or llm_response.error_code or not llm_response.content:
+            return None
+        # A paraphrase usually means the same tool call, but with different arguments
+        # ("5 plus 3" vs "6 plus 3") it would not, so only text answers are reused by default.
+        has_function_call = any(p.function_call for p in llm_response.content.parts or [])
+        if has_function_call and not self.cache_function_calls:
+            return None
+        self.store(pending[0], pending[1], llm_response)
+        return None
+
+    def attach(self, agent: LlmAgent) -> LlmAgent:
+        """Adds the cache to an agent's model callbacks, after its own before_model
+        callbacks and before its own after_model callbacks."""
+        agent.before_model_callback = [*agent.canonical_before_model_callbacks, self.before_model_callback]
+        agent.after_model_callback = [self.after_model_callback, *agent.canonical_after_model_callbacks]
+        return agent
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "entries": len(self._entries),
+            "candidates_checked": self.candidates_checked,
+        }
+
+
+def _split_latest_user_text(llm_request: LlmRequest) -> Optional[tuple[str, str]]:
+    """Splits a request into (context key, latest user text), or None when the request
+    does not end with a plain user text turn (e.g. it ends with a function response)."""
+    if not llm_request.contents:
+        return None
+    latest = llm_request.contents[-1]
+    parts = latest.parts or []
+    if latest.role != "user" or not parts or any(not p.text for p in parts):
+        return None
+    prompt = " ".join(p.text for p in parts)
+    context_request = llm_request.model_copy(update={"contents": llm_request.contents[:-1]})
+    return request_cache_key(context_request), prompt
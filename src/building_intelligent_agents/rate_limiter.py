@@ -0,0 +1,358 @@
+import asyncio
+import email.utils
+import hashlib
+import threading
+import time
+from typing import Any, AsyncGenerator, Mapping, Optional
+from urllib.parse import urlsplit
+
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.auth import AuthCredential
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.tools.openapi_tool import OpenAPIToolset
+from google.adk.tools.openapi_tool.openapi_spec_parser.rest_api_tool import RestApiTool
+from google.adk.tools.tool_context import ToolContext
+from pydantic import ConfigDict, Field
+
+# An adaptive, shared rate limiter for outbound HTTP calls made by tools and models,
+# replacing fixed sleeps between requests (see chapter7/spotify_agent.py).
+#
+# Every call takes a token from the bucket of its host and, when it carries a
+# credential, from the bucket of that credential on that host. Buckets adapt to what
+# the upstream reports:
+#   * 429 responses cut the bucket's rate (by 20% by default) and pause it for Retry-After seconds;
+#   * X-RateLimit-Remaining / X-RateLimit-Reset pause it until the window resets when
+#     nothing is left, and X-RateLimit-Limit sets the burst size;
+#   * every successful call raises the rate a little again, up to `max_rate`.
+# OpenAPI tools only see what RestApiTool.call returns, which has no status or headers:
+# for them every error result counts as a 429.
+#
+#   limiter = AdaptiveRateLimiter(rate=5, max_rate=50)
+#   toolset = RateLimitedOpenAPIToolset(limiter, spec_str=..., spec_str_type="yaml", ...)
+#   model = RateLimitedLlm(llm=Gemini(model="gemini-2.0-flash"), limiter=limiter)
+#
+# The limiter keeps its state behind a thread lock and only awaits asyncio.sleep, so
+# one instance can be shared by runners on different event loops (Runner.run starts a
+# new loop per call).
+
+_RATE_LIMITED_STATUS = 429
+_RATE_LIMITED_MODEL_ERRORS = {"429", "RESOURCE_EXHAUSTED"}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta seconds or an HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _reset_seconds(value: Optional[str]) -> Optional[float]:
+    # X-RateLimit-Reset is either seconds until the reset or a Unix timestamp.
+    if not value:
+        return None
+    try:
+        reset = float(value)
+    except ValueError:
+        return None
+    return max(0.0, reset - time.time()) if reset > 1e9 else reset
+
+
+def credential_key(credential: Optional[str]) -> Optional[str]:
+    """A short fingerprint of a credential, so secrets are never kept as bucket keys."""
+    if not credential:
+        return None
+    return hashlib.sha256(credential.encode("utf-8")).hexdigest()[:16]
+
+
+class TokenBucket:
+    """A token bucket whose rate and pauses follow the upstream's rate-limit signals."""
+
+    def __init__(self, rate: float, burst: float, min_rate: float, max_rate: float, increase: float, decrease: float):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.tokens = burst
+        self.blocked_until = 0.0
+        self.waited = 0.0
+        self.acquired = 0
+        self.throttled = 0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, cost: float = 1.0) -> float:
+        """Takes `cost` tokens, possibly on credit, and returns how long to wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= cost
+            self.acquired += 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            delay = max(delay, self.blocked_until - now)
+            self.waited += delay
+            return delay
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttled(self, retry_after: Optional[float]):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.throttled += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self.tokens = min(self.tokens, 0.0)
+            pause = retry_after if retry_after is not None else 1.0 / self.rate
+            self.blocked_until = max(self.blocked_until, now + pause)
+
+    def on_headers(self, limit: Optional[str], remaining: Optional[str], reset: Optional[str]):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if limit and limit.isdigit() and int(limit) > 0:
+                self.burst = float(limit)
+            if remaining is not None and remaining.isdigit():
+                self.tokens = min(self.tokens, float(remaining))
+                reset_in = _reset_seconds(reset)
+                if int(remaining) == 0 and reset_in is not None:
+                    self.blocked_until = max(self.blocked_until, now + reset_in)
+
+
+class AdaptiveRateLimiter:
+    """Per-host and per-credential token buckets shared by tools and models."""
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: Optional[float] = None,
+        min_rate: float = 0.5,
+        max_rate: Optional[float] = None,
+        increase: float = 0.5,
+        decrease: float = 0.8,
+        host_rates: Optional[Mapping[str, float]] = None,
+        max_retries: int = 3,
+    ):
+        """
+        :param rate: Initial requests per second for every bucket.
+        :param burst: Bucket capacity (default: one second of requests).
+        :param min_rate: Rate floor after repeated 429s.
+        :param max_rate: Rate ceiling for additive increase (default: 4x the initial rate).
+        :param increase: Requests per second added after each successful call.
+        :param decrease: Factor the rate is multiplied by after a 429.
+        :param host_rates: Initial rates for specific hosts, overriding `rate`.
+        :param max_retries: How often a 429 is retried before it is returned to the caller.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.host_rates = dict(host_rates or {})
+        self.max_retries = max_retries
+        self.retries = 0
+        self._buckets: dict[tuple[str, Optional[str]], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host: str, credential: Optional[str] = None) -> TokenBucket:
+        key = (host, credential_key(credential))
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                rate = self.host_rates.get(host, self.rate)
+                bucket = self._buckets[key] = TokenBucket(
+                    rate=rate,
+                    burst=self.burst or max(1.0, rate),
+                    min_rate=self.min_rate,
+                    max_rate=self.max_rate or rate * 4,
+                    increase=self.increase,
+                    decrease=self.decrease,
+                )
+            return bucket
+
+    def _buckets_for(self, host: str, credential: Optional[str]) -> list[TokenBucket]:
+        buckets = [self.bucket(host)]
+        if credential:
+            buckets.append(self.bucket(host, credential))
+        return buckets
+
+    async def acquire(self, host: str, credential: Optional[str] = None):
+        """Waits until a request to `host` (with `credential`) may be sent."""
+        delay = max(bucket.reserve() for bucket in self._buckets_for(host, credential))
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def record_response(
+        self, host: str, credential: Optional[str], status: int, headers: Optional[Mapping[str, str]] = None
+    ):
+        """Feeds a response's status and rate-limit headers back into the buckets."""
+        headers = headers or {}
+        # Limits are usually enforced per credential, so that bucket takes the signal.
+        bucket = self._buckets_for(host, credential)[-1]
+        if status == _RATE_LIMITED_STATUS:
+            bucket.on_throttled(parse_retry_after(headers.get("Retry-After")))
+            return
+        bucket.on_headers(
+            headers.get("X-RateLimit-Limit"), headers.get("X-RateLimit-Remaining"), headers.get("X-RateLimit-Reset")
+        )
+        if status < 400:
+            for b in self._buckets_for(host, credential):
+                b.on_success()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {
+            "retries": self.retries,
+            "buckets": {
+                f"{host}/{cred}" if cred else host: {
+                    "rate": round(b.rate, 2),
+                    "burst": b.burst,
+                    "acquired": b.acquired,
+                    "throttled": b.throttled,
+                    "waited_s": round(b.waited, 3),
+                }
+                for (host, cred), b in buckets.items()
+            },
+        }
+
+
+# --- Tools ---
+
+
+class RateLimitedRestApiTool(RestApiTool):
+    """
+    RestApiTool whose calls go through an AdaptiveRateLimiter and are retried when
+    they fail.
+
+    RestApiTool.call runs unchanged in a worker thread, so other turns keep running on
+    the event loop while this one waits for the upstream. It returns a failed request
+    as {"error": ...} without its status or headers, so every error result is taken as
+    a 429 without Retry-After: the bucket slows down, and the call is retried up to the
+    limiter's `max_retries`.
+    """
+
+    limiter: Optional[AdaptiveRateLimiter] = None
+
+    @classmethod
+    def from_tool(cls, tool: RestApiTool, limiter: AdaptiveRateLimiter) -> "RateLimitedRestApiTool":
+        limited = cls(
+            name=tool.name, description=tool.description, endpoint=tool.endpoint, operation=tool.operation,
+            auth_scheme=tool.auth_scheme, auth_credential=tool.auth_credential,
+        )
+        limited.limiter = limiter
+        return limited
+
+    async def run_async(self, *, args: dict[str, Any], tool_context: Optional[ToolContext]) -> dict[str, Any]:
+        if self.limiter is None:
+            return await super().run_async(args=args, tool_context=tool_context)
+        host = urlsplit(self.endpoint.base_url or "").netloc
+        credential = _tool_credential(self.auth_credential)
+        for attempt in range(self.limiter.max_retries + 1):
+            await self.limiter.acquire(host, credential)
+            result = await asyncio.to_thread(self.call, args=dict(args), tool_context=tool_context)
+            failed = isinstance(result, dict) and "error" in result
+            self.limiter.record_response(host, credential, _RATE_LIMITED_STATUS if failed else 200)
+            if not failed or attempt == self.limiter.max_retries:
+                break
+            self.limiter.retries += 1
+        return result
+
+
+def _tool_credential(auth_credential: Optional[AuthCredential]) -> Optional[str]:
+    if auth_credential is None:
+        return None
+    return auth_credential.api_key or auth_credential.model_dump_json(exclude_none=True)
+
+
+class RateLimitedOpenAPIToolset(OpenAPIToolset):
+    """OpenAPIToolset whose tools share one AdaptiveRateLimiter."""
+
+    def __init__(self, limiter: AdaptiveRateLimiter, **kwargs):
+        self.limiter = limiter
+        # tool name -> the rate-limited tool, built on first use.
+        self._limited_tools: dict[str, RateLimitedRestApiTool] = {}
+        super().__init__(**kwargs)
+
+    async def get_tools(self, readonly_context: Optional[ReadonlyContext] = None) -> list[RestApiTool]:
+        return [self._limited(tool) for tool in await super().get_tools(readonly_context)]
+
+    def get_tool(self, tool_name: str) -> Optional[RestApiTool]:
+        tool = super().get_tool(tool_name)
+        return self._limited(tool) if tool is not None else None
+
+    def _limited(self, tool: RestApiTool) -> RateLimitedRestApiTool:
+        limited = self._limited_tools.get(tool.name)
+        if limited is None:
+            limited = self._limited_tools[tool.name] = RateLimitedRestApiTool.from_tool(tool, self.limiter)
+        return limited
+
+
+# --- Models ---
+
+
+class RateLimitedLlm(BaseLlm):
+    """
+    Wraps a model so its calls go through an AdaptiveRateLimiter.
+
+    Rate-limit errors (HTTP 429 / RESOURCE_EXHAUSTED, raised or returned as an error
+    response) are retried after the limiter's pause, as long as nothing was streamed
+    to the caller yet. The bucket is keyed by model name and `credential`.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    llm: BaseLlm
+    limiter: AdaptiveRateLimiter
+    credential: Optional[str] = Field(default=None, repr=False)
+    model: str = ""
+
+    def model_post_init(self, __context: Any):
+        if not self.model:
+            self.model = self.llm.model
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        host = f"model:{self.llm.model}"
+        for attempt in range(self.limiter.max_retries + 1):
+            await self.limiter.acquire(host, self.credential)
+            yielded = False
+            throttled = False
+            try:
+                async for response in self.llm.generate_content_async(llm_request, stream=stream):
+                    if not yielded and response.error_code in _RATE_LIMITED_MODEL_ERRORS and attempt < self.limiter.max_retries:
+                        throttled = True
+                        break
+                    yielded = True
+                    yield response
+            except Exception as e:
+                if yielded or getattr(e, "code", None) != _RATE_LIMITED_STATUS or attempt == self.limiter.max_retries:
+                    raise
+                throttled = True
+                headers = getattr(getattr(e, "response", None), "headers", None)
+                self.limiter.record_response(host, self.credential, _RATE_LIMITED_STATUS, headers)
+                self.limiter.retries += 1
+                continue
+            if throttled:
+                self.limiter.record_response(host, self.credential, _RATE_LIMITED_STATUS)
+                self.limiter.retries += 1
+                continue
+            self.limiter.record_response(host, self.credential, 200)
+            return
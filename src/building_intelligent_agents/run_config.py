@@ -0,0 +1,31 @@
+from typing import Optional
+
+from google.adk.agents.run_config import RunConfig
+
+from building_intelligent_agents.history_compaction import HistoryCompactionConfig
+from building_intelligent_agents.streaming import StreamingOptions
+
+# ADK's RunConfig rejects unknown fields, so per-run options for the helpers in this
+# package live on a subclass. It is accepted everywhere a RunConfig is:
+#
+#   run_config = ExtendedRunConfig(
+#       max_llm_calls=20,
+#       token_budget=50_000,
+#       history_compaction=HistoryCompactionConfig(keep_last_turns=4),
+#       streaming=StreamingOptions(coalesce_bytes=256, coalesce_ms=50),
+#   )
+#   async for event in runner.run_async(..., run_config=run_config): ...
+
+
+class ExtendedRunConfig(RunConfig):
+    """RunConfig with the per-run options of this package's helpers."""
+
+    history_compaction: Optional[HistoryCompactionConfig] = None
+    """Overrides the HistoryCompactor configuration of every agent in the run."""
+
+    token_budget: Optional[int] = None
+    """Total tokens an invocation may use before AccountingRunner refuses further
+    model calls. Overrides the runner's own budget."""
+
+    streaming: Optional[StreamingOptions] = None
+    """Coalescing, buffering and metrics for partial events, applied by StreamingRunner."""
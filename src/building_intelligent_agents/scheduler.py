@@ -0,0 +1,245 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Callable, Optional
+
+from google.adk.agents.run_config import RunConfig
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.genai.types import Content
+
+# A scheduler in front of Runner.run_async for serving many users from one process.
+# Without it, one tenant that sends many expensive turns (a LoopAgent, say) holds every
+# worker slot and everyone else waits behind it.
+#
+#   scheduler = TurnScheduler(max_concurrency=32, max_per_user=4, max_queue_depth=1000)
+#   async for event in scheduler.run_async(runner, user_id=..., session_id=..., new_message=...):
+#       ...
+#   print(scheduler.stats())
+#
+# * At most `max_concurrency` turns run at once, and at most `max_per_user` per tenant.
+#   A tenant is an (app_name, user_id) pair.
+# * Waiting turns are dispatched by weighted fair queuing: each turn gets a virtual
+#   finish time of start + 1 / weight, where start is the later of the scheduler's
+#   virtual clock and the tenant's previous finish time, and the smallest goes next.
+#   A tenant with weight 2 gets twice the turns of a tenant with weight 1 when both
+#   are backlogged, and a burst from one tenant cannot delay the others by more than
+#   one turn each.
+# * Turns for the same session run one at a time, in arrival order, so concurrent
+#   messages to one session never interleave their events.
+# * When `max_queue_depth` turns are already waiting (or `max_queued_per_user` for the
+#   tenant), new turns are rejected with SchedulerOverloadedError instead of queueing.
+
+Tenant = tuple[str, str]
+
+
+class SchedulerOverloadedError(Exception):
+    """Raised when a turn is shed because the scheduler's queue is full or it waited too long."""
+
+
+@dataclass
+class _Ticket:
+    tenant: Tenant
+    session_key: tuple[str, str, str]
+    finish_tag: float
+    sequence: int
+    enqueued_at: float
+    granted: asyncio.Future = field(repr=False)
+
+
+@dataclass
+class _TenantState:
+    weight: float
+    last_finish: float = 0.0
+    in_flight: int = 0
+    queue: deque = field(default_factory=deque)
+
+
+class TurnScheduler:
+    """Admission control, fair queuing and per-session serialization for agent turns."""
+
+    def __init__(
+        self,
+        max_concurrency: int = 64,
+        max_per_user: int = 4,
+        max_queue_depth: int = 1024,
+        max_queued_per_user: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+        weight_fn: Optional[Callable[[str, str], float]] = None,
+        wait_window: int = 10_000,
+    ):
+        if max_concurrency < 1 or max_per_user < 1:
+            raise ValueError("max_concurrency and max_per_user must be at least 1.")
+        self.max_concurrency = max_concurrency
+        self.max_per_user = max_per_user
+        self.max_queue_depth = max_queue_depth
+        self.max_queued_per_user = max_queued_per_user
+        self.queue_timeout = queue_timeout
+        self.weight_fn = weight_fn or (lambda app_name, user_id: 1.0)
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.completed = 0
+        self.shed = 0
+        self.timed_out = 0
+        self._virtual_time = 0.0
+        self._sequence = itertools.count()
+        self._tenants: dict[Tenant, _TenantState] = {}
+        self._busy_sessions: set[tuple[str, str, str]] = set()
+        # Queue wait of the most recent turns, in seconds.
+        self._waits: deque[float] = deque(maxlen=wait_window)
+
+    # --- Queueing ---
+
+    def _tenant(self, tenant: Tenant) -> _TenantState:
+        state = self._tenants.get(tenant)
+        if state is None:
+            weight = self.weight_fn(*tenant)
+            if weight <= 0:
+                raise ValueError(f"Weight for tenant {tenant} must be positive, got {weight}.")
+            state = self._tenants[tenant] = _TenantState(weight=weight)
+        return state
+
+    def _enqueue(self, runner: Runner, user_id: str, session_id: str) -> _Ticket:
+        tenant = (runner.app_name, user_id)
+        if self.queued >= self.max_queue_depth:
+            self.shed += 1
+            raise SchedulerOverloadedError(f"Scheduler queue is full ({self.queued} turns waiting).")
+        existing = self._tenants.get(tenant)
+        if existing is not None and self.max_queued_per_user is not None and len(existing.queue) >= self.max_queued_per_user:
+            self.shed += 1
+            raise SchedulerOverloadedError(
+                f"Too many queued turns for user '{user_id}' of app '{runner.app_name}' ({len(existing.queue)} waiting)."
+            )
+        state = existing or self._tenant(tenant)
+        start_tag = max(self._virtual_time, state.last_finish)
+        state.last_finish = start_tag + 1.0 / state.weight
+        ticket = _Ticket(
+            tenant=tenant,
+            session_key=(runner.app_name, user_id, session_id),
+            finish_tag=state.last_finish,
+            sequence=next(self._sequence),
+            enqueued_at=time.perf_counter(),
+            granted=asyncio.get_running_loop().create_future(),
+        )
+        state.queue.append(ticket)
+        self.queued += 1
+        self._dispatch()
+        return ticket
+
+    def _next_eligible(self) -> Optional[_Ticket]:
+        best: Optional[_Ticket] = None
+        for state in self._tenants.values():
+            if not state.queue or state.in_flight >= self.max_per_user:
+                continue
+            # The tenant's earliest turn whose session is idle; later turns of a busy
+            # session must wait for the earlier ones.
+            for ticket in state.queue:
+                if ticket.session_key in self._busy_sessions:
+                    continue
+                if best is None or (ticket.finish_tag, ticket.sequence) < (best.finish_tag, best.sequence):
+                    best = ticket
+                break
+        return best
+
+    def _dispatch(self):
+        while self.in_flight < self.max_concurrency:
+            ticket = self._next_eligible()
+            if ticket is None:
+                return
+            state = self._tenants[ticket.tenant]
+            state.queue.remove(ticket)
+            self.queued -= 1
+            state.in_flight += 1
+            self.in_flight += 1
+            self._busy_sessions.add(ticket.session_key)
+            self._virtual_time = max(self._virtual_time, ticket.finish_tag - 1.0 / state.weight)
+            self._waits.append(time.perf_counter() - ticket.enqueued_at)
+            self.admitted += 1
+            ticket.granted.set_result(None)
+
+    def _release(self, ticket: _Ticket):
+        state = self._tenants[ticket.tenant]
+        state.in_flight -= 1
+        self.in_flight -= 1
+        self.completed += 1
+        self._busy_sessions.discard(ticket.session_key)
+        if not state.queue and not state.in_flight:
+            # Idle tenants are forgotten; they restart at the current virtual time.
+            del self._tenants[ticket.tenant]
+        self._dispatch()
+
+    def _abandon(self, ticket: _Ticket):
+        state = self._tenants[ticket.tenant]
+        state.queue.remove(ticket)
+        self.queued -= 1
+        if not state.queue and not state.in_flight:
+            del self._tenants[ticket.tenant]
+        self._dispatch()
+
+    async def _wait_for_turn(self, ticket: _Ticket):
+        try:
+            await asyncio.wait_for(asyncio.shield(ticket.granted), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if ticket.granted.done():
+                return
+            self._abandon(ticket)
+            self.timed_out += 1
+            self.shed += 1
+            raise SchedulerOverloadedError(f"Turn waited more than {self.queue_timeout}s for a slot.") from None
+        except asyncio.CancelledError:
+            if ticket.granted.done():
+                self._release(ticket)
+            else:
+                self._abandon(ticket)
+            raise
+
+    # --- Running turns ---
+
+    async def run_async(
+        self,
+        runner: Runner,
+        *,
+        user_id: str,
+        session_id: str,
+        new_message: Content,
+        run_config: RunConfig = RunConfig(),
+    ) -> AsyncGenerator[Event, None]:
+        """Waits for a slot, then streams the events of `runner.run_async(...)`."""
+        ticket = self._enqueue(runner, user_id, session_id)
+        await self._wait_for_turn(ticket)
+        try:
+            async for event in runner.run_async(
+                user_id=user_id, session_id=session_id, new_message=new_message, run_config=run_config
+            ):
+                yield event
+        finally:
+            self._release(ticket)
+
+    def stats(self) -> dict[str, Any]:
+        waits = sorted(self._waits)
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "completed": self.completed,
+            "shed": self.shed,
+            "timed_out": self.timed_out,
+            "active_tenants": len(self._tenants),
+            "queue_wait_ms_p50": round(waits[len(waits) // 2] * 1000, 2) if waits else 0.0,
+            "queue_wait_ms_p95": round(waits[int(0.95 * (len(waits) - 1))] * 1000, 2) if waits else 0.0,
+            "queue_wait_ms_max": round(waits[-1] * 1000, 2) if waits else 0.0,
+        }
+
+    def tenant_stats(self) -> dict[str, dict[str, Any]]:
+        """In-flight and queued turns per active tenant, keyed by "app_name/user_id"."""
+        return {
+            f"{app_name}/{user_id}": {
+                "weight": state.weight,
+                "in_flight": state.in_flight,
+                "queued": len(state.queue),
+            }
+            for (app_name, user_id), state in self._tenants.items()
+        }
@@ -0,0 +1,44 @@
+from .bounded import BoundedInMemorySessionService
+from .cache import CachedSessionService
+from .codec import BinaryEventCodec, CodecError, JsonEventCodec, LazyValue, decode_event, decode_session, peek_event
+from .concurrency import SessionConflictError
+from .database import FastReadDatabaseSessionService
+from .group_commit import GroupCommitDatabaseSessionService
+from .jsonl import SessionFileError, TransferResult, export_sessions, import_sessions, session_keys
+from .kv import FakeRedis, RedisSessionService
+from .listing import SessionPage, list_sessions_page
+from .reads import SessionReadConfig, get_session_state, select_events
+from .scoped import ScopedState, ScopedStateStore
+from .sharded import ShardedInMemorySessionService
+from .sqlite import SqliteSessionService
+
+__all__ = [
+    "BinaryEventCodec",
+    "BoundedInMemorySessionService",
+    "CachedSessionService",
+    "CodecError",
+    "FakeRedis",
+    "FastReadDatabaseSessionService",
+    "GroupCommitDatabaseSessionService",
+    "JsonEventCodec",
+    "LazyValue",
+    "RedisSessionService",
+    "ScopedState",
+    "ScopedStateStore",
+    "SessionConflictError",
+    "SessionFileError",
+    "SessionPage",
+    "SessionReadConfig",
+    "ShardedInMemorySessionService",
+    "SqliteSessionService",
+    "TransferResult",
+    "decode_event",
+    "decode_session",
+    "export_sessions",
+    "get_session_state",
+    "import_sessions",
+    "list_sessions_page",
+    "peek_event",
+    "select_events",
+    "session_keys",
+]
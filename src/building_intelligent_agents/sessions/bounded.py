@@ -0,0 +1,373 @@
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Optional, Union
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+
+from .codec import BinaryEventCodec, JsonEventCodec, decode_session
+from .reads import SessionReadConfig, select_events
+from .scoped import ScopedStateStore, merge_scoped, split_state_delta
+
+# An in-memory session service with a memory cap, for long-running processes where
+# most sessions are abandoned after a few turns (a session per website visitor).
+#
+#   session_service = BoundedInMemorySessionService(
+#       max_bytes=256 * 2**20, idle_ttl=15 * 60, spill_dir="/var/tmp/adk-sessions"
+#   )
+#
+# Sessions stay resident in least-recently-used order. When the resident sessions
+# exceed `max_bytes` (or `max_sessions`), or a session has not been read or written for
+# `idle_ttl` seconds, it is evicted: written to a file in `spill_dir` (with `codec`,
+# BinaryEventCodec by default) and dropped from memory. The next get_session or
+# append_event for it loads it back, so eviction is invisible to callers apart from the
+# latency of that read.
+#
+# Sizes are the length of the session's JSON, counted as events are appended; they track
+# what a session costs but are not heap sizes, which run several times larger. The spill
+# directory is a cache for this process, not a durable store: its index is kept in
+# memory, and files left by a previous process are ignored. Files are written in worker
+# threads, outside the lock. Reads return snapshots that share Event objects, as
+# ShardedInMemorySessionService does.
+
+SessionKey = tuple[str, str, str]
+
+# Once over a cap, evict down to this fraction of it, so that spills happen in batches
+# instead of one per append.
+_LOW_WATER = 0.9
+
+
+class _Resident:
+    __slots__ = ("session", "nbytes", "last_access")
+
+    def __init__(self, session: Session, nbytes: int):
+        self.session = session
+        self.nbytes = nbytes
+        self.last_access = time.monotonic()
+
+
+def _event_bytes(event: Event) -> int:
+    return len(event.model_dump_json(exclude_none=True))
+
+
+def _session_bytes(session: Session) -> int:
+    return len(session.model_dump_json(exclude_none=True))
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class BoundedInMemorySessionService(BaseSessionService):
+    """In-memory session service that spills least recently used and idle sessions to disk."""
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = 256 * 2**20,
+        *,
+        max_sessions: Optional[int] = None,
+        idle_ttl: Optional[float] = None,
+        spill_dir: Optional[str] = None,
+        codec: Union[BinaryEventCodec, JsonEventCodec, None] = None,
+    ):
+        """
+        :param max_bytes: Size above which the least recently used sessions are evicted.
+        :param max_sessions: Number of resident sessions above which the least recently
+            used are evicted.
+        :param idle_ttl: Seconds without a read or write after which a session is evicted.
+        :param spill_dir: Directory for evicted sessions; a temporary directory by default.
+        :param codec: How evicted sessions are encoded; BinaryEventCodec by default.
+        """
+        self.max_bytes = max_bytes
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.spill_dir = spill_dir or tempfile.mkdtemp(prefix="adk-sessions-")
+        os.makedirs(self.spill_dir, exist_ok=True)
+        self.codec = codec or BinaryEventCodec()
+
+        self._lock = threading.Lock()
+        self._resident: "OrderedDict[SessionKey, _Resident]" = OrderedDict()
+        self._resident_bytes = 0
+        # Evicted sessions: key -> last_update_time, for list_sessions.
+        self._spilled: dict[SessionKey, float] = {}
+        # Sessions taken out of memory whose files are still being written.
+        self._spilling: dict[SessionKey, Session] = {}
+        # App- and user-scoped state, kept out of the stored sessions and never spilled.
+        self.scoped = ScopedStateStore()
+
+        self.evictions = 0
+        self.idle_evictions = 0
+        self.rehydrations = 0
+        self.spilled_bytes = 0
+
+    def _path(self, key: SessionKey) -> str:
+        return os.path.join(self.spill_dir, hashlib.sha256("\0".join(key).encode()).hexdigest() + ".session")
+
+    # --- Residency, called with the lock held ---
+
+    def _admit(self, key: SessionKey, session: Session, nbytes: int):
+        self._resident[key] = _Resident(session, nbytes)
+        self._resident_bytes += nbytes
+
+    def _touch(self, key: SessionKey) -> Optional[_Resident]:
+        resident = self._resident.get(key)
+        if resident is not None:
+            resident.last_access = time.monotonic()
+            self._resident.move_to_end(key)
+        return resident
+
+    def _select_victims(self, keep: Optional[SessionKey] = None) -> list[tuple[SessionKey, Session]]:
+        victims = []
+        now = time.monotonic()
+        limit = 1.0
+        while self._resident:
+            key, oldest = next(iter(self._resident.items()))
+            idle = self.idle_ttl is not None and now - oldest.last_access > self.idle_ttl
+            over = (self.max_bytes is not None and self._resident_bytes > self.max_bytes * limit) or (
+                self.max_sessions is not None and len(self._resident) > self.max_sessions * limit
+            )
+            # The session being used right now stays, even if it alone is over the cap.
+            if not (idle or over) or key == keep:
+                break
+            del self._resident[key]
+            self._resident_bytes -= oldest.nbytes
+            self._spilling[key] = oldest.session
+            self._spilled[key] = oldest.session.last_update_time
+            if idle:
+                self.idle_evictions += 1
+            else:
+                self.evictions += 1
+                limit = _LOW_WATER
+            victims.append((key, oldest.session))
+        return victims
+
+    # --- Disk, called without the lock ---
+
+    def _spill(self, victims: list[tuple[SessionKey, Session]]):
+        for key, session in victims:
+            data = self.codec.encode_session(session)
+            path = self._path(key)
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            with self._lock:
+                # Kept unless the session was loaded back or deleted meanwhile.
+                if self._spilling.get(key) is session:
+                    del self._spilling[key]
+                    os.replace(tmp_path, path)
+                    self.spilled_bytes += len(data)
+                    continue
+            _remove(tmp_path)
+
+    async def _evict(self, victims: list[tuple[SessionKey, Session]]):
+        if victims:
+            await asyncio.to_thread(self._spill, victims)
+
+    async def evict_idle(self) -> int:
+        """Evicts sessions idle for longer than `idle_ttl`; returns how many were evicted."""
+        with self._lock:
+            victims = self._select_victims()
+        await self._evict(victims)
+        return len(victims)
+
+    async def _load(self, key: SessionKey) -> Optional[_Resident]:
+        """The resident session for `key`, loading it from the spill directory if needed."""
+        with self._lock:
+            resident = self._touch(key)
+            if resident is not None or key not in self._spilled:
+                return resident
+            spilling = self._spilling.pop(key, None)
+            if spilling is not None:
+                # Still being written: take back a copy, since the writer thread may be
+                # serializing this one.
+                del self._spilled[key]
+                self._admit(key, spilling.model_copy(deep=True), _session_bytes(spilling))
+                self.rehydrations += 1
+                return self._resident[key]
+        path = self._path(key)
+        try:
+            data = await asyncio.to_thread(_read_bytes, path)
+        except FileNotFoundError:
+            # Rehydrated or deleted by another caller meanwhile.
+            with self._lock:
+                return self._touch(key)
+        session = decode_session(data)
+        with self._lock:
+            resident = self._touch(key)
+            if resident is not None or key not in self._spilled:
+                return resident
+            # Otherwise it was loaded, changed and evicted again while the file was read.
+            fresh = self._spilled[key] == session.last_update_time
+            if fresh:
+                del self._spilled[key]
+                # Evicted again unchanged while the file was read: drop that write.
+                self._spilling.pop(key, None)
+                self._admit(key, session, _session_bytes(session))
+                self.rehydrations += 1
+                _remove(path)
+                victims = self._select_victims(keep=key)
+                resident = self._resident[key]
+        if not fresh:
+            return await self._load(key)
+        await self._evict(victims)
+        return resident
+
+    def _merge_state(self, app_name: str, user_id: str, session: Session) -> Session:
+        merge_scoped(session.state, *self.scoped.get(app_name, user_id))
+        return session
+
+    # --- BaseSessionService ---
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = session_id.strip() if session_id and session_id.strip() else str(uuid.uuid4())
+        app_delta, user_delta, session_state = split_state_delta(state or {})
+        self.scoped.update(app_name, user_id, app_delta, user_delta)
+        session = Session(
+            app_name=app_name, user_id=user_id, id=session_id, state=session_state, last_update_time=time.time()
+        )
+        key = (app_name, user_id, session_id)
+        nbytes = _session_bytes(session)
+        with self._lock:
+            replaced_spilled = self._spilled.pop(key, None) is not None
+            self._spilling.pop(key, None)
+            old = self._resident.pop(key, None)
+            if old is not None:
+                self._resident_bytes -= old.nbytes
+            self._admit(key, session, nbytes)
+            victims = self._select_victims(keep=key)
+            created = self._merge_state(app_name, user_id, copy.deepcopy(session))
+        if replaced_spilled:
+            _remove(self._path(key))
+        await self._evict(victims)
+        return created
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        key = (app_name, user_id, session_id)
+        resident = await self._load(key)
+        if resident is None:
+            return None
+        with self._lock:
+            stored = resident.session
+            session = Session.model_construct(
+                app_name=app_name, user_id=user_id, id=session_id,
+                state=copy.deepcopy(stored.state), events=list(select_events(stored.events, config)),
+                last_update_time=stored.last_update_time,
+            )
+            return self._merge_state(app_name, user_id, session)
+
+    async def get_state(self, *, app_name: str, user_id: str, session_id: str) -> Optional[dict[str, Any]]:
+        """The merged state of a session, or None if it does not exist; no events are copied."""
+        session = await self.get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=SessionReadConfig(state_only=True)
+        )
+        return session.state if session else None
+
+    def session_keys(self, app_name: Optional[str] = None) -> list[SessionKey]:
+        """(app_name, user_id, session_id) of every session, resident or spilled, for export (jsonl.py)."""
+        with self._lock:
+            keys = [*self._resident, *self._spilled]
+        return [key for key in keys if app_name is None or key[0] == app_name]
+
+    async def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        with self._lock:
+            found = [
+                (key[2], resident.session.last_update_time)
+                for key, resident in self._resident.items()
+                if key[0] == app_name and key[1] == user_id
+            ]
+            found += [(key[2], t) for key, t in self._spilled.items() if key[0] == app_name and key[1] == user_id]
+        return ListSessionsResponse(
+            sessions=[
+                Session(app_name=app_name, user_id=user_id, id=session_id, state={}, events=[], last_update_time=t)
+                for session_id, t in found
+            ]
+        )
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        key = (app_name, user_id, session_id)
+        with self._lock:
+            resident = self._resident.pop(key, None)
+            if resident is not None:
+                self._resident_bytes -= resident.nbytes
+            self._spilling.pop(key, None)
+            spilled = self._spilled.pop(key, None) is not None
+        if spilled:
+            _remove(self._path(key))
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        # Update the caller's copy first, as InMemorySessionService does.
+        await super().append_event(session=session, event=event)
+        if event.partial:
+            return event
+        session.last_update_time = event.timestamp
+
+        key = (session.app_name, session.user_id, session.id)
+        nbytes = _event_bytes(event)
+        state_delta = event.actions.state_delta if event.actions else None
+        if state_delta:
+            nbytes += len(json.dumps(state_delta, default=str))
+        while True:
+            resident = await self._load(key)
+            if resident is None:
+                return event
+            with self._lock:
+                # Evicted again while loading: load it once more. The check and the
+                # update are one critical section, so the session cannot be evicted
+                # (and spilled without this event) in between.
+                if self._resident.get(key) is not resident:
+                    continue
+                if state_delta:
+                    app_delta, user_delta, session_delta = split_state_delta(state_delta)
+                    self.scoped.update(*key[:2], app_delta, user_delta)
+                    resident.session.state.update(session_delta)
+                resident.session.events.append(event)
+                resident.session.last_update_time = event.timestamp
+                resident.nbytes += nbytes
+                self._resident_bytes += nbytes
+                victims = self._select_victims(keep=key)
+                break
+        await self._evict(victims)
+        return event
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "resident_sessions": len(self._resident),
+                "resident_bytes": self._resident_bytes,
+                "spilled_sessions": len(self._spilled),
+                "evictions": self.evictions,
+                "idle_evictions": self.idle_evictions,
+                "rehydrations": self.rehydrations,
+                "spilled_bytes": self.spilled_bytes,
+            }
@@ -0,0 +1,281 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session, State
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+
+from .listing import SessionPage, list_sessions_page
+from .reads import SessionReadConfig, select_events
+from .scoped import apply_event
+
+# A read-through, write-through cache of recently active sessions in front of any
+# session service:
+#
+#   session_service = CachedSessionService(
+#       FastReadDatabaseSessionService(db_url="postgresql://.../adk"), max_sessions=10_000
+#   )
+#   runner = Runner(agent=agent, app_name="MyApp", session_service=session_service)
+#
+# Runner reads the session at the start of every turn, usually on the worker that
+# handled the previous turn a moment ago. Here get_session is served from memory when
+# the cached copy is current; appends go to the backend first and are then applied to
+# the cached copy, so the next turn's read hits. Creates and appends that write `app:`
+# or `user:` state take the backend's new version stamp (below) for the copies they
+# change, so reads after them hit too.
+#
+# Other workers may write the same session, or its app's and user's state, through
+# their own caches. Before serving a cached copy, the cache asks the backend for the
+# session's version stamp, (last_update_time, number of events, app state version,
+# user state version), with `get_version`. That is one small query instead of reading
+# the session, its state rows and its events. If the stamp changed, the copy is dropped
+# and the session read again. `max_staleness` skips the check for copies checked less
+# than that many seconds ago.
+#
+# SqliteSessionService and RedisSessionService version every write. With
+# FastReadDatabaseSessionService the app and user parts are the rows' update_time,
+# which SQLite keeps to the second: two writes to the same app or user state within a
+# second can leave the second one unseen until the session itself changes. With a
+# backend that has no get_version (the stock services, ShardedInMemorySessionService),
+# copies are only served within `max_staleness` (0 by default: never).
+#
+# The cache holds the whole history of at most `max_sessions` sessions, least recently
+# used first out. Reads with a GetSessionConfig are served from a cached copy, and
+# passed through to the backend on a miss without filling the cache. `app:` and `user:`
+# keys written through this cache are applied to every cached session they belong to;
+# written by other workers, they change the stamp of every session of the app or user,
+# whose cached copies are then read again. As with ShardedInMemorySessionService,
+# returned sessions share Event objects with the cache: treat them as read-only.
+#
+# stats() reports the hit rate and the backend reads saved.
+
+
+class _Entry:
+    __slots__ = ("session", "checked", "scopes")
+
+    def __init__(self, session: Session, scopes: Optional[tuple]):
+        self.session = session
+        self.checked = time.monotonic()
+        # The app and user state versions of the backend's stamp, taken before the
+        # session was read; None if unknown, which fails the next check.
+        self.scopes = scopes
+
+
+def _version(session: Session) -> tuple[float, int]:
+    return session.last_update_time, len(session.events)
+
+
+def _snapshot(session: Session, config: Optional[GetSessionConfig] = None) -> Session:
+    # New list and state, shared events; see ShardedInMemorySessionService.
+    return Session.model_construct(
+        app_name=session.app_name, user_id=session.user_id, id=session.id,
+        state=copy.deepcopy(session.state), events=list(select_events(session.events, config)),
+        last_update_time=session.last_update_time,
+    )
+
+
+class CachedSessionService(BaseSessionService):
+    """Read-through, write-through LRU cache of sessions in front of another session service."""
+
+    def __init__(self, backend: BaseSessionService, *, max_sessions: int = 1024, max_staleness: float = 0.0):
+        """
+        :param backend: The service that stores the sessions.
+        :param max_sessions: The most sessions kept in memory.
+        :param max_staleness: Seconds a cached copy is served without checking its version.
+        """
+        if max_sessions < 1:
+            raise ValueError("max_sessions must be at least 1.")
+        self.backend = backend
+        self.max_sessions = max_sessions
+        self.max_staleness = max_staleness
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple[str, str, str], _Entry]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.version_checks = 0
+        self.invalidations = 0
+        self.backend_reads = 0
+
+    def _put(self, session: Session, scopes: Optional[tuple] = None):
+        key = (session.app_name, session.user_id, session.id)
+        with self._lock:
+            current = self._entries.get(key)
+            # A concurrent append may have cached a newer copy meanwhile.
+            if current is not None and current.session.last_update_time > session.last_update_time:
+                return
+            self._entries[key] = _Entry(_snapshot(session), scopes)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+
+    def _drop(self, key: tuple[str, str, str], entry: Optional[_Entry] = None):
+        with self._lock:
+            if entry is None or self._entries.get(key) is entry:
+                self._entries.pop(key, None)
+
+    async def _current(self, key: tuple[str, str, str]) -> Optional[_Entry]:
+        """The cached entry for `key` if it is known to be current, checking with the backend if due."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+        if time.monotonic() - entry.checked <= self.max_staleness:
+            return entry
+        get_version = getattr(self.backend, "get_version", None)
+        if get_version is None:
+            self._drop(key, entry)
+            return None
+        self.version_checks += 1
+        checked = time.monotonic()
+        version = await get_version(app_name=key[0], user_id=key[1], session_id=key[2])
+        with self._lock:
+            if (
+                self._entries.get(key) is entry and version is not None
+                and version[:2] == _version(entry.session) and version[2:] == entry.scopes
+            ):
+                entry.checked = checked
+                return entry
+        self.invalidations += 1
+        self._drop(key, entry)
+        return None
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session = await self.backend.create_session(
+            app_name=app_name, user_id=user_id, state=state, session_id=session_id
+        )
+        version = await self._get_version((app_name, user_id, session.id))
+        self._put(session, version[2:] if version else None)
+        return session
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        key = (app_name, user_id, session_id)
+        entry = await self._current(key)
+        if entry is not None:
+            self.hits += 1
+            with self._lock:
+                return _snapshot(entry.session, config)
+        self.misses += 1
+        self.backend_reads += 1
+        partial = config is not None and (
+            config.num_recent_events or config.after_timestamp
+            or (isinstance(config, SessionReadConfig) and (config.state_only or config.after_event_id))
+        )
+        if partial:
+            return await self.backend.get_session(app_name=app_name, user_id=user_id, session_id=session_id, config=config)
+        # The stamp first: a scope written between the two reads fails the next check
+        # rather than passing it with the old state cached.
+        version = await self._get_version(key)
+        session = await self.backend.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        if session is not None:
+            self._put(session, version[2:] if version else None)
+        return session
+
+    async def _get_version(self, key: tuple[str, str, str]) -> Optional[tuple]:
+        get_version = getattr(self.backend, "get_version", None)
+        return await get_version(app_name=key[0], user_id=key[1], session_id=key[2]) if get_version else None
+
+    async def get_state(self, *, app_name: str, user_id: str, session_id: str) -> Optional[dict[str, Any]]:
+        """The merged state of a session, or None if it does not exist; no events are copied."""
+        session = await self.get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=SessionReadConfig(state_only=True)
+        )
+        return session.state if session else None
+
+    async def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        return await self.backend.list_sessions(app_name=app_name, user_id=user_id)
+
+    async def list_sessions_page(
+        self, *, app_name: str, user_id: str, limit: int = 100, cursor: Optional[str] = None
+    ) -> SessionPage:
+        """A page of a user's sessions from the backend, most recently updated first (see listing.py)."""
+        return await list_sessions_page(self.backend, app_name=app_name, user_id=user_id, limit=limit, cursor=cursor)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await self.backend.delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        self._drop((app_name, user_id, session_id))
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        # The caller's copy before the append; the cached copy is updated only if it matches.
+        previous = (session.last_update_time, len(session.events))
+        await self.backend.append_event(session=session, event=event)
+        if event.partial:
+            return event
+        key = (session.app_name, session.user_id, session.id)
+        state_delta = event.actions.state_delta if event.actions else None
+        shared = {
+            k: v for k, v in (state_delta or {}).items()
+            if k.startswith(State.APP_PREFIX) or k.startswith(State.USER_PREFIX)
+        }
+        # The write moved the app or user state version: take the new stamp, so that the
+        # copies the write is applied to stay current.
+        version = await self._get_version(key) if shared else None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if _version(entry.session) == previous:
+                    apply_event(entry.session, event)
+                    entry.session.last_update_time = session.last_update_time
+                    entry.checked = time.monotonic()
+                    if shared:
+                        # Unless another append got in first; the next read then misses.
+                        current = version is not None and version[:2] == _version(entry.session)
+                        entry.scopes = version[2:] if current else None
+                else:
+                    del self._entries[key]
+            if shared:
+                self._share_scoped_state(session, shared, version)
+        return event
+
+    def _share_scoped_state(self, session: Session, shared: dict[str, Any], version: Optional[tuple]):
+        # `app:` and `user:` keys are shared with the other sessions of the app or user,
+        # whose copies take the new app or user state version from `version`. The caller
+        # holds the lock.
+        app_written = any(k.startswith(State.APP_PREFIX) for k in shared)
+        user_written = any(k.startswith(State.USER_PREFIX) for k in shared)
+        for (app_name, user_id, session_id), entry in self._entries.items():
+            if app_name != session.app_name or session_id == session.id:
+                continue
+            same_user = user_id == session.user_id
+            if not (app_written or same_user and user_written):
+                continue
+            for k, v in shared.items():
+                if k.startswith(State.APP_PREFIX) or same_user:
+                    entry.session.state[k] = v
+            if entry.scopes is not None and version is not None:
+                entry.scopes = (
+                    version[2] if app_written else entry.scopes[0],
+                    version[3] if same_user and user_written else entry.scopes[1],
+                )
+
+    def stats(self) -> dict[str, Any]:
+        reads = self.hits + self.misses
+        return {
+            "sessions": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / reads, 4) if reads else 0.0,
+            "version_checks": self.version_checks,
+            "invalidations": self.invalidations,
+            "backend_reads": self.backend_reads,
+            # Each hit replaced a full read with at most a version check.
+            "backend_reads_saved": self.hits,
+        }
@@ -0,0 +1,346 @@
+import json
+import struct
+import zlib
+from enum import Enum
+from typing import Any, Optional, Union
+
+from pydantic_core import from_json, to_json, to_jsonable_python
+
+from google.adk.events import Event
+from google.adk.sessions import Session
+
+# Encodings for persisted events and sessions.
+#
+# JsonEventCodec is what the stores in this package wrote so far: the event's JSON.
+# BinaryEventCodec is a compact binary format:
+#
+#   codec = BinaryEventCodec()
+#   data = codec.encode(event)       # bytes, starting with a version header
+#   event = decode_event(data)       # whichever codec wrote it
+#   header = codec.peek(data)        # dict; large parts come back as LazyValue
+#
+# The format is a tagged tree of values, like msgpack, with three additions:
+#
+# * A header: two magic bytes and a format version, so JSON and binary rows can be
+#   mixed in one store and the format can change without rewriting old data.
+# * Field ids: the field names of Event, Content, Part and EventActions are written as
+#   ids from a fixed table instead of strings. The table is append-only; a version never
+#   changes the meaning of an id.
+# * Payload fields (tool call arguments and responses, text, inline data, state deltas)
+#   larger than `lazy_threshold` bytes are written as length-prefixed blocks of compact
+#   JSON (or raw bytes for inline data), zlib-compressed when that makes them smaller.
+#   peek() skips over them and returns LazyValue placeholders that decode on first
+#   access, so listing or tailing events doesn't decode payloads nobody reads. Blocks
+#   are JSON rather than binary because pydantic_core parses and writes JSON in native
+#   code and a pure-Python binary decoder is several times slower.
+#
+# No third-party packages are needed; pydantic still validates every decoded event.
+
+MAGIC = b"\xadE"
+VERSION = 1
+
+# Append-only: ids are positions in this tuple.
+FIELD_IDS_V1 = (
+    "id", "invocation_id", "author", "timestamp", "content", "parts", "role", "text",
+    "function_call", "function_response", "name", "args", "response", "actions",
+    "state_delta", "artifact_delta", "skip_summarization", "transfer_to_agent", "escalate",
+    "requested_auth_configs", "branch", "partial", "turn_complete", "long_running_tool_ids",
+    "inline_data", "mime_type", "data", "thought", "thought_signature", "usage_metadata",
+    "prompt_token_count", "candidates_token_count", "total_token_count", "error_code",
+    "error_message", "interrupted", "grounding_metadata", "custom_metadata", "file_data",
+    "file_uri", "executable_code", "code", "language", "code_execution_result", "outcome",
+    "output", "video_metadata", "app_name", "user_id", "state", "events", "last_update_time",
+)
+_FIELD_ID = {name: i for i, name in enumerate(FIELD_IDS_V1)}
+
+# Fields whose values can be large and are worth decoding lazily.
+LAZY_FIELDS = frozenset({"args", "response", "text", "data", "state_delta", "custom_metadata"})
+
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _BYTES, _LIST, _DICT, _FIELD, _BLOCK = range(11)
+_BLOCK_ZLIB = 1
+_BLOCK_BYTES = 2
+_BLOCK_TEXT = 4
+_DOUBLE = struct.Struct("<d")
+
+
+class CodecError(Exception):
+    """Data that cannot be decoded by this codec or version."""
+
+
+class LazyValue:
+    """A payload that peek() skipped; `value` decodes it on first access."""
+
+    __slots__ = ("_block", "_flags", "_value", "_decoded")
+
+    def __init__(self, block: bytes, flags: int):
+        self._block = block
+        self._flags = flags
+        self._decoded = False
+        self._value = None
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the encoded payload."""
+        return len(self._block)
+
+    @property
+    def value(self) -> Any:
+        if not self._decoded:
+            self._value = _decode_block(self._block, self._flags)
+            self._decoded = True
+        return self._value
+
+    def __repr__(self):
+        return f"LazyValue({self.nbytes} bytes)"
+
+
+def _write_uvarint(out: bytearray, n: int):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _block_payload(value: Any) -> Optional[tuple[bytes, int]]:
+    """The uncompressed block for a payload field's value, or None if it isn't one."""
+    if isinstance(value, bytes):
+        return value, _BLOCK_BYTES
+    if isinstance(value, str):
+        return value.encode(), _BLOCK_TEXT
+    if isinstance(value, (dict, list)) and value:
+        return to_json(value), 0
+    return None
+
+
+def _decode_block(block: bytes, flags: int) -> Any:
+    if flags & _BLOCK_ZLIB:
+        block = zlib.decompress(block)
+    if flags & _BLOCK_BYTES:
+        return bytes(block)
+    if flags & _BLOCK_TEXT:
+        return bytes(block).decode()
+    return from_json(block)
+
+
+class _Encoder:
+    def __init__(self, lazy_threshold: int, compress_level: int):
+        self.lazy_threshold = lazy_threshold
+        self.compress_level = compress_level
+        self.out = bytearray(MAGIC)
+        self.out.append(VERSION)
+
+    def value(self, value: Any, field: Optional[str] = None):
+        out = self.out
+        if field in LAZY_FIELDS:
+            payload = _block_payload(value)
+            if payload is not None and len(payload[0]) > self.lazy_threshold:
+                block, flags = payload
+                compressed = zlib.compress(block, self.compress_level)
+                if len(compressed) < len(block):
+                    block, flags = compressed, flags | _BLOCK_ZLIB
+                out.append(_BLOCK)
+                out.append(flags)
+                _write_uvarint(out, len(block))
+                out += block
+                return
+        if value is None:
+            out.append(_NONE)
+        elif value is True:
+            out.append(_TRUE)
+        elif value is False:
+            out.append(_FALSE)
+        elif isinstance(value, int) and not isinstance(value, Enum):
+            out.append(_INT)
+            _write_uvarint(out, value << 1 if value >= 0 else (-value << 1) - 1)
+        elif isinstance(value, float):
+            out.append(_FLOAT)
+            out += _DOUBLE.pack(value)
+        elif isinstance(value, str):
+            encoded = (value.value if isinstance(value, Enum) else value).encode()
+            out.append(_STR)
+            _write_uvarint(out, len(encoded))
+            out += encoded
+        elif isinstance(value, bytes):
+            out.append(_BYTES)
+            _write_uvarint(out, len(value))
+            out += value
+        elif isinstance(value, dict):
+            out.append(_DICT)
+            _write_uvarint(out, len(value))
+            for key, item in value.items():
+                field_id = _FIELD_ID.get(key)
+                if field_id is None:
+                    self.value(str(key))
+                else:
+                    out.append(_FIELD)
+                    _write_uvarint(out, field_id)
+                self.value(item, key)
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            out.append(_LIST)
+            _write_uvarint(out, len(value))
+            for item in value:
+                self.value(item)
+        else:
+            self.value(to_jsonable_python(value))
+
+
+def _uvarint_tail(data: bytes, pos: int, n: int) -> tuple[int, int]:
+    # The rest of a varint whose first byte, `n`, had its continuation bit set.
+    n &= 0x7F
+    shift = 7
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+def _decode(data: bytes, pos: int, lazy: bool) -> tuple[Any, int]:
+    # A function over local variables rather than a reader object: attribute access
+    # dominated the decode time. Varints under 128 (almost all) are read inline.
+    tag = data[pos]
+    n = data[pos + 1] if tag >= _INT else 0
+    pos += 2 if tag >= _INT and tag != _FLOAT else 1
+    if n >= 0x80 and tag != _FLOAT and tag != _BLOCK:
+        n, pos = _uvarint_tail(data, pos, n)
+    if tag == _STR:
+        return data[pos:pos + n].decode(), pos + n
+    if tag == _DICT:
+        result = {}
+        for _ in range(n):
+            if data[pos] == _FIELD:
+                field_id = data[pos + 1]
+                pos += 2
+                if field_id >= 0x80:
+                    field_id, pos = _uvarint_tail(data, pos, field_id)
+                key = FIELD_IDS_V1[field_id]
+            else:
+                key, pos = _decode(data, pos, lazy)
+            result[key], pos = _decode(data, pos, lazy)
+        return result, pos
+    if tag == _INT:
+        return (n >> 1 if not n & 1 else -((n + 1) >> 1)), pos
+    if tag == _FLOAT:
+        return _DOUBLE.unpack_from(data, pos)[0], pos + 8
+    if tag == _LIST:
+        result = [None] * n
+        for i in range(n):
+            result[i], pos = _decode(data, pos, lazy)
+        return result, pos
+    if tag == _BLOCK:
+        flags = n
+        n = data[pos]
+        pos += 1
+        if n >= 0x80:
+            n, pos = _uvarint_tail(data, pos, n)
+        block = data[pos:pos + n]
+        return (LazyValue(block, flags) if lazy else _decode_block(block, flags)), pos + n
+    if tag == _BYTES:
+        return data[pos:pos + n], pos + n
+    if tag == _NONE:
+        return None, pos
+    if tag == _TRUE:
+        return True, pos
+    if tag == _FALSE:
+        return False, pos
+    raise CodecError(f"Unknown tag {tag} at offset {pos - 1}.")
+
+
+def _decode_payload(data: bytes, lazy: bool) -> Any:
+    if data[:2] != MAGIC:
+        raise CodecError("Not a BinaryEventCodec payload.")
+    if data[2] > VERSION:
+        raise CodecError(f"Unsupported BinaryEventCodec version {data[2]}.")
+    return _decode(data, 3, lazy)[0]
+
+
+class JsonEventCodec:
+    """Events as JSON, as stored by the session services in this package by default."""
+
+    name = "json"
+
+    def encode(self, event: Event) -> bytes:
+        return event.model_dump_json(exclude_none=True).encode()
+
+    def decode(self, data: Union[bytes, str]) -> Event:
+        return Event.model_validate_json(data)
+
+    def peek(self, data: Union[bytes, str]) -> dict[str, Any]:
+        return json.loads(data)
+
+    def encode_session(self, session: Session) -> bytes:
+        return session.model_dump_json(exclude_none=True).encode()
+
+    def decode_session(self, data: Union[bytes, str]) -> Session:
+        return Session.model_validate_json(data)
+
+
+class BinaryEventCodec:
+    """Compact binary events with a version header, field ids and lazily decoded payloads."""
+
+    name = "binary"
+
+    def __init__(self, lazy_threshold: int = 256, compress_level: int = 6):
+        """
+        :param lazy_threshold: Payload fields larger than this many bytes are written as
+            separately decodable, possibly compressed, blocks.
+        :param compress_level: zlib level for those blocks.
+        """
+        self.lazy_threshold = lazy_threshold
+        self.compress_level = compress_level
+
+    def encode_value(self, value: Any) -> bytes:
+        encoder = _Encoder(self.lazy_threshold, self.compress_level)
+        encoder.value(value)
+        return bytes(encoder.out)
+
+    def decode_value(self, data: bytes, lazy: bool = False) -> Any:
+        return _decode_payload(data, lazy)
+
+    def encode(self, event: Event) -> bytes:
+        return self.encode_value(event.model_dump(exclude_none=True))
+
+    def decode(self, data: bytes) -> Event:
+        return Event.model_validate(self.decode_value(data))
+
+    def peek(self, data: bytes) -> dict[str, Any]:
+        """The event as a dict without decoding its large payloads, and without validation."""
+        return self.decode_value(data, lazy=True)
+
+    def encode_session(self, session: Session) -> bytes:
+        fields = session.model_dump(exclude_none=True, exclude={"events"})
+        fields["events"] = [self.encode(event) for event in session.events]
+        return self.encode_value(fields)
+
+    def decode_session(self, data: bytes) -> Session:
+        fields = self.decode_value(data)
+        events = [self.decode(event) for event in fields.pop("events")]
+        session = Session.model_validate(fields)
+        session.events = events
+        return session
+
+
+def decode_event(data: Union[bytes, str]) -> Event:
+    """Decodes an event written by either codec."""
+    if isinstance(data, (bytes, memoryview)) and data[:2] == MAGIC:
+        return _BINARY.decode(bytes(data))
+    return Event.model_validate_json(data)
+
+
+def peek_event(data: Union[bytes, str]) -> dict[str, Any]:
+    """An event written by either codec as a dict; binary payloads are left as LazyValue."""
+    if isinstance(data, (bytes, memoryview)) and data[:2] == MAGIC:
+        return _BINARY.peek(bytes(data))
+    return json.loads(data)
+
+
+def decode_session(data: Union[bytes, str]) -> Session:
+    """Decodes a session written by either codec."""
+    if isinstance(data, (bytes, memoryview)) and data[:2] == MAGIC:
+        return _BINARY.decode_session(bytes(data))
+    return Session.model_validate_json(data)
+
+
+_BINARY = BinaryEventCodec()
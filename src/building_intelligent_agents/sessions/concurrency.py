@@ -0,0 +1,81 @@
+from typing import Any, Mapping, Optional
+
+from google.adk.sessions import State
+
+# Optimistic concurrency for appends to one session.
+#
+# Two messages for the same session (a web client sending again before the first reply,
+# a function_response arriving while the next user turn starts) each read the session,
+# run and append events. Every append is compare-and-swap on the session's version, its
+# last_update_time, which each append moves strictly forward:
+#
+#   session_service = SqliteSessionService("./adk_sessions.db", on_conflict="merge")
+#
+# * The caller's copy is current: the append goes through.
+# * The copy is older, on_conflict="merge" (the default): the service knows the version
+#   at which each state key was last written. If none of the keys in the event's
+#   state_delta were written after the caller's copy was read, the two appends touched
+#   different keys and the event is appended. The caller's copy then gets the values
+#   of the keys it had missed and the new version, so its next append is checked
+#   against current state. If a key was written meanwhile, SessionConflictError is
+#   raised and nothing is written; re-read the session and retry the turn.
+# * The copy is older, on_conflict="reject": ValueError, as DatabaseSessionService does
+#   for any stale copy.
+#
+# The check and the write happen under the same lock or transaction, so there is no
+# global lock and no lock held while an agent runs. SessionConflictError is a ValueError,
+# so code that handled stale sessions keeps working. ShardedInMemorySessionService,
+# SqliteSessionService and RedisSessionService implement this.
+
+ON_CONFLICT = ("merge", "reject")
+
+
+class SessionConflictError(ValueError):
+    """An append whose state delta writes keys that were written after the caller read the session."""
+
+    def __init__(self, session_id: str, keys: list[str]):
+        super().__init__(
+            f"Session {session_id} was changed since it was read, including the keys {keys} that this"
+            " event also writes. Read the session again and retry."
+        )
+        self.session_id = session_id
+        self.keys = keys
+
+
+def check_on_conflict(on_conflict: str) -> str:
+    if on_conflict not in ON_CONFLICT:
+        raise ValueError(f"on_conflict must be one of {ON_CONFLICT}, not '{on_conflict}'.")
+    return on_conflict
+
+
+def check_append(
+    on_conflict: str,
+    session_id: str,
+    read_version: float,
+    stored_version: float,
+    key_versions: Mapping[str, float],
+    state_delta: Optional[Mapping[str, Any]],
+) -> list[str]:
+    """Checks an append by a copy read at `read_version`; returns the keys written since.
+
+    Raises ValueError (on_conflict="reject") or SessionConflictError if it must not go through.
+    """
+    if stored_version <= read_version:
+        return []
+    if on_conflict == "reject":
+        raise ValueError(
+            f"The last_update_time provided in the session object ({read_version}) is earlier than the"
+            f" update_time in storage ({stored_version}). Please check if it is a stale session."
+        )
+    newer = [key for key, version in key_versions.items() if version > read_version]
+    conflicts = sorted(set(newer).intersection(state_delta or ()))
+    if conflicts:
+        raise SessionConflictError(session_id, conflicts)
+    return newer
+
+
+def record_key_versions(key_versions: dict[str, float], state_delta: Optional[Mapping[str, Any]], version: float):
+    """Marks the keys of `state_delta` (other than `temp:` keys) as written at `version`."""
+    for key in state_delta or ():
+        if not key.startswith(State.TEMP_PREFIX):
+            key_versions[key] = version
@@ -0,0 +1,216 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import Index, func, literal, or_, select
+
+from google.adk.sessions import DatabaseSessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.database_session_service import (
+    StorageAppState,
+    StorageEvent,
+    StorageSession,
+    StorageUserState,
+)
+
+from .listing import SessionPage, check_limit, decode_cursor, encode_cursor
+from .reads import SessionReadConfig
+from .scoped import merge_state
+
+# DatabaseSessionService with reads that only load what they return.
+#
+#   session_service = FastReadDatabaseSessionService(db_url="sqlite:///./adk_sessions.db")
+#   state = await session_service.get_state(app_name=..., user_id=..., session_id=...)
+#   session = await session_service.get_session(..., config=SessionReadConfig(num_recent_events=10))
+#
+# The stock get_session always loads the session's events, filtered by session id only
+# and sorted without an index. Here:
+#
+# * get_state and SessionReadConfig(state_only=True) read the session's state row and
+#   the app and user state rows, and no events.
+# * Events are filtered by the full session key and read through an index on
+#   (app_name, user_id, session_id, timestamp), so num_recent_events, after_timestamp and
+#   after_event_id cost what they return rather than the session's history.
+# * list_sessions reads the sessions' ids and update times only, not their state, and
+#   list_sessions_page (listing.py) reads one page of them through an index on
+#   (app_name, user_id, update_time, id).
+#
+# The indexes are created on first use if the database does not have them.
+#
+# get_version returns a session's version stamp, which CachedSessionService (cache.py)
+# checks before serving a cached copy. Writes are unchanged.
+# GroupCommitDatabaseSessionService builds on this class.
+
+_EVENTS_BY_SESSION = Index(
+    "ix_events_session_timestamp",
+    StorageEvent.app_name, StorageEvent.user_id, StorageEvent.session_id, StorageEvent.timestamp,
+)
+# With the id, pages come out of the index in order and without reading the table.
+_SESSIONS_BY_UPDATE_TIME = Index(
+    "ix_sessions_user_update_time",
+    StorageSession.app_name, StorageSession.user_id, StorageSession.update_time, StorageSession.id,
+)
+
+
+class FastReadDatabaseSessionService(DatabaseSessionService):
+    """DatabaseSessionService with state-only and indexed partial-history reads."""
+
+    def __init__(self, db_url: str, **kwargs: Any):
+        super().__init__(db_url, **kwargs)
+        _EVENTS_BY_SESSION.create(self.db_engine, checkfirst=True)
+        _SESSIONS_BY_UPDATE_TIME.create(self.db_engine, checkfirst=True)
+
+    def _read_state(self, db, app_name: str, user_id: str, session_state: dict[str, Any]) -> dict[str, Any]:
+        storage_app_state = db.get(StorageAppState, app_name)
+        storage_user_state = db.get(StorageUserState, (app_name, user_id))
+        return merge_state(
+            storage_app_state.state if storage_app_state else {},
+            storage_user_state.state if storage_user_state else {},
+            session_state,
+        )
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        read_config = config if isinstance(config, SessionReadConfig) else SessionReadConfig()
+        with self.database_session_factory() as db:
+            storage_session = db.get(StorageSession, (app_name, user_id, session_id))
+            if storage_session is None:
+                return None
+            storage_events = []
+            if not read_config.state_only:
+                query = select(StorageEvent).where(
+                    StorageEvent.app_name == app_name,
+                    StorageEvent.user_id == user_id,
+                    StorageEvent.session_id == session_id,
+                )
+                if config and config.after_timestamp:
+                    query = query.where(StorageEvent.timestamp >= datetime.fromtimestamp(config.after_timestamp))
+                if read_config.after_event_id:
+                    after = db.scalar(
+                        select(StorageEvent.timestamp).where(
+                            StorageEvent.id == read_config.after_event_id,
+                            StorageEvent.app_name == app_name,
+                            StorageEvent.user_id == user_id,
+                            StorageEvent.session_id == session_id,
+                        )
+                    )
+                    if after is not None:
+                        query = query.where(StorageEvent.timestamp > after)
+                query = query.order_by(StorageEvent.timestamp.desc())
+                if config and config.num_recent_events:
+                    query = query.limit(config.num_recent_events)
+                storage_events = db.scalars(query).all()
+            session = Session(
+                app_name=app_name,
+                user_id=user_id,
+                id=session_id,
+                state=self._read_state(db, app_name, user_id, storage_session.state),
+                last_update_time=storage_session.update_time.timestamp(),
+            )
+            session.events = [e.to_event() for e in reversed(storage_events)]
+        return session
+
+    async def get_state(self, *, app_name: str, user_id: str, session_id: str) -> Optional[dict[str, Any]]:
+        """The merged state of a session, or None if it does not exist; no events are read."""
+        with self.database_session_factory() as db:
+            session_state = db.scalar(
+                select(StorageSession.state).where(
+                    StorageSession.app_name == app_name,
+                    StorageSession.user_id == user_id,
+                    StorageSession.id == session_id,
+                )
+            )
+            if session_state is None:
+                return None
+            return self._read_state(db, app_name, user_id, session_state)
+
+    async def get_version(self, *, app_name: str, user_id: str, session_id: str) -> Optional[tuple]:
+        """(last_update_time, number of events, app state update_time, user state update_time)
+        of a session, or None if it does not exist.
+
+        Every append to the session changes it, including two in the same second, which
+        update_time alone cannot tell apart on SQLite. App and user state rows have no
+        version, only an update_time, which SQLite keeps to the second: a second write to
+        one within the same second as the previous one does not change the stamp.
+        """
+        event_count = (
+            select(func.count())
+            .where(
+                StorageEvent.app_name == app_name,
+                StorageEvent.user_id == user_id,
+                StorageEvent.session_id == session_id,
+            )
+            .scalar_subquery()
+        )
+        app_update_time = (
+            select(StorageAppState.update_time).where(StorageAppState.app_name == app_name).scalar_subquery()
+        )
+        user_update_time = (
+            select(StorageUserState.update_time)
+            .where(StorageUserState.app_name == app_name, StorageUserState.user_id == user_id)
+            .scalar_subquery()
+        )
+        with self.database_session_factory() as db:
+            row = db.execute(
+                select(StorageSession.update_time, event_count, app_update_time, user_update_time).where(
+                    StorageSession.app_name == app_name,
+                    StorageSession.user_id == user_id,
+                    StorageSession.id == session_id,
+                )
+            ).first()
+        if row is None:
+            return None
+        return (row[0].timestamp(), row[1], *(t.timestamp() if t is not None else None for t in row[2:]))
+
+    async def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        with self.database_session_factory() as db:
+            rows = db.execute(
+                select(StorageSession.id, StorageSession.update_time).where(
+                    StorageSession.app_name == app_name, StorageSession.user_id == user_id
+                )
+            ).all()
+        return ListSessionsResponse(
+            sessions=[
+                Session(app_name=app_name, user_id=user_id, id=session_id, state={}, last_update_time=t.timestamp())
+                for session_id, t in rows
+            ]
+        )
+
+    async def list_sessions_page(
+        self, *, app_name: str, user_id: str, limit: int = 100, cursor: Optional[str] = None
+    ) -> SessionPage:
+        """A page of a user's sessions, most recently updated first (see listing.py)."""
+        query = select(StorageSession.id, StorageSession.update_time).where(
+            StorageSession.app_name == app_name, StorageSession.user_id == user_id
+        )
+        if cursor is not None:
+            # Cursors hold update_time as stored, in ISO format, so no precision is lost.
+            update_time, session_id = decode_cursor(cursor, time_type=str)
+            try:
+                after = datetime.fromisoformat(update_time)
+            except ValueError:
+                raise ValueError(f"Invalid cursor '{cursor}'.") from None
+            if self.db_engine.dialect.name == "sqlite" and not after.microsecond:
+                # SQLite stores func.now() as text without fractional seconds; compare in that form.
+                after = literal(after.strftime("%Y-%m-%d %H:%M:%S"))
+            # The first condition bounds the index range scan; the second skips the page's ties.
+            query = query.where(
+                StorageSession.update_time <= after,
+                or_(StorageSession.update_time < after, StorageSession.id < session_id),
+            )
+        query = query.order_by(StorageSession.update_time.desc(), StorageSession.id.desc()).limit(
+            check_limit(limit) + 1
+        )
+        with self.database_session_factory() as db:
+            rows = db.execute(query).all()
+        page = rows[:limit]
+        sessions = [
+            Session(app_name=app_name, user_id=user_id, id=session_id, state={}, last_update_time=t.timestamp())
+            for session_id, t in page
+        ]
+        return SessionPage(sessions, encode_cursor(page[-1][1].isoformat(), page[-1][0]) if len(rows) > limit else None)
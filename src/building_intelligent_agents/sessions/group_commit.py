@@ -0,0 +1,237 @@
+import asyncio
+import concurrent.futures
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from sqlalchemy import select, tuple_
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.database_session_service import (
+    StorageAppState,
+    StorageEvent,
+    StorageSession,
+    StorageUserState,
+)
+
+from .database import FastReadDatabaseSessionService
+from .scoped import split_state_delta
+
+logger = logging.getLogger(__name__)
+
+# DatabaseSessionService with group commit for append_event.
+#
+# The stock service commits every appended event in its own transaction, on the event
+# loop. On SQLite every commit is an fsync, so a process tops out at a few hundred
+# events/sec no matter how many sessions are active, and the loop is blocked while it
+# waits. Here appends are handed to one writer thread, which collects events from all
+# sessions until `max_batch_size` are waiting or the oldest has waited
+# `max_batch_delay_ms`, then writes the whole batch in one transaction:
+#
+#   session_service = GroupCommitDatabaseSessionService(
+#       db_url="sqlite:///./adk_sessions.db", max_batch_size=128, max_batch_delay_ms=5
+#   )
+#
+# append_event only returns once the transaction holding its event has committed, so a
+# successful append is as durable as with the stock service. Events are written in the
+# order they were appended. If a batch fails to commit, its events are retried one per
+# transaction so that only the failing appends raise. Reads are those of
+# FastReadDatabaseSessionService (database.py).
+
+
+@dataclass
+class _PendingAppend:
+    session: Session
+    event: Event
+    future: concurrent.futures.Future = field(default_factory=concurrent.futures.Future)
+
+
+_STOP = object()
+
+
+class GroupCommitDatabaseSessionService(FastReadDatabaseSessionService):
+    """DatabaseSessionService whose appends are committed in batches by a writer thread."""
+
+    def __init__(self, db_url: str, *, max_batch_size: int = 64, max_batch_delay_ms: float = 5.0, **kwargs: Any):
+        """
+        :param db_url: The database URL, as for DatabaseSessionService.
+        :param max_batch_size: The most events written in one transaction.
+        :param max_batch_delay_ms: How long the first event of a batch waits for others.
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1.")
+        super().__init__(db_url, **kwargs)
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay_ms = max_batch_delay_ms
+        self.batches = 0
+        self.events_written = 0
+        self.failed_batches = 0
+        self.max_batch_seen = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="adk-group-commit", daemon=True)
+        self._writer.start()
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        if not self._writer.is_alive():
+            raise RuntimeError("GroupCommitDatabaseSessionService has been closed.")
+        pending = _PendingAppend(session=session, event=event)
+        self._queue.put(pending)
+        await asyncio.wrap_future(pending.future)
+        # Durable now; update the caller's copy as the stock service does.
+        await BaseSessionService.append_event(self, session=session, event=event)
+        return event
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Writes what is queued, then stops the writer thread."""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join(timeout)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "events_written": self.events_written,
+            "mean_batch_size": round(self.events_written / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_seen,
+            "failed_batches": self.failed_batches,
+            "queued": self._queue.qsize(),
+        }
+
+    # --- Writer thread ---
+
+    def _write_loop(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.max_batch_delay_ms / 1000
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: list[_PendingAppend]):
+        try:
+            written = self._commit(batch)
+        except Exception:
+            logger.exception("Group commit of %d events failed; retrying them one by one.", len(batch))
+            self.failed_batches += 1
+            written = []
+            for pending in batch:
+                if pending.future.done():
+                    continue
+                try:
+                    written += self._commit([pending])
+                except Exception as e:
+                    pending.future.set_exception(e)
+        self.batches += 1
+        self.events_written += len(written)
+        self.max_batch_seen = max(self.max_batch_seen, len(written))
+        for pending in written:
+            pending.future.set_result(None)
+
+    def _commit(self, batch: list[_PendingAppend]) -> list[_PendingAppend]:
+        """Writes the batch in one transaction; returns the appends that were staged."""
+        keys = list({(p.session.app_name, p.session.user_id, p.session.id) for p in batch})
+        staged = []
+        with self.database_session_factory() as db, db.no_autoflush:
+            # One query per table for the whole batch instead of several per event, and
+            # no autoflush, so all inserts go out together at commit.
+            storage_sessions = {
+                (s.app_name, s.user_id, s.id): s
+                for s in db.scalars(select(StorageSession).where(_session_keys_in(keys)))
+            }
+            app_states = {
+                s.app_name: s
+                for s in db.scalars(select(StorageAppState).where(StorageAppState.app_name.in_(list({k[0] for k in keys}))))
+            }
+            user_states = {
+                (s.app_name, s.user_id): s
+                for s in db.scalars(select(StorageUserState).where(
+                    tuple_(StorageUserState.app_name, StorageUserState.user_id).in_(list({k[:2] for k in keys}))
+                ))
+            }
+            # The session copy each session was appended from in this batch. Another copy
+            # was read before that append, so it is stale even though the stored
+            # update_time does not show it until commit.
+            appended_from: dict[tuple[str, str, str], Session] = {}
+            for pending in batch:
+                s = pending.session
+                key = (s.app_name, s.user_id, s.id)
+                try:
+                    if appended_from.get(key, s) is not s:
+                        raise ValueError(
+                            f"Session {s.id} was appended to from another copy since this copy was"
+                            " read. Please check if it is a stale session."
+                        )
+                    self._stage(
+                        db, storage_sessions.get(key),
+                        app_states.get(s.app_name), user_states.get((s.app_name, s.user_id)), s, pending.event,
+                    )
+                    appended_from[key] = s
+                    staged.append(pending)
+                except Exception as e:
+                    # Rejected before anything was written for it, e.g. a stale session.
+                    pending.future.set_exception(e)
+            if not staged:
+                return []
+            db.commit()
+            # Update timestamps with commit time, as the stock service does.
+            update_times = {
+                (app_name, user_id, session_id): update_time
+                for app_name, user_id, session_id, update_time in db.execute(
+                    select(StorageSession.app_name, StorageSession.user_id, StorageSession.id, StorageSession.update_time)
+                    .where(_session_keys_in(keys))
+                )
+            }
+        for pending in staged:
+            s = pending.session
+            s.last_update_time = update_times[(s.app_name, s.user_id, s.id)].timestamp()
+        return staged
+
+    @staticmethod
+    def _stage(
+        db,
+        storage_session: Optional[StorageSession],
+        storage_app_state: Optional[StorageAppState],
+        storage_user_state: Optional[StorageUserState],
+        session: Session,
+        event: Event,
+    ):
+        # What DatabaseSessionService.append_event writes, as of google-adk 1.2.0 (pinned
+        # in pyproject.toml): a stale session is refused, state deltas go to their rows
+        # and the event is added. Check it against that method when upgrading ADK.
+        if storage_session is None:
+            raise ValueError(f"Session {session.id} not found.")
+        if storage_session.update_time.timestamp() > session.last_update_time:
+            raise ValueError(
+                f"Session {session.id} was updated since this copy was read. Please check if it is a stale session."
+            )
+        if event.actions and event.actions.state_delta:
+            app_delta, user_delta, session_delta = split_state_delta(event.actions.state_delta)
+            if app_delta:
+                storage_app_state.state = {**storage_app_state.state, **app_delta}
+            if user_delta:
+                storage_user_state.state = {**storage_user_state.state, **user_delta}
+            if session_delta:
+                storage_session.state = {**storage_session.state, **session_delta}
+        db.add(StorageEvent.from_event(session, event))
+
+
+def _session_keys_in(keys: list[tuple[str, str, str]]):
+    return tuple_(StorageSession.app_name, StorageSession.user_id, StorageSession.id).in_(keys)
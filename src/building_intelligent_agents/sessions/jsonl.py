@@ -0,0 +1,380 @@
+import argparse
+import asyncio
+import collections
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+from pydantic_core import to_json
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, DatabaseSessionService, InMemorySessionService, Session
+
+from .sqlite import SqliteSessionService
+
+# Streaming export and import of sessions as JSONL, to move them between session
+# services (InMemorySessionService snapshots, SQLite, Postgres):
+#
+#   await export_sessions(source, "sessions.jsonl", app_name="MyApp", checkpoint_path="export.ckpt")
+#   await import_sessions(target, "sessions.jsonl", workers=8, checkpoint_path="import.ckpt")
+#
+#   python -m building_intelligent_agents.sessions.jsonl export sqlite:///./adk_sessions.db sessions.jsonl
+#   python -m building_intelligent_agents.sessions.jsonl import sessions.jsonl wal:./sessions.db
+#
+# On the command line a source or target is a DatabaseSessionService URL, or `wal:PATH`
+# for a SqliteSessionService database.
+#
+# The file starts with a header line, then has one line per session, one per event (the
+# event's own JSON) and an end line with the event count:
+#
+#   {"format":"adk-sessions-jsonl","version":1}
+#   {"type":"session","app_name":...,"user_id":...,"id":...,"state":{...},"last_update_time":...}
+#   {"content":...,"invocation_id":...,"author":...,"id":...,"timestamp":...}
+#   {"type":"end","events":1}
+#
+# Memory stays bounded: export fetches at most `workers` sessions ahead of the writer,
+# and import holds at most about 2 * `workers` sessions between the reader and the
+# writers. Import writes `workers` sessions concurrently. Events of one session are
+# always appended in order.
+#
+# Both can be resumed. Every `checkpoint_every` sessions they record in `checkpoint_path`
+# how far they have got, and on the next run with the same checkpoint path they continue
+# from there. Export truncates the file to the last checkpointed session, and starts
+# over when the file is missing or shorter than that. Import restarts at the first
+# session not known to be complete, and only marks the checkpoint complete when no
+# session was cut off. Sessions that already exist in the target are replaced, so a
+# session imported again by a resumed run is not doubled.
+#
+# Import uses the target's `restore_session` when it has one (SqliteSessionService), which
+# writes a session and its events in one transaction and keeps last_update_time.
+# Otherwise sessions are re-created with create_session and their events replayed with
+# append_event; the target then gives them a new last_update_time.
+
+FORMAT = "adk-sessions-jsonl"
+VERSION = 1
+
+SessionKey = tuple[str, str, str]
+
+_SESSION_PREFIX = b'{"type":"session"'
+_END_PREFIX = b'{"type":"end"'
+
+
+class SessionFileError(Exception):
+    """A session export file that is not in the expected format."""
+
+
+@dataclass
+class TransferResult:
+    sessions: int = 0
+    events: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    # Sessions done by an earlier run, found in the checkpoint.
+    resumed_sessions: int = 0
+    # Import only: sessions at the end of the file without an end line.
+    incomplete_sessions: int = 0
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events / self.seconds if self.seconds else 0.0
+
+
+def session_keys(service: BaseSessionService, app_name: Optional[str] = None) -> list[SessionKey]:
+    """(app_name, user_id, session_id) of every session in `service`, sorted.
+
+    BaseSessionService cannot list users, so this knows how each supported service stores
+    sessions: services with a `session_keys` method, InMemorySessionService and
+    DatabaseSessionService (with its subclasses).
+    """
+    if hasattr(service, "session_keys"):
+        keys = service.session_keys(app_name)
+    elif isinstance(service, InMemorySessionService):
+        keys = [
+            (app, user_id, session_id)
+            for app, users in service.sessions.items()
+            if app_name is None or app == app_name
+            for user_id, sessions in users.items()
+            for session_id in sessions
+        ]
+    elif isinstance(service, DatabaseSessionService):
+        from sqlalchemy import select
+
+        from google.adk.sessions.database_session_service import StorageSession
+
+        query = select(StorageSession.app_name, StorageSession.user_id, StorageSession.id)
+        if app_name is not None:
+            query = query.where(StorageSession.app_name == app_name)
+        with service.database_session_factory() as db:
+            keys = [tuple(row) for row in db.execute(query)]
+    else:
+        raise TypeError(f"Cannot enumerate the sessions of {type(service).__name__}; pass keys explicitly.")
+    return sorted(keys)
+
+
+def _read_checkpoint(path: Optional[str]) -> Optional[dict[str, Any]]:
+    if path is None or not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_checkpoint(path: Optional[str], record: dict[str, Any]):
+    if path is None:
+        return
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(record, f)
+    os.replace(path + ".tmp", path)
+
+
+def encode_session_lines(session: Session) -> bytes:
+    """A session and its events as lines of the export format."""
+    header = {
+        "type": "session",
+        "app_name": session.app_name,
+        "user_id": session.user_id,
+        "id": session.id,
+        "state": session.state,
+        "last_update_time": session.last_update_time,
+    }
+    lines = [to_json(header)]
+    lines += [event.model_dump_json(exclude_none=True).encode() for event in session.events]
+    lines.append(to_json({"type": "end", "events": len(session.events)}))
+    lines.append(b"")
+    return b"\n".join(lines)
+
+
+async def export_sessions(
+    service: BaseSessionService,
+    path: str,
+    *,
+    keys: Optional[Iterable[SessionKey]] = None,
+    app_name: Optional[str] = None,
+    workers: int = 8,
+    checkpoint_path: Optional[str] = None,
+    checkpoint_every: int = 100,
+) -> TransferResult:
+    """Writes sessions to a JSONL file, reading up to `workers` sessions concurrently.
+
+    :param keys: Sessions to export; every session of `app_name` (or of every app) by default.
+    """
+    keys = sorted(keys) if keys is not None else session_keys(service, app_name)
+    result = TransferResult()
+    start = time.perf_counter()
+    checkpoint = _read_checkpoint(checkpoint_path)
+    if checkpoint and (not os.path.exists(path) or os.path.getsize(path) < checkpoint["offset"]):
+        # The file it describes is gone or was cut short; start over.
+        checkpoint = None
+    done = checkpoint["sessions"] if checkpoint else 0
+    result.resumed_sessions = done
+
+    async def _fetch(key: SessionKey) -> Optional[Session]:
+        return await service.get_session(app_name=key[0], user_id=key[1], session_id=key[2])
+
+    with open(path, "r+b" if checkpoint else "wb") as f:
+        if checkpoint:
+            f.truncate(checkpoint["offset"])
+            f.seek(checkpoint["offset"])
+        else:
+            f.write(to_json({"format": FORMAT, "version": VERSION}) + b"\n")
+        remaining = iter(keys[done:])
+        pending: collections.deque[asyncio.Task] = collections.deque()
+        for key in remaining:
+            pending.append(asyncio.create_task(_fetch(key)))
+            if len(pending) >= workers:
+                break
+        try:
+            while pending:
+                session = await pending.popleft()
+                next_key = next(remaining, None)
+                if next_key is not None:
+                    pending.append(asyncio.create_task(_fetch(next_key)))
+                done += 1
+                if session is not None:
+                    data = encode_session_lines(session)
+                    f.write(data)
+                    result.sessions += 1
+                    result.events += len(session.events)
+                    result.bytes += len(data)
+                if done % checkpoint_every == 0:
+                    f.flush()
+                    _write_checkpoint(checkpoint_path, {"sessions": done, "offset": f.tell()})
+        finally:
+            for task in pending:
+                task.cancel()
+        f.flush()
+        _write_checkpoint(checkpoint_path, {"sessions": done, "offset": f.tell(), "complete": True})
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+@dataclass
+class _Job:
+    seq: int
+    header: dict[str, Any]
+    events: list[bytes]
+    # File offset just past the session's end line.
+    end: int
+
+
+async def _restore(service: BaseSessionService, job: _Job):
+    header = job.header
+    events = [Event.model_validate_json(line) for line in job.events]
+    restore_session = getattr(service, "restore_session", None)
+    if restore_session is not None:
+        await restore_session(
+            Session(
+                app_name=header["app_name"], user_id=header["user_id"], id=header["id"], state=header["state"],
+                events=events, last_update_time=header["last_update_time"],
+            )
+        )
+        return
+    key = dict(app_name=header["app_name"], user_id=header["user_id"])
+    # Replace what an interrupted run (or anything else) left under this id.
+    await service.delete_session(**key, session_id=header["id"])
+    session = await service.create_session(**key, state=header["state"], session_id=header["id"])
+    for event in events:
+        await service.append_event(session, event)
+
+
+def _check_header(path: str) -> int:
+    """Raises SessionFileError unless `path` starts with a readable export header; returns its length."""
+    with open(path, "rb") as f:
+        header = f.readline()
+    try:
+        fmt = json.loads(header)
+    except ValueError:
+        fmt = None
+    if not isinstance(fmt, dict) or fmt.get("format") != FORMAT:
+        raise SessionFileError(f"{path} is not a session export.")
+    if fmt.get("version", 0) > VERSION:
+        raise SessionFileError(f"{path} has format version {fmt['version']}; this reads up to {VERSION}.")
+    return len(header)
+
+
+async def import_sessions(
+    service: BaseSessionService,
+    path: str,
+    *,
+    workers: int = 8,
+    checkpoint_path: Optional[str] = None,
+    checkpoint_every: int = 100,
+) -> TransferResult:
+    """Creates the sessions of a JSONL file in `service`, `workers` sessions at a time."""
+    result = TransferResult()
+    start = time.perf_counter()
+    checkpoint = _read_checkpoint(checkpoint_path)
+    jobs: asyncio.Queue[Optional[_Job]] = asyncio.Queue(maxsize=workers)
+    # Sessions finish out of order; the checkpoint is the end of the longest finished prefix.
+    finished: dict[int, _Job] = {}
+    next_seq = 0
+    resumed = checkpoint["sessions"] if checkpoint else 0
+    result.resumed_sessions = resumed
+
+    committed_offset = checkpoint["offset"] if checkpoint else None
+
+    def _advance(job: _Job):
+        nonlocal next_seq, committed_offset
+        finished[job.seq] = job
+        checkpoint_due = False
+        while next_seq in finished:
+            committed_offset = finished.pop(next_seq).end
+            next_seq += 1
+            checkpoint_due = checkpoint_due or next_seq % checkpoint_every == 0
+        if checkpoint_due:
+            _write_checkpoint(checkpoint_path, {"sessions": resumed + next_seq, "offset": committed_offset})
+
+    async def _writer():
+        while (job := await jobs.get()) is not None:
+            await _restore(service, job)
+            result.sessions += 1
+            result.events += len(job.events)
+            _advance(job)
+
+    async def _reader():
+        with open(path, "rb") as f:
+            offset = checkpoint["offset"] if checkpoint else header_length
+            f.seek(offset)
+            seq, session_header, events = 0, None, []
+            for line in f:
+                offset += len(line)
+                result.bytes += len(line)
+                if line.startswith(_SESSION_PREFIX):
+                    if session_header is not None:
+                        raise SessionFileError(f"Session {session_header['id']} has no end line.")
+                    session_header, events = json.loads(line), []
+                elif line.startswith(_END_PREFIX):
+                    if session_header is None or json.loads(line)["events"] != len(events):
+                        raise SessionFileError(f"Unexpected end line at offset {offset - len(line)}.")
+                    await jobs.put(_Job(seq, session_header, events, offset))
+                    seq, session_header = seq + 1, None
+                elif session_header is not None:
+                    events.append(line)
+                elif line.strip():
+                    raise SessionFileError(f"Event outside a session at offset {offset - len(line)}.")
+            # A session cut off by an interrupted export.
+            result.incomplete_sessions = int(session_header is not None)
+        for _ in range(workers):
+            await jobs.put(None)
+
+    header_length = _check_header(path)
+    try:
+        async with asyncio.TaskGroup() as group:
+            group.create_task(_reader())
+            for _ in range(workers):
+                group.create_task(_writer())
+    except ExceptionGroup as errors:
+        # The reader or a writer failed and the others were cancelled: raise what failed,
+        # e.g. the SessionFileError, rather than the group.
+        if len(errors.exceptions) == 1:
+            raise errors.exceptions[0] from None
+        raise
+
+    if committed_offset is not None:
+        record = {"sessions": resumed + next_seq, "offset": committed_offset}
+        if not result.incomplete_sessions:
+            record["complete"] = True
+        _write_checkpoint(checkpoint_path, record)
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def _open_service(url: str) -> BaseSessionService:
+    # "wal:PATH" is a SqliteSessionService database; anything else a DatabaseSessionService URL.
+    if url.startswith("wal:"):
+        return SqliteSessionService(url.removeprefix("wal:"))
+    return DatabaseSessionService(db_url=url)
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Export sessions to JSONL or import them from it.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Write the sessions of SOURCE to PATH.")
+    export.add_argument("source", help="DatabaseSessionService URL, or wal:PATH for SqliteSessionService.")
+    export.add_argument("path")
+    export.add_argument("--app", help="Only this app's sessions.")
+    import_ = commands.add_parser("import", help="Create the sessions in PATH in TARGET.")
+    import_.add_argument("path")
+    import_.add_argument("target", help="DatabaseSessionService URL, or wal:PATH for SqliteSessionService.")
+    for command in (export, import_):
+        command.add_argument("--workers", type=int, default=8)
+        command.add_argument("--checkpoint", help="Checkpoint file; an interrupted run resumes from it.")
+        command.add_argument("--checkpoint-every", type=int, default=100, help="Sessions between checkpoints.")
+    args = parser.parse_args(argv)
+
+    options = dict(workers=args.workers, checkpoint_path=args.checkpoint, checkpoint_every=args.checkpoint_every)
+    if args.command == "export":
+        result = asyncio.run(export_sessions(_open_service(args.source), args.path, app_name=args.app, **options))
+    else:
+        result = asyncio.run(import_sessions(_open_service(args.target), args.path, **options))
+    print(
+        f"{args.command}: {result.sessions} sessions, {result.events} events, {result.bytes / 2**20:.1f} MiB"
+        f" in {result.seconds:.1f}s ({result.events_per_second:.0f} events/s)"
+        + (f", resumed after {result.resumed_sessions} sessions" if result.resumed_sessions else "")
+        + (f", {result.incomplete_sessions} incomplete session at the end skipped" if result.incomplete_sessions else "")
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,589 @@
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, Optional, Union
+from urllib.parse import quote
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+
+from .codec import BinaryEventCodec, JsonEventCodec, decode_event
+from .concurrency import check_append, check_on_conflict, record_key_versions
+from .reads import SessionReadConfig, select_events
+from .scoped import merge_state, split_state_delta
+
+try:
+    from redis.exceptions import WatchError
+except ImportError:
+
+    class WatchError(Exception):
+        """A key watched by a transaction was changed before it executed."""
+
+
+# A session service over a Redis-compatible key-value store, so that several Runner
+# processes can share sessions:
+#
+#   import redis.asyncio as redis
+#   session_service = RedisSessionService(redis.Redis.from_url("redis://localhost:6379/0"), ttl=24 * 3600)
+#
+#   # No server: an in-process stand-in with the same API, for tests and benchmarks.
+#   session_service = RedisSessionService(FakeRedis())
+#
+# Layout, for a session key K = "<prefix>:s:<app>:<user>:<session_id>":
+#
+#   K:meta       hash   create_time, update_time, the session's own ttl if it has one, and
+#                       "v:<state key>" -> update_time of the append that last wrote the key
+#   K:state      hash   session-scoped state, one JSON-encoded field per key
+#   K:events     list   encoded events, appended with RPUSH
+#   <prefix>:app:<app>           hash  app-scoped state (`app:` keys, without the prefix)
+#   <prefix>:user:<app>:<user>   hash  user-scoped state
+#   <app key>:version, <user key>:version   counters bumped with every write to the hash
+#   <prefix>:index:<app>:<user>  hash  session_id -> update_time, for list_sessions
+#
+# * Writes are pipelined: all the commands of an append (event, state hashes, meta,
+#   index, TTLs) go out in one MULTI/EXEC, so an append costs three round trips (WATCH,
+#   reading the meta, EXEC) however much it changes. A read is one pipeline that
+#   fetches the meta, state and event keys together.
+# * Appends are optimistic: the transaction WATCHes K:meta, checks the caller's copy
+#   against the stored update_time and key versions (concurrency.py), and commits only
+#   if nobody else wrote the session in between; if somebody did, the check is made
+#   again, up to `retries` times. An append from an older copy whose state delta writes
+#   none of the keys written since goes through; one that does raises
+#   SessionConflictError. Nothing is locked while an agent runs.
+# * State deltas are HSETs of the changed fields only, so app- and user-scoped keys
+#   written by different sessions don't overwrite each other.
+# * With `ttl` (or a per-session ttl from expire_session) the session's keys expire
+#   that many seconds after its last write. Expired sessions disappear from
+#   list_sessions; app and user state never expire.
+#
+# The client must be a redis.asyncio client (or compatible) created without
+# decode_responses, since events are stored as binary. Semantics otherwise follow
+# SqliteSessionService (sqlite.py): `temp:` keys are never stored, and update times are
+# strictly increasing float seconds.
+
+
+def _b(value: Any) -> bytes:
+    # Redis stores everything as bytes; numbers as their decimal representation.
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        return value.encode()
+    return repr(value).encode()
+
+
+class _FakeCommands:
+    """The Redis commands RedisSessionService uses, over `_command`."""
+
+    def get(self, name):
+        return self._command("get", name)
+
+    def incr(self, name):
+        return self._command("incr", name)
+
+    def hget(self, name, key):
+        return self._command("hget", name, key)
+
+    def hgetall(self, name):
+        return self._command("hgetall", name)
+
+    def hset(self, name, key=None, value=None, mapping=None):
+        return self._command("hset", name, key, value, mapping)
+
+    def hdel(self, name, *keys):
+        return self._command("hdel", name, *keys)
+
+    def rpush(self, name, *values):
+        return self._command("rpush", name, *values)
+
+    def lrange(self, name, start, end):
+        return self._command("lrange", name, start, end)
+
+    def llen(self, name):
+        return self._command("llen", name)
+
+    def exists(self, *names):
+        return self._command("exists", *names)
+
+    def delete(self, *names):
+        return self._command("delete", *names)
+
+    def expire(self, name, seconds):
+        return self._command("expire", name, seconds)
+
+    def persist(self, name):
+        return self._command("persist", name)
+
+    def ttl(self, name):
+        return self._command("ttl", name)
+
+
+class FakeRedis(_FakeCommands):
+    """An in-process stand-in for a redis.asyncio client, for tests and benchmarks.
+
+    It implements the commands, pipelines and WATCH/MULTI/EXEC transactions that
+    RedisSessionService uses, with Redis's semantics (bytes in and out, TTLs, watched
+    keys invalidated by any write). Each client call or pipeline execution is one round
+    trip and sleeps for `latency` seconds, to stand in for the network.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self._data: dict[bytes, Any] = {}
+        self._expires: dict[bytes, float] = {}
+        # Bumped on every write to a key, for WATCH.
+        self._versions: dict[bytes, int] = {}
+        self.round_trips = 0
+        self.commands = 0
+
+    async def _round_trip(self):
+        self.round_trips += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def _command(self, name: str, *args):
+        await self._round_trip()
+        return self._execute(name, args)
+
+    def pipeline(self, transaction: bool = True) -> "_FakePipeline":
+        return _FakePipeline(self)
+
+    async def aclose(self):
+        pass
+
+    def stats(self) -> dict[str, Any]:
+        return {"keys": len(self._data), "round_trips": self.round_trips, "commands": self.commands}
+
+    # --- Store ---
+
+    def _version(self, key: bytes) -> int:
+        self._live(key)
+        return self._versions.get(key, 0)
+
+    def _live(self, key: bytes) -> Any:
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._remove(key)
+        return self._data.get(key)
+
+    def _remove(self, key: bytes) -> bool:
+        self._expires.pop(key, None)
+        if self._data.pop(key, None) is None:
+            return False
+        self._touch(key)
+        return True
+
+    def _touch(self, key: bytes):
+        self._versions[key] = self._versions.get(key, 0) + 1
+
+    def _container(self, key: bytes, kind: type) -> Any:
+        value = self._live(key)
+        if value is None:
+            value = self._data[key] = kind()
+        elif not isinstance(value, kind):
+            raise TypeError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    def _execute(self, name: str, args: tuple) -> Any:
+        self.commands += 1
+        if name in ("exists", "delete"):
+            keys = [_b(k) for k in args]
+        else:
+            key, args = _b(args[0]), args[1:]
+        if name == "get":
+            return self._live(key)
+        if name == "incr":
+            value = self._live(key)
+            if isinstance(value, (dict, list)):
+                raise TypeError("WRONGTYPE Operation against a key holding the wrong kind of value")
+            self._data[key] = _b(int(value or 0) + 1)
+            self._touch(key)
+            return int(self._data[key])
+        if name == "hget":
+            return (self._live(key) or {}).get(_b(args[0]))
+        if name == "hgetall":
+            return dict(self._live(key) or {})
+        if name == "hset":
+            field, value, mapping = args
+            items = {**({field: value} if field is not None else {}), **(mapping or {})}
+            fields = self._container(key, dict)
+            added = sum(_b(f) not in fields for f in items)
+            fields.update((_b(f), _b(v)) for f, v in items.items())
+            self._touch(key)
+            return added
+        if name == "hdel":
+            fields = self._live(key) or {}
+            removed = sum(fields.pop(_b(f), None) is not None for f in args)
+            if removed:
+                self._touch(key)
+                if not fields:
+                    self._remove(key)
+            return removed
+        if name == "rpush":
+            items = self._container(key, list)
+            items.extend(_b(v) for v in args)
+            self._touch(key)
+            return len(items)
+        if name == "lrange":
+            items = self._live(key) or []
+            start, end = args
+            start = max(start + len(items), 0) if start < 0 else start
+            end = end + len(items) if end < 0 else end
+            return items[start:end + 1]
+        if name == "llen":
+            return len(self._live(key) or [])
+        if name == "exists":
+            return sum(self._live(k) is not None for k in keys)
+        if name == "delete":
+            return sum(self._remove(k) for k in keys)
+        if name == "expire":
+            if self._live(key) is None:
+                return 0
+            self._expires[key] = time.monotonic() + args[0]
+            self._touch(key)
+            return 1
+        if name == "persist":
+            if self._live(key) is None or self._expires.pop(key, None) is None:
+                return 0
+            self._touch(key)
+            return 1
+        if name == "ttl":
+            if self._live(key) is None:
+                return -2
+            deadline = self._expires.get(key)
+            return -1 if deadline is None else max(round(deadline - time.monotonic()), 0)
+        raise ValueError(f"FakeRedis does not implement {name.upper()}.")
+
+
+class _FakePipeline(_FakeCommands):
+    # As in redis-py: after watch() commands run immediately (and are awaited) until
+    # multi(); otherwise they are queued and sent by execute() in one round trip.
+
+    def __init__(self, client: FakeRedis):
+        self._client = client
+        self._queue: list[tuple[str, tuple]] = []
+        self._watched: dict[bytes, int] = {}
+        self._immediate = False
+
+    async def __aenter__(self) -> "_FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.reset()
+
+    def _command(self, name: str, *args):
+        if self._immediate:
+            return self._client._command(name, *args)
+        self._queue.append((name, args))
+        return self
+
+    async def watch(self, *names):
+        await self._client._round_trip()
+        for name in names:
+            key = _b(name)
+            self._watched[key] = self._client._version(key)
+        self._immediate = True
+
+    def multi(self):
+        self._immediate = False
+
+    async def execute(self) -> list[Any]:
+        client = self._client
+        try:
+            await client._round_trip()
+            # Nothing else runs between the check and the commands: the fake is
+            # single-threaded and there is no await in between.
+            if any(client._version(key) != version for key, version in self._watched.items()):
+                raise WatchError("Watched variable changed.")
+            return [client._execute(name, args) for name, args in self._queue]
+        finally:
+            await self.reset()
+
+    async def reset(self):
+        self._queue.clear()
+        self._watched.clear()
+        self._immediate = False
+
+
+def _part(value: str) -> str:
+    return quote(value, safe="")
+
+
+def _decode_state(fields: dict[bytes, bytes]) -> dict[str, Any]:
+    return {key.decode(): json.loads(value) for key, value in fields.items()}
+
+
+def _encode_state(state: dict[str, Any]) -> dict[str, str]:
+    return {key: json.dumps(value) for key, value in state.items()}
+
+
+class RedisSessionService(BaseSessionService):
+    """Session service over a Redis-compatible store, with optimistic appends and TTLs."""
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        prefix: str = "adk",
+        ttl: Optional[float] = None,
+        codec: Optional[Union[BinaryEventCodec, JsonEventCodec]] = None,
+        on_conflict: str = "merge",
+        retries: int = 8,
+    ):
+        """
+        :param client: A redis.asyncio client created without decode_responses, or FakeRedis.
+        :param prefix: Prepended to every key, so several services can share a database.
+        :param ttl: Seconds after its last write that a session expires; None to keep sessions.
+        :param codec: How events are encoded; BinaryEventCodec by default.
+        :param on_conflict: What an append from a copy older than the stored session does:
+            "merge" goes through unless it writes a state key written since, "reject" raises.
+        :param retries: How many times an append whose transaction lost a race is checked
+            and tried again before it raises ValueError.
+        """
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.codec = codec or BinaryEventCodec()
+        self.on_conflict = check_on_conflict(on_conflict)
+        self.retries = retries
+        self.appends = 0
+        self.conflicts = 0
+
+    def _session_key(self, app_name: str, user_id: str, session_id: str) -> str:
+        return f"{self.prefix}:s:{_part(app_name)}:{_part(user_id)}:{_part(session_id)}"
+
+    def _app_key(self, app_name: str) -> str:
+        return f"{self.prefix}:app:{_part(app_name)}"
+
+    def _user_key(self, app_name: str, user_id: str) -> str:
+        return f"{self.prefix}:user:{_part(app_name)}:{_part(user_id)}"
+
+    def _index_key(self, app_name: str, user_id: str) -> str:
+        return f"{self.prefix}:index:{_part(app_name)}:{_part(user_id)}"
+
+    def _queue_state(self, pipe, app_name: str, user_id: str, key: str, state_delta: dict[str, Any]):
+        app_delta, user_delta, session_delta = split_state_delta(state_delta)
+        if app_delta:
+            pipe.hset(self._app_key(app_name), mapping=_encode_state(app_delta))
+            pipe.incr(self._app_key(app_name) + ":version")
+        if user_delta:
+            pipe.hset(self._user_key(app_name, user_id), mapping=_encode_state(user_delta))
+            pipe.incr(self._user_key(app_name, user_id) + ":version")
+        if session_delta:
+            pipe.hset(key + ":state", mapping=_encode_state(session_delta))
+
+    def _queue_expire(self, pipe, key: str, ttl: Optional[float], events: bool = True):
+        if ttl is None:
+            return
+        for suffix in (":meta", ":state", ":events") if events else (":meta", ":state"):
+            pipe.expire(key + suffix, max(int(ttl), 1))
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = session_id.strip() if session_id and session_id.strip() else str(uuid.uuid4())
+        key = self._session_key(app_name, user_id, session_id)
+        now = time.time()
+        async with self.client.pipeline(transaction=True) as pipe:
+            await pipe.watch(key + ":meta")
+            if await pipe.exists(key + ":meta"):
+                raise ValueError(f"Session {session_id} already exists for user {user_id} of app {app_name}.")
+            pipe.multi()
+            pipe.delete(key + ":state", key + ":events")
+            pipe.hset(key + ":meta", mapping={"create_time": now, "update_time": now})
+            self._queue_state(pipe, app_name, user_id, key, state or {})
+            pipe.hset(self._index_key(app_name, user_id), session_id, now)
+            self._queue_expire(pipe, key, self.ttl, events=False)
+            pipe.hgetall(self._app_key(app_name))
+            pipe.hgetall(self._user_key(app_name, user_id))
+            pipe.hgetall(key + ":state")
+            try:
+                *_, app_state, user_state, session_state = await pipe.execute()
+            except WatchError:
+                raise ValueError(
+                    f"Session {session_id} already exists for user {user_id} of app {app_name}."
+                ) from None
+        return Session(
+            app_name=app_name, user_id=user_id, id=session_id,
+            state=merge_state(_decode_state(app_state), _decode_state(user_state), _decode_state(session_state)),
+            last_update_time=now,
+        )
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        key = self._session_key(app_name, user_id, session_id)
+        read_config = config if isinstance(config, SessionReadConfig) else SessionReadConfig()
+        # Only the last n events, unless a filter needs to look at all of them.
+        tail = config.num_recent_events if config and not config.after_timestamp and not read_config.after_event_id else None
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hget(key + ":meta", "update_time")
+            pipe.hgetall(self._app_key(app_name))
+            pipe.hgetall(self._user_key(app_name, user_id))
+            pipe.hgetall(key + ":state")
+            if not read_config.state_only:
+                pipe.lrange(key + ":events", -tail if tail else 0, -1)
+            update_time, app_state, user_state, session_state, *event_data = await pipe.execute()
+        if update_time is None:
+            return None
+        events = [decode_event(data) for data in event_data[0]] if event_data else []
+        if not tail:
+            events = list(select_events(events, config))
+        return Session(
+            app_name=app_name, user_id=user_id, id=session_id,
+            state=merge_state(_decode_state(app_state), _decode_state(user_state), _decode_state(session_state)),
+            events=events, last_update_time=float(update_time),
+        )
+
+    async def get_state(self, *, app_name: str, user_id: str, session_id: str) -> Optional[dict[str, Any]]:
+        """The merged state of a session, or None if it does not exist; no events are read."""
+        session = await self.get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=SessionReadConfig(state_only=True)
+        )
+        return session.state if session else None
+
+    async def get_version(self, *, app_name: str, user_id: str, session_id: str) -> Optional[tuple]:
+        """(last_update_time, number of events, app state version, user state version) of a
+        session, or None if it does not exist. A scope never written has version None."""
+        key = self._session_key(app_name, user_id, session_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hget(key + ":meta", "update_time")
+            pipe.llen(key + ":events")
+            pipe.get(self._app_key(app_name) + ":version")
+            pipe.get(self._user_key(app_name, user_id) + ":version")
+            update_time, event_count, app_version, user_version = await pipe.execute()
+        if update_time is None:
+            return None
+        scopes = (int(v) if v is not None else None for v in (app_version, user_version))
+        return (float(update_time), event_count, *scopes)
+
+    async def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        index_key = self._index_key(app_name, user_id)
+        entries = await self.client.hgetall(index_key)
+        if not entries:
+            return ListSessionsResponse(sessions=[])
+        session_ids = [session_id.decode() for session_id in entries]
+        async with self.client.pipeline(transaction=False) as pipe:
+            for session_id in session_ids:
+                pipe.exists(self._session_key(app_name, user_id, session_id) + ":meta")
+            alive = await pipe.execute()
+        expired = [session_id for session_id, exists in zip(session_ids, alive) if not exists]
+        if expired:
+            await self.client.hdel(index_key, *expired)
+        return ListSessionsResponse(
+            sessions=[
+                Session(
+                    app_name=app_name, user_id=user_id, id=session_id, state={}, events=[],
+                    last_update_time=float(entries[session_id.encode()]),
+                )
+                for session_id, exists in zip(session_ids, alive)
+                if exists
+            ]
+        )
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        key = self._session_key(app_name, user_id, session_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(key + ":meta", key + ":state", key + ":events")
+            pipe.hdel(self._index_key(app_name, user_id), session_id)
+            await pipe.execute()
+
+    async def expire_session(self, *, app_name: str, user_id: str, session_id: str, ttl: Optional[float]) -> bool:
+        """Gives one session its own ttl (None: never expires), replacing the service's.
+
+        Returns False if the session does not exist.
+        """
+        key = self._session_key(app_name, user_id, session_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            await pipe.watch(key + ":meta")
+            if not await pipe.exists(key + ":meta"):
+                return False
+            pipe.multi()
+            if ttl is None:
+                pipe.hset(key + ":meta", "ttl", "none")
+                for suffix in (":meta", ":state", ":events"):
+                    pipe.persist(key + suffix)
+            else:
+                pipe.hset(key + ":meta", "ttl", ttl)
+                self._queue_expire(pipe, key, ttl)
+            try:
+                await pipe.execute()
+            except WatchError:
+                # Deleted or written meanwhile; setting it again is harmless.
+                return await self.expire_session(app_name=app_name, user_id=user_id, session_id=session_id, ttl=ttl)
+        return True
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        key = self._session_key(session.app_name, session.user_id, session.id)
+        state_delta = event.actions.state_delta if event.actions else None
+        data = self.codec.encode(event)
+        async with self.client.pipeline(transaction=True) as pipe:
+            for _ in range(self.retries + 1):
+                await pipe.watch(key + ":meta")
+                meta = await pipe.hgetall(key + ":meta")
+                if not meta:
+                    raise ValueError(f"Session {session.id} not found.")
+                update_time = float(meta[b"update_time"])
+                key_versions = {
+                    field[2:].decode(): float(value) for field, value in meta.items() if field.startswith(b"v:")
+                }
+                missed_keys = check_append(
+                    self.on_conflict, session.id, session.last_update_time, update_time, key_versions, state_delta
+                )
+                ttl_field = meta.get(b"ttl")
+                ttl = self.ttl if ttl_field is None else None if ttl_field == b"none" else float(ttl_field)
+                # Strictly increasing, so a copy read before this append is detected as stale.
+                new_update_time = max(time.time(), update_time + 1e-6)
+                written: dict[str, float] = {}
+                record_key_versions(written, state_delta, new_update_time)
+                pipe.multi()
+                pipe.rpush(key + ":events", data)
+                if state_delta:
+                    self._queue_state(pipe, session.app_name, session.user_id, key, state_delta)
+                pipe.hset(
+                    key + ":meta",
+                    mapping={"update_time": new_update_time, **{"v:" + k: v for k, v in written.items()}},
+                )
+                pipe.hset(self._index_key(session.app_name, session.user_id), session.id, new_update_time)
+                self._queue_expire(pipe, key, ttl)
+                if missed_keys:
+                    # The values the caller's copy missed, read in the same transaction.
+                    pipe.hgetall(self._app_key(session.app_name))
+                    pipe.hgetall(self._user_key(session.app_name, session.user_id))
+                    pipe.hgetall(key + ":state")
+                try:
+                    results = await pipe.execute()
+                    break
+                except WatchError:
+                    # Another process appended to (or deleted) the session since the check.
+                    self.conflicts += 1
+            else:
+                raise ValueError(
+                    f"Session {session.id} was modified concurrently. Please check if it is a stale session."
+                )
+        self.appends += 1
+        missed = {}
+        if missed_keys:
+            state = merge_state(*(_decode_state(fields) for fields in results[-3:]))
+            missed = {k: state[k] for k in missed_keys if k in state}
+        session.last_update_time = new_update_time
+        # Also update the caller's copy.
+        await super().append_event(session=session, event=event)
+        session.state.update(missed)
+        return event
+
+    def stats(self) -> dict[str, Any]:
+        return {"appends": self.appends, "conflicts": self.conflicts}
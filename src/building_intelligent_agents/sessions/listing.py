@@ -0,0 +1,82 @@
+import base64
+import binascii
+import json
+from typing import Any, Iterable, NamedTuple, Optional
+
+from google.adk.sessions import BaseSessionService, Session
+
+# Paginated session listing. list_sessions returns every session of a user at once,
+# which an admin dashboard pays for on every refresh once a user has tens of thousands:
+#
+#   page = await list_sessions_page(session_service, app_name="MyApp", user_id="user_1", limit=50)
+#   while page.next_cursor:
+#       page = await list_sessions_page(
+#           session_service, app_name="MyApp", user_id="user_1", limit=50, cursor=page.next_cursor
+#       )
+#
+# Pages are ordered by last_update_time, most recent first, ties broken by session id.
+# The cursor is opaque: it holds the (last_update_time, session id) of the last session
+# of the page, and the next page starts right after it (keyset pagination). Sessions
+# updated or created while paging move to the front and are not repeated or skipped
+# further back. Listed sessions carry no state and no events, as with list_sessions.
+#
+# ShardedInMemorySessionService keeps each user's sessions in a sorted list,
+# SqliteSessionService and FastReadDatabaseSessionService read them through an index on
+# (app_name, user_id, update_time), so a page costs its own size whatever the user's
+# session count. Other services are listed in full and paged here.
+
+
+class SessionPage(NamedTuple):
+    """One page of a user's sessions, most recently updated first."""
+
+    sessions: list[Session]
+    # Pass as `cursor` to get the next page; None on the last page.
+    next_cursor: Optional[str]
+
+
+def encode_cursor(update_time: Any, session_id: str) -> str:
+    """The cursor of a page ending with this session; `update_time` is anything JSON can hold."""
+    return base64.urlsafe_b64encode(json.dumps([update_time, session_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str, time_type: type = float) -> tuple[Any, str]:
+    """(update_time, session_id) of a cursor from encode_cursor; ValueError if it is not one
+    or its update_time is not a `time_type`."""
+    try:
+        update_time, session_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeError, ValueError, TypeError):
+        raise ValueError(f"Invalid cursor '{cursor}'.") from None
+    if not isinstance(update_time, time_type) or not isinstance(session_id, str):
+        raise ValueError(f"Invalid cursor '{cursor}'.")
+    return update_time, session_id
+
+
+def check_limit(limit: int) -> int:
+    if limit < 1:
+        raise ValueError("limit must be at least 1.")
+    return limit
+
+
+def page_sessions(sessions: Iterable[Session], limit: int, cursor: Optional[str] = None) -> SessionPage:
+    """Pages sessions that were listed in full."""
+    ordered = sorted(sessions, key=lambda s: (s.last_update_time, s.id), reverse=True)
+    if cursor is not None:
+        after = decode_cursor(cursor)
+        ordered = [s for s in ordered if (s.last_update_time, s.id) < after]
+    page = ordered[:check_limit(limit)]
+    more = len(ordered) > limit
+    return SessionPage(page, encode_cursor(page[-1].last_update_time, page[-1].id) if more else None)
+
+
+async def list_sessions_page(
+    service: BaseSessionService, *, app_name: str, user_id: str, limit: int = 100, cursor: Optional[str] = None
+) -> SessionPage:
+    """A page of a user's sessions, most recently updated first.
+
+    Uses the service's `list_sessions_page` when it has one, and pages list_sessions otherwise.
+    """
+    list_page = getattr(service, "list_sessions_page", None)
+    if list_page is not None:
+        return await list_page(app_name=app_name, user_id=user_id, limit=limit, cursor=cursor)
+    response = await service.list_sessions(app_name=app_name, user_id=user_id)
+    return page_sessions(response.sessions, limit, cursor)
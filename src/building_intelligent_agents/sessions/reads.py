@@ -0,0 +1,66 @@
+import bisect
+from typing import Any, Optional, Sequence
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService
+from google.adk.sessions.base_session_service import GetSessionConfig
+
+# Cheaper session reads. get_session returns the whole event history by default, which
+# is wasteful for code that polls a session during a run only to look at its state:
+#
+#   state = await get_session_state(runner.session_service, app_name=..., user_id=..., session_id=...)
+#
+#   # Only what is new since the last event the caller has seen:
+#   session = await session_service.get_session(
+#       app_name=..., user_id=..., session_id=..., config=SessionReadConfig(after_event_id=last_seen.id)
+#   )
+#
+# ShardedInMemorySessionService, SqliteSessionService and FastReadDatabaseSessionService
+# apply SessionReadConfig in the backend and have a `get_state` method that only reads
+# state. Other services accept SessionReadConfig as a plain GetSessionConfig and ignore
+# the extra fields.
+
+
+class SessionReadConfig(GetSessionConfig):
+    """GetSessionConfig with the read options of this package's session services."""
+
+    state_only: bool = False
+    """Return the merged state and no events."""
+
+    after_event_id: Optional[str] = None
+    """Only return events appended after the event with this id. An id that is not in
+    the session is ignored."""
+
+
+def select_events(events: Sequence[Event], config: Optional[GetSessionConfig]) -> Sequence[Event]:
+    """The events of a time-ordered history that `config` selects, without copying them."""
+    if config is None:
+        return events
+    if isinstance(config, SessionReadConfig):
+        if config.state_only:
+            return []
+        if config.after_event_id:
+            # Recent events are the ones usually asked for, so search from the end.
+            for i in range(len(events) - 1, -1, -1):
+                if events[i].id == config.after_event_id:
+                    events = events[i + 1:]
+                    break
+    if config.after_timestamp:
+        events = events[bisect.bisect_left(events, config.after_timestamp, key=lambda e: e.timestamp):]
+    if config.num_recent_events:
+        events = events[-config.num_recent_events:]
+    return events
+
+
+async def get_session_state(
+    service: BaseSessionService, *, app_name: str, user_id: str, session_id: str
+) -> Optional[dict[str, Any]]:
+    """The merged state of a session, or None if it does not exist.
+
+    Uses the service's `get_state` when it has one, and reads the session otherwise.
+    """
+    get_state = getattr(service, "get_state", None)
+    if get_state is not None:
+        return await get_state(app_name=app_name, user_id=user_id, session_id=session_id)
+    session = await service.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+    return session.state if session else None
@@ -0,0 +1,149 @@
+import threading
+from types import MappingProxyType
+from typing import Any, Mapping, NamedTuple, Optional
+
+from google.adk.events import Event
+from google.adk.sessions import Session, State
+
+# App- and user-scoped state, stored apart from sessions.
+#
+# `app:` keys are shared by every session of an app and `user:` keys by every session
+# of a user, so they are read on nearly every turn by many sessions and written rarely.
+# ScopedStateStore keeps one entry per app and per (app, user):
+#
+#   store = ScopedStateStore()
+#   store.update("MyApp", "user_1", app_delta={"default_language": "en"})
+#   app, user = store.get("MyApp", "user_1")     # ScopedState: version, values, prefixed
+#   state = merge_scoped(session_state_copy, app, user)
+#
+# * Entries are copy-on-write: an update builds a new entry with the next version and
+#   replaces the old one; a reader holding an entry sees it unchanged. An `app:` update
+#   is one write, however many sessions the app has.
+# * Each entry carries its values both as stored (without the prefix) and with the
+#   prefix added, built once per version, so building a session's state view is one
+#   dict.update per scope instead of re-prefixing every key on every read.
+# * Versions let a store that caches a database (SqliteSessionService) tell with one
+#   query whether its entries are current; set_app and set_user install what was read.
+#
+# Values are shared between the store and every session view built from it, as the
+# events of ShardedInMemorySessionService snapshots are: change them with a state delta,
+# not in place. `temp:` keys never reach the store; split_state_delta drops them.
+
+
+class ScopedState(NamedTuple):
+    """One app's or user's state at one version. Never changes once built."""
+
+    version: int
+    values: Mapping[str, Any]
+    # The same values under their `app:` / `user:` keys.
+    prefixed: Mapping[str, Any]
+
+
+def _scoped_state(version: int, values: dict[str, Any], prefix: str) -> ScopedState:
+    return ScopedState(
+        version, MappingProxyType(values), MappingProxyType({prefix + key: value for key, value in values.items()})
+    )
+
+
+EMPTY = ScopedState(0, MappingProxyType({}), MappingProxyType({}))
+
+
+def split_state_delta(delta: Mapping[str, Any]) -> tuple[dict[str, Any], dict[str, Any], dict[str, Any]]:
+    """Splits a state delta into its app, user and session parts, dropping `temp:` keys."""
+    app_delta, user_delta, session_delta = {}, {}, {}
+    for key, value in delta.items():
+        if key.startswith(State.APP_PREFIX):
+            app_delta[key.removeprefix(State.APP_PREFIX)] = value
+        elif key.startswith(State.USER_PREFIX):
+            user_delta[key.removeprefix(State.USER_PREFIX)] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session_delta[key] = value
+    return app_delta, user_delta, session_delta
+
+
+def merge_scoped(state: dict[str, Any], app: ScopedState, user: ScopedState) -> dict[str, Any]:
+    """Adds app and user state to a session's own `state`, in place, as the stock services merge them."""
+    if app.prefixed:
+        state.update(app.prefixed)
+    if user.prefixed:
+        state.update(user.prefixed)
+    return state
+
+
+def merge_state(
+    app_state: Mapping[str, Any], user_state: Mapping[str, Any], session_state: Mapping[str, Any]
+) -> dict[str, Any]:
+    """A session's state view from stored app, user and session state (keys without their
+    prefix), as the stock services merge them."""
+    merged = dict(session_state)
+    for key, value in app_state.items():
+        merged[State.APP_PREFIX + key] = value
+    for key, value in user_state.items():
+        merged[State.USER_PREFIX + key] = value
+    return merged
+
+
+def apply_event(session: Session, event: Event):
+    """What BaseSessionService.append_event does to a session, without the await, so it
+    can run under a lock: state keys other than `temp:` are set and the event added."""
+    if event.partial:
+        return
+    if event.actions and event.actions.state_delta:
+        for key, value in event.actions.state_delta.items():
+            if not key.startswith(State.TEMP_PREFIX):
+                session.state[key] = value
+    session.events.append(event)
+
+
+class ScopedStateStore:
+    """Versioned, copy-on-write app- and user-scoped state."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._apps: dict[str, ScopedState] = {}
+        self._users: dict[tuple[str, str], ScopedState] = {}
+        self.updates = 0
+
+    def get(self, app_name: str, user_id: str) -> tuple[ScopedState, ScopedState]:
+        """The current app and user state; EMPTY (version 0) for a scope never written."""
+        return self._apps.get(app_name, EMPTY), self._users.get((app_name, user_id), EMPTY)
+
+    def update(
+        self,
+        app_name: str,
+        user_id: str,
+        app_delta: Optional[Mapping[str, Any]] = None,
+        user_delta: Optional[Mapping[str, Any]] = None,
+    ) -> tuple[ScopedState, ScopedState]:
+        """Applies deltas (keys without their prefix) as new versions; returns the new state."""
+        with self._lock:
+            if app_delta:
+                current = self._apps.get(app_name, EMPTY)
+                self._apps[app_name] = _scoped_state(
+                    current.version + 1, {**current.values, **app_delta}, State.APP_PREFIX
+                )
+                self.updates += 1
+            if user_delta:
+                current = self._users.get((app_name, user_id), EMPTY)
+                self._users[(app_name, user_id)] = _scoped_state(
+                    current.version + 1, {**current.values, **user_delta}, State.USER_PREFIX
+                )
+                self.updates += 1
+            return self.get(app_name, user_id)
+
+    def set_app(self, app_name: str, version: int, values: dict[str, Any]) -> ScopedState:
+        """Installs an app's state as read from storage."""
+        scoped = _scoped_state(version, values, State.APP_PREFIX)
+        with self._lock:
+            self._apps[app_name] = scoped
+        return scoped
+
+    def set_user(self, app_name: str, user_id: str, version: int, values: dict[str, Any]) -> ScopedState:
+        """Installs a user's state as read from storage."""
+        scoped = _scoped_state(version, values, State.USER_PREFIX)
+        with self._lock:
+            self._users[(app_name, user_id)] = scoped
+        return scoped
+
+    def stats(self) -> dict[str, Any]:
+        return {"apps": len(self._apps), "users": len(self._users), "updates": self.updates}
@@ -0,0 +1,263 @@
+import bisect
+import copy
+import threading
+import time
+import uuid
+from typing import Any, Optional
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+
+from .concurrency import check_append, check_on_conflict, record_key_versions
+from .listing import SessionPage, check_limit, decode_cursor, encode_cursor
+from .reads import SessionReadConfig, select_events
+from .scoped import ScopedStateStore, merge_scoped, split_state_delta
+
+# A drop-in replacement for InMemorySessionService for processes that serve many users
+# at once.
+#
+# InMemorySessionService keeps every app, user and session in one set of nested dicts
+# and relies on the event loop to serialize access. Nothing serializes it once the
+# service is shared between event loops: Runner.run starts a thread and a loop per call,
+# and AgentHost (utils.py) drives runners from other threads, so its check-then-insert
+# updates (such as creating the first session of a new app) can race.
+#
+# This service partitions sessions and user state by (app_name, user_id) into
+# `num_shards` shards. Each shard has its own lock and dicts, so appends to sessions of
+# different users never touch the same lock, and a user's sessions are always in one
+# shard.
+#
+#   session_service = ShardedInMemorySessionService(num_shards=64)
+#   runner = Runner(agent=agent, app_name="MyApp", session_service=session_service)
+#
+# The locks are threading locks rather than asyncio locks: no lock is ever held across an
+# await, so they only block the event loop for the in-memory update or copy itself, and
+# they work from any loop or thread. `app:` and `user:` state is kept apart from the
+# sessions in a ScopedStateStore (scoped.py): an update replaces one versioned entry,
+# and a read adds the current entries to the session's state without taking a lock.
+#
+# Reads return snapshots rather than deep copies. The snapshot gets its own event list and
+# its own copy of the state, but shares the Event objects with the stored session, the
+# same objects InMemorySessionService already shares between the stored session and the
+# caller that appended them. Appends after the read do not show up in the snapshot, and a
+# read costs one list of references however large the events are. Treat events from
+# get_session as read-only; to change one, replace it with a copy
+# (`session.events[i] = event.model_copy(deep=True)`), or pass
+# `copy_events_on_read=True` to get deep copies as InMemorySessionService does.
+#
+# Appends are compare-and-swap on the session's last_update_time, under the shard lock
+# (concurrency.py): an append from a copy read before another append goes through if it
+# writes none of the state keys written since, and raises SessionConflictError if it
+# does, where InMemorySessionService would let the later write silently win.
+#
+# Each shard also keeps every user's (last_update_time, session_id) pairs in a sorted
+# list, so list_sessions_page (listing.py) finds a page by bisection instead of sorting
+# the user's sessions.
+
+SessionKey = tuple[str, str]
+
+
+class _Shard:
+    __slots__ = ("lock", "sessions", "key_versions", "by_update_time")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # (app_name, user_id) -> session_id -> stored session, with session-scoped state only.
+        self.sessions: dict[SessionKey, dict[str, Session]] = {}
+        # (app_name, user_id, session_id) -> state key -> last_update_time of its last write.
+        self.key_versions: dict[tuple[str, str, str], dict[str, float]] = {}
+        # (app_name, user_id) -> sorted (last_update_time, session_id) of the user's sessions.
+        self.by_update_time: dict[SessionKey, list[tuple[float, str]]] = {}
+
+    def index(self, key: SessionKey, session_id: str, old: Optional[float], new: Optional[float]):
+        # Moves a session in the sorted list; old / new is None for a session added / removed.
+        entries = self.by_update_time.setdefault(key, [])
+        if old is not None:
+            i = bisect.bisect_left(entries, (old, session_id))
+            if i < len(entries) and entries[i] == (old, session_id):
+                del entries[i]
+        if new is not None:
+            # Update times only go forward, so this is nearly always an append.
+            bisect.insort(entries, (new, session_id))
+        elif not entries:
+            del self.by_update_time[key]
+
+
+class ShardedInMemorySessionService(BaseSessionService):
+    """In-memory session service partitioned into independently locked shards."""
+
+    def __init__(self, num_shards: int = 16, copy_events_on_read: bool = False, on_conflict: str = "merge"):
+        if num_shards < 1:
+            raise ValueError("num_shards must be at least 1.")
+        self.num_shards = num_shards
+        self.copy_events_on_read = copy_events_on_read
+        self.on_conflict = check_on_conflict(on_conflict)
+        self._shards = [_Shard() for _ in range(num_shards)]
+        # App- and user-scoped state, kept out of the stored sessions.
+        self.scoped = ScopedStateStore()
+
+    def _shard(self, app_name: str, user_id: str) -> _Shard:
+        return self._shards[hash((app_name, user_id)) % self.num_shards]
+
+    def _merge_state(self, app_name: str, user_id: str, session: Session) -> Session:
+        # Same result as InMemorySessionService: app and user state are added to the
+        # session's own state under their prefixes.
+        merge_scoped(session.state, *self.scoped.get(app_name, user_id))
+        return session
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = session_id.strip() if session_id and session_id.strip() else str(uuid.uuid4())
+        app_delta, user_delta, session_state = split_state_delta(state or {})
+        self.scoped.update(app_name, user_id, app_delta, user_delta)
+        session = Session(
+            app_name=app_name, user_id=user_id, id=session_id, state=session_state, last_update_time=time.time()
+        )
+        shard = self._shard(app_name, user_id)
+        with shard.lock:
+            sessions = shard.sessions.setdefault((app_name, user_id), {})
+            replaced = sessions.get(session_id)
+            sessions[session_id] = session
+            shard.index(
+                (app_name, user_id), session_id, replaced.last_update_time if replaced else None,
+                session.last_update_time,
+            )
+            shard.key_versions.pop((app_name, user_id, session_id), None)
+            return self._merge_state(app_name, user_id, copy.deepcopy(session))
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        shard = self._shard(app_name, user_id)
+        with shard.lock:
+            stored = shard.sessions.get((app_name, user_id), {}).get(session_id)
+            if stored is None:
+                return None
+            events = list(select_events(stored.events, config))
+            if self.copy_events_on_read:
+                events = copy.deepcopy(events)
+            # A snapshot: new list and state, shared events. The stored session is
+            # already valid, so skip re-validating every event.
+            session = Session.model_construct(
+                app_name=app_name, user_id=user_id, id=session_id,
+                state=copy.deepcopy(stored.state), events=events,
+                last_update_time=stored.last_update_time,
+            )
+            return self._merge_state(app_name, user_id, session)
+
+    async def get_state(self, *, app_name: str, user_id: str, session_id: str) -> Optional[dict[str, Any]]:
+        """The merged state of a session, or None if it does not exist; no events are copied."""
+        session = await self.get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=SessionReadConfig(state_only=True)
+        )
+        return session.state if session else None
+
+    async def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        shard = self._shard(app_name, user_id)
+        with shard.lock:
+            stored = list(shard.sessions.get((app_name, user_id), {}).values())
+        return ListSessionsResponse(
+            sessions=[
+                Session(
+                    app_name=s.app_name, user_id=s.user_id, id=s.id, state={}, events=[],
+                    last_update_time=s.last_update_time,
+                )
+                for s in stored
+            ]
+        )
+
+    async def list_sessions_page(
+        self, *, app_name: str, user_id: str, limit: int = 100, cursor: Optional[str] = None
+    ) -> SessionPage:
+        """A page of a user's sessions, most recently updated first (see listing.py)."""
+        check_limit(limit)
+        shard = self._shard(app_name, user_id)
+        with shard.lock:
+            entries = shard.by_update_time.get((app_name, user_id), [])
+            end = len(entries) if cursor is None else bisect.bisect_left(entries, decode_cursor(cursor))
+            start = max(end - limit, 0)
+            page = entries[start:end][::-1]
+        sessions = [
+            Session(app_name=app_name, user_id=user_id, id=session_id, state={}, events=[], last_update_time=t)
+            for t, session_id in page
+        ]
+        return SessionPage(sessions, encode_cursor(*page[-1]) if start > 0 else None)
+
+    def session_keys(self, app_name: Optional[str] = None) -> list[tuple[str, str, str]]:
+        """(app_name, user_id, session_id) of every stored session, for export (jsonl.py)."""
+        keys = []
+        for shard in self._shards:
+            with shard.lock:
+                keys += [
+                    (app, user_id, session_id)
+                    for (app, user_id), sessions in shard.sessions.items()
+                    if app_name is None or app == app_name
+                    for session_id in sessions
+                ]
+        return keys
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        shard = self._shard(app_name, user_id)
+        with shard.lock:
+            sessions = shard.sessions.get((app_name, user_id))
+            removed = sessions.pop(session_id, None) if sessions is not None else None
+            if removed is not None:
+                shard.index((app_name, user_id), session_id, removed.last_update_time, None)
+            shard.key_versions.pop((app_name, user_id, session_id), None)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        key = (session.app_name, session.user_id)
+        state_delta = event.actions.state_delta if event.actions else None
+        update_time, missed = event.timestamp, {}
+        shard = self._shard(*key)
+        with shard.lock:
+            stored = shard.sessions.get(key, {}).get(session.id)
+            if stored is not None:
+                key_versions = shard.key_versions.setdefault((*key, session.id), {})
+                missed_keys = check_append(
+                    self.on_conflict, session.id, session.last_update_time, stored.last_update_time,
+                    key_versions, state_delta,
+                )
+                if state_delta:
+                    app_delta, user_delta, session_delta = split_state_delta(state_delta)
+                    self.scoped.update(*key, app_delta, user_delta)
+                    stored.state.update(session_delta)
+                stored.events.append(event)
+                # Strictly increasing, so a copy read before this append is detected as stale.
+                update_time = max(time.time(), stored.last_update_time + 1e-6)
+                shard.index(key, session.id, stored.last_update_time, update_time)
+                stored.last_update_time = update_time
+                record_key_versions(key_versions, state_delta, update_time)
+                if missed_keys:
+                    # The values the caller's copy missed, so that its next append is checked against them.
+                    state = merge_scoped(dict(stored.state), *self.scoped.get(*key))
+                    missed = {k: copy.deepcopy(state[k]) for k in missed_keys if k in state}
+        # Then the caller's copy, as InMemorySessionService does.
+        await super().append_event(session=session, event=event)
+        session.last_update_time = update_time
+        session.state.update(missed)
+        return event
+
+    def stats(self) -> dict[str, Any]:
+        """Session counts per shard, to check that keys spread evenly."""
+        counts = [sum(len(s) for s in shard.sessions.values()) for shard in self._shards]
+        return {
+            "num_shards": self.num_shards,
+            "sessions": sum(counts),
+            "max_shard_sessions": max(counts),
+            "min_shard_sessions": min(counts),
+        }
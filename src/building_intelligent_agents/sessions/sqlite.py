@@ -0,0 +1,487 @@
+import asyncio
+import json
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Optional, TypeVar, Union
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+
+from .codec import BinaryEventCodec, JsonEventCodec, decode_event, peek_event
+from .concurrency import check_append, check_on_conflict, record_key_versions
+from .listing import SessionPage, check_limit, decode_cursor, encode_cursor
+from .reads import SessionReadConfig
+from .scoped import ScopedState, ScopedStateStore, merge_scoped, split_state_delta
+
+# A session service for single-node deployments on SQLite, written against sqlite3
+# directly instead of going through DatabaseSessionService and SQLAlchemy.
+#
+#   session_service = SqliteSessionService("./adk_sessions.db", readers=4)
+#   runner = Runner(agent=agent, app_name="MyApp", session_service=session_service)
+#
+# * The database runs in WAL mode, so readers never wait for the writer and the writer
+#   never waits for readers; only writers exclude each other.
+# * Reads use a bounded pool of read-only connections and writes a single writer
+#   connection, so at most one transaction waits for the write lock at a time instead
+#   of every connection retrying on SQLITE_BUSY.
+# * Every statement is a constant string, so each connection's statement cache
+#   (`cached_statements`) prepares it once.
+# * Events are indexed by (app_name, user_id, session_id, timestamp) and sessions by
+#   (app_name, user_id, update_time), so get_session with num_recent_events /
+#   after_timestamp / SessionReadConfig.after_event_id, list_sessions and
+#   list_sessions_page (listing.py) are index range scans, and get_state reads no
+#   events at all.
+# * Database work runs in worker threads (asyncio.to_thread), so the event loop is never
+#   blocked on disk I/O or on the write lock.
+# * App and user state rows carry a version that every write bumps. Reads fetch the
+#   versions with the session row and only load and decode a scope's state when its
+#   version differs from the copy in `self.scoped` (scoped.py).
+# * Events are stored with BinaryEventCodec (codec.py) unless another codec is given, and
+#   peek_events lists or tails a session without decoding large payloads.
+#
+# * Appends are compare-and-swap on the session's update_time (concurrency.py). Each
+#   session row records the update_time at which each state key was last written, so an
+#   append from an older copy goes through when its state delta writes none of the keys
+#   written since, and raises SessionConflictError when it does.
+#
+# Semantics follow DatabaseSessionService: `app:` and `user:` state is stored once per
+# app / user and merged into every session read, and `temp:` keys are never stored. With
+# on_conflict="reject", appending to a session whose copy is older than the stored one
+# raises ValueError, as there. Timestamps are stored as float seconds, so update times
+# are exact.
+
+T = TypeVar("T")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    create_time REAL NOT NULL,
+    update_time REAL NOT NULL,
+    -- state key -> update_time of the append that last wrote it
+    key_versions TEXT NOT NULL DEFAULT '{}',
+    PRIMARY KEY (app_name, user_id, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sessions_by_update_time ON sessions (app_name, user_id, update_time);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_by_session ON events (app_name, user_id, session_id, timestamp);
+CREATE TABLE IF NOT EXISTS app_states (
+    app_name TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (app_name, user_id)
+) WITHOUT ROWID;
+"""
+
+_SELECT_SESSION = (
+    "SELECT state, update_time, key_versions FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?"
+)
+# The session row with the versions of its app and user state, checked against self.scoped.
+_SELECT_SESSION_AND_SCOPES = (
+    "SELECT state, update_time, (SELECT version FROM app_states WHERE app_name = ?1),"
+    " (SELECT version FROM user_states WHERE app_name = ?1 AND user_id = ?2)"
+    " FROM sessions WHERE app_name = ?1 AND user_id = ?2 AND id = ?3"
+)
+_SELECT_SCOPE_VERSIONS = (
+    "SELECT (SELECT version FROM app_states WHERE app_name = ?1),"
+    " (SELECT version FROM user_states WHERE app_name = ?1 AND user_id = ?2)"
+)
+_SELECT_APP_STATE = "SELECT state, version FROM app_states WHERE app_name = ?"
+_SELECT_USER_STATE = "SELECT state, version FROM user_states WHERE app_name = ? AND user_id = ?"
+# Events are ordered by (timestamp, seq); an event id cursor becomes a lower bound on that pair.
+_SELECT_EVENT_POSITION = (
+    "SELECT timestamp, seq FROM events WHERE id = ? AND app_name = ? AND user_id = ? AND session_id = ?"
+)
+_SELECT_EVENTS = (
+    "SELECT data FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? AND timestamp >= ?"
+    " AND (timestamp, seq) > (?, ?) ORDER BY timestamp, seq"
+)
+_SELECT_RECENT_EVENTS = (
+    "SELECT data FROM (SELECT data, timestamp, seq FROM events"
+    " WHERE app_name = ? AND user_id = ? AND session_id = ? AND timestamp >= ? AND (timestamp, seq) > (?, ?)"
+    " ORDER BY timestamp DESC, seq DESC LIMIT ?) ORDER BY timestamp, seq"
+)
+_LIST_SESSIONS = "SELECT id, update_time FROM sessions WHERE app_name = ? AND user_id = ? ORDER BY update_time"
+# Keyset pagination, newest first; a range scan of sessions_by_update_time, which also holds the id.
+_LIST_SESSIONS_PAGE = (
+    "SELECT id, update_time FROM sessions WHERE app_name = ? AND user_id = ? AND (update_time, id) < (?, ?)"
+    " ORDER BY update_time DESC, id DESC LIMIT ?"
+)
+_INSERT_SESSION = (
+    "INSERT INTO sessions (app_name, user_id, id, state, create_time, update_time) VALUES (?, ?, ?, ?, ?, ?)"
+)
+_UPDATE_SESSION = (
+    "UPDATE sessions SET state = ?, update_time = ?, key_versions = ? WHERE app_name = ? AND user_id = ? AND id = ?"
+)
+_UPSERT_APP_STATE = (
+    "INSERT INTO app_states (app_name, state) VALUES (?, ?) ON CONFLICT (app_name)"
+    " DO UPDATE SET state = excluded.state, version = app_states.version + 1 RETURNING version"
+)
+_UPSERT_USER_STATE = (
+    "INSERT INTO user_states (app_name, user_id, state) VALUES (?, ?, ?) ON CONFLICT (app_name, user_id)"
+    " DO UPDATE SET state = excluded.state, version = user_states.version + 1 RETURNING version"
+)
+_INSERT_EVENT = "INSERT INTO events (app_name, user_id, session_id, id, timestamp, data) VALUES (?, ?, ?, ?, ?, ?)"
+_DELETE_EVENTS = "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?"
+_DELETE_SESSION = "DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?"
+_SELECT_VERSION = (
+    "SELECT update_time, (SELECT count(*) FROM events WHERE app_name = ?1 AND user_id = ?2 AND session_id = ?3),"
+    " (SELECT version FROM app_states WHERE app_name = ?1),"
+    " (SELECT version FROM user_states WHERE app_name = ?1 AND user_id = ?2)"
+    " FROM sessions WHERE app_name = ?1 AND user_id = ?2 AND id = ?3"
+)
+_SESSION_KEYS = "SELECT app_name, user_id, id FROM sessions"
+_APP_SESSION_KEYS = "SELECT app_name, user_id, id FROM sessions WHERE app_name = ?"
+
+
+def _load_state(row: Optional[tuple]) -> dict[str, Any]:
+    return json.loads(row[0]) if row else {}
+
+
+# Columns added to tables of existing databases: event ids, app and user state versions,
+# then the versions of session state keys.
+_ADDED_COLUMNS = (
+    ("events", "id", "TEXT NOT NULL DEFAULT ''"),
+    ("app_states", "version", "INTEGER NOT NULL DEFAULT 1"),
+    ("user_states", "version", "INTEGER NOT NULL DEFAULT 1"),
+    ("sessions", "key_versions", "TEXT NOT NULL DEFAULT '{}'"),
+)
+
+# Run once the added columns exist. Events written before the id column were stored as
+# JSON, which holds the id.
+_AFTER_ADDED_COLUMNS = """
+UPDATE events SET id = json_extract(data, '$.id') WHERE id = '' AND typeof(data) = 'text';
+CREATE INDEX IF NOT EXISTS events_by_id ON events (id);
+"""
+
+
+def _add_columns(db: sqlite3.Connection):
+    for table, column, definition in _ADDED_COLUMNS:
+        if column not in {info[1] for info in db.execute(f"PRAGMA table_info({table})")}:
+            db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    db.executescript(_AFTER_ADDED_COLUMNS)
+
+
+def _write_scoped_state(
+    db: sqlite3.Connection, app_name: str, user_id: str, app_delta: dict[str, Any], user_delta: dict[str, Any]
+):
+    # One row per scope, whose version goes up by one; readers pick the change up by version.
+    if app_delta:
+        values = {**_load_state(db.execute(_SELECT_APP_STATE, (app_name,)).fetchone()), **app_delta}
+        db.execute(_UPSERT_APP_STATE, (app_name, json.dumps(values))).fetchone()
+    if user_delta:
+        values = {**_load_state(db.execute(_SELECT_USER_STATE, (app_name, user_id)).fetchone()), **user_delta}
+        db.execute(_UPSERT_USER_STATE, (app_name, user_id, json.dumps(values))).fetchone()
+
+
+def _select_event_data(
+    db: sqlite3.Connection, app_name: str, user_id: str, session_id: str, config: Optional[GetSessionConfig]
+) -> list[Union[bytes, str]]:
+    """The encoded events that `config` selects, oldest first."""
+    read_config = config if isinstance(config, SessionReadConfig) else SessionReadConfig()
+    if read_config.state_only:
+        return []
+    position = None
+    if read_config.after_event_id:
+        position = db.execute(_SELECT_EVENT_POSITION, (read_config.after_event_id, app_name, user_id, session_id)).fetchone()
+    after = config.after_timestamp if config and config.after_timestamp else 0.0
+    key = (app_name, user_id, session_id, after, *(position or (0.0, 0)))
+    if config and config.num_recent_events:
+        rows = db.execute(_SELECT_RECENT_EVENTS, (*key, config.num_recent_events)).fetchall()
+    else:
+        rows = db.execute(_SELECT_EVENTS, key).fetchall()
+    return [data for (data,) in rows]
+
+
+class SqliteSessionService(BaseSessionService):
+    """BaseSessionService on SQLite in WAL mode with a reader pool and a single writer."""
+
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        readers: int = 4,
+        synchronous: str = "NORMAL",
+        busy_timeout_ms: int = 5000,
+        cached_statements: int = 128,
+        codec: Union[BinaryEventCodec, JsonEventCodec, None] = None,
+        on_conflict: str = "merge",
+    ):
+        """
+        :param db_path: Path of the database file; a "sqlite:///" URL prefix is accepted.
+        :param readers: Size of the read connection pool.
+        :param synchronous: SQLite's synchronous pragma. NORMAL is durable across process
+            crashes in WAL mode; FULL also survives power loss, at an fsync per commit.
+        :param busy_timeout_ms: How long a connection waits for a lock held by another process.
+        :param cached_statements: Prepared statements cached per connection.
+        :param codec: How new events are encoded; BinaryEventCodec by default. Events
+            written with either codec can always be read.
+        :param on_conflict: What an append from a copy older than the stored session does:
+            "merge" goes through unless it writes a state key written since, "reject" raises.
+        """
+        if readers < 1:
+            raise ValueError("readers must be at least 1.")
+        if synchronous.upper() not in ("OFF", "NORMAL", "FULL", "EXTRA"):
+            raise ValueError(f"Unknown synchronous mode '{synchronous}'.")
+        self.db_path = db_path.removeprefix("sqlite:///")
+        self.synchronous = synchronous.upper()
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self.codec = codec or BinaryEventCodec()
+        self.on_conflict = check_on_conflict(on_conflict)
+
+        self._writer = self._connect()
+        self._writer.execute("PRAGMA journal_mode = WAL")
+        self._writer.executescript(_SCHEMA)
+        _add_columns(self._writer)
+        # App and user state as last read or written, validated by version on every read.
+        self.scoped = ScopedStateStore()
+        self._write_lock = threading.Lock()
+        self._readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        for _ in range(readers):
+            reader = self._connect()
+            reader.execute("PRAGMA query_only = ON")
+            self._readers.put(reader)
+        self._connections = [self._writer, *self._readers.queue]
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE.
+        connection = sqlite3.connect(
+            self.db_path, isolation_level=None, check_same_thread=False, cached_statements=self.cached_statements
+        )
+        connection.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        connection.execute(f"PRAGMA synchronous = {self.synchronous}")
+        return connection
+
+    def _read(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        connection = self._readers.get()
+        try:
+            # One read transaction, so every query sees the same snapshot.
+            connection.execute("BEGIN")
+            try:
+                return fn(connection)
+            finally:
+                connection.execute("COMMIT")
+        finally:
+            self._readers.put(connection)
+
+    def _write(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        with self._write_lock:
+            self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._writer)
+            except BaseException:
+                self._writer.execute("ROLLBACK")
+                raise
+            self._writer.execute("COMMIT")
+            return result
+
+    def close(self):
+        for connection in self._connections:
+            connection.close()
+
+    def _scopes(
+        self, db: sqlite3.Connection, app_name: str, user_id: str, versions: Optional[tuple] = None
+    ) -> tuple[ScopedState, ScopedState]:
+        """The app and user state, reloading only a scope whose stored version is not self.scoped's."""
+        app_version, user_version = versions or db.execute(_SELECT_SCOPE_VERSIONS, (app_name, user_id)).fetchone()
+        app, user = self.scoped.get(app_name, user_id)
+        if app.version != (app_version or 0):
+            row = db.execute(_SELECT_APP_STATE, (app_name,)).fetchone()
+            app = self.scoped.set_app(app_name, row[1] if row else 0, _load_state(row))
+        if user.version != (user_version or 0):
+            row = db.execute(_SELECT_USER_STATE, (app_name, user_id)).fetchone()
+            user = self.scoped.set_user(app_name, user_id, row[1] if row else 0, _load_state(row))
+        return app, user
+
+    # --- BaseSessionService ---
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = session_id.strip() if session_id and session_id.strip() else str(uuid.uuid4())
+        app_delta, user_delta, session_state = split_state_delta(state or {})
+
+        def _create(db: sqlite3.Connection) -> Session:
+            _write_scoped_state(db, app_name, user_id, app_delta, user_delta)
+            now = time.time()
+            try:
+                db.execute(_INSERT_SESSION, (app_name, user_id, session_id, json.dumps(session_state), now, now))
+            except sqlite3.IntegrityError:
+                raise ValueError(f"Session {session_id} already exists for user {user_id} of app {app_name}.") from None
+            return Session(
+                app_name=app_name, user_id=user_id, id=session_id,
+                state=merge_scoped(session_state, *self._scopes(db, app_name, user_id)), last_update_time=now,
+            )
+
+        return await asyncio.to_thread(self._write, _create)
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        def _get(db: sqlite3.Connection) -> Optional[Session]:
+            row = db.execute(_SELECT_SESSION_AND_SCOPES, (app_name, user_id, session_id)).fetchone()
+            if row is None:
+                return None
+            return Session(
+                app_name=app_name, user_id=user_id, id=session_id,
+                state=merge_scoped(json.loads(row[0]), *self._scopes(db, app_name, user_id, row[2:])),
+                events=[decode_event(data) for data in _select_event_data(db, app_name, user_id, session_id, config)],
+                last_update_time=row[1],
+            )
+
+        return await asyncio.to_thread(self._read, _get)
+
+    async def peek_events(
+        self, *, app_name: str, user_id: str, session_id: str, config: Optional[GetSessionConfig] = None
+    ) -> list[dict[str, Any]]:
+        """The selected events as plain dicts, for listing or tailing a session.
+
+        Payloads of binary-encoded events are not decoded until accessed (see LazyValue),
+        and nothing is validated.
+        """
+
+        def _peek(db: sqlite3.Connection) -> list[dict[str, Any]]:
+            return [peek_event(data) for data in _select_event_data(db, app_name, user_id, session_id, config)]
+
+        return await asyncio.to_thread(self._read, _peek)
+
+    async def get_state(self, *, app_name: str, user_id: str, session_id: str) -> Optional[dict[str, Any]]:
+        """The merged state of a session, or None if it does not exist; no events are read."""
+
+        def _get_state(db: sqlite3.Connection) -> Optional[dict[str, Any]]:
+            row = db.execute(_SELECT_SESSION_AND_SCOPES, (app_name, user_id, session_id)).fetchone()
+            if row is None:
+                return None
+            return merge_scoped(json.loads(row[0]), *self._scopes(db, app_name, user_id, row[2:]))
+
+        return await asyncio.to_thread(self._read, _get_state)
+
+    async def get_version(self, *, app_name: str, user_id: str, session_id: str) -> Optional[tuple]:
+        """(last_update_time, number of events, app state version, user state version) of a
+        session, or None if it does not exist. A scope never written has version None."""
+
+        def _get_version(db: sqlite3.Connection) -> Optional[tuple]:
+            return db.execute(_SELECT_VERSION, (app_name, user_id, session_id)).fetchone()
+
+        return await asyncio.to_thread(self._read, _get_version)
+
+    async def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        rows = await asyncio.to_thread(self._read, lambda db: db.execute(_LIST_SESSIONS, (app_name, user_id)).fetchall())
+        return ListSessionsResponse(
+            sessions=[
+                Session(app_name=app_name, user_id=user_id, id=session_id, state={}, last_update_time=update_time)
+                for session_id, update_time in rows
+            ]
+        )
+
+    async def list_sessions_page(
+        self, *, app_name: str, user_id: str, limit: int = 100, cursor: Optional[str] = None
+    ) -> SessionPage:
+        """A page of a user's sessions, most recently updated first (see listing.py)."""
+        after = decode_cursor(cursor) if cursor is not None else (float("inf"), "")
+        # One row more than the page, to know whether there is a next one.
+        params = (app_name, user_id, *after, check_limit(limit) + 1)
+        rows = await asyncio.to_thread(self._read, lambda db: db.execute(_LIST_SESSIONS_PAGE, params).fetchall())
+        page = rows[:limit]
+        sessions = [
+            Session(app_name=app_name, user_id=user_id, id=session_id, state={}, last_update_time=update_time)
+            for session_id, update_time in page
+        ]
+        return SessionPage(sessions, encode_cursor(page[-1][1], page[-1][0]) if len(rows) > limit else None)
+
+    def session_keys(self, app_name: Optional[str] = None) -> list[tuple[str, str, str]]:
+        """(app_name, user_id, session_id) of every stored session, for export (jsonl.py)."""
+        if app_name is None:
+            return self._read(lambda db: db.execute(_SESSION_KEYS).fetchall())
+        return self._read(lambda db: db.execute(_APP_SESSION_KEYS, (app_name,)).fetchall())
+
+    async def restore_session(self, session: Session) -> None:
+        """Stores `session` with its events, state and last_update_time, replacing any
+        session with the same id, in one transaction. Used by import (jsonl.py)."""
+        key = (session.app_name, session.user_id, session.id)
+        app_delta, user_delta, session_state = split_state_delta(session.state)
+        rows = [(*key, event.id, event.timestamp, self.codec.encode(event)) for event in session.events if not event.partial]
+        create_time = session.events[0].timestamp if session.events else session.last_update_time
+
+        def _restore(db: sqlite3.Connection):
+            db.execute(_DELETE_EVENTS, key)
+            db.execute(_DELETE_SESSION, key)
+            _write_scoped_state(db, *key[:2], app_delta, user_delta)
+            db.execute(_INSERT_SESSION, (*key, json.dumps(session_state), create_time, session.last_update_time))
+            db.executemany(_INSERT_EVENT, rows)
+
+        await asyncio.to_thread(self._write, _restore)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        def _delete(db: sqlite3.Connection):
+            db.execute(_DELETE_EVENTS, (app_name, user_id, session_id))
+            db.execute(_DELETE_SESSION, (app_name, user_id, session_id))
+
+        await asyncio.to_thread(self._write, _delete)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        key = (session.app_name, session.user_id, session.id)
+        state_delta = event.actions.state_delta if event.actions else None
+        data = self.codec.encode(event)
+
+        def _append(db: sqlite3.Connection) -> tuple[float, dict[str, Any]]:
+            row = db.execute(_SELECT_SESSION, key).fetchone()
+            if row is None:
+                raise ValueError(f"Session {session.id} not found.")
+            session_state, update_time, key_versions = json.loads(row[0]), row[1], json.loads(row[2])
+            missed = check_append(
+                self.on_conflict, session.id, session.last_update_time, update_time, key_versions, state_delta
+            )
+            if state_delta:
+                app_delta, user_delta, session_delta = split_state_delta(state_delta)
+                _write_scoped_state(db, *key[:2], app_delta, user_delta)
+                session_state.update(session_delta)
+            db.execute(_INSERT_EVENT, (*key, event.id, event.timestamp, data))
+            # Strictly increasing, so a copy read before this append is detected as stale.
+            new_update_time = max(time.time(), update_time + 1e-6)
+            record_key_versions(key_versions, state_delta, new_update_time)
+            db.execute(_UPDATE_SESSION, (json.dumps(session_state), new_update_time, json.dumps(key_versions), *key))
+            if not missed:
+                return new_update_time, {}
+            # The values the caller's copy missed, so that its next append is checked against them.
+            state = merge_scoped(session_state, *self._scopes(db, *key[:2]))
+            return new_update_time, {k: state[k] for k in missed if k in state}
+
+        session.last_update_time, missed = await asyncio.to_thread(self._write, _append)
+        # Also update the caller's copy.
+        await super().append_event(session=session, event=event)
+        session.state.update(missed)
+        return event
@@ -0,0 +1,276 @@
+import asyncio
+import statistics
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Optional
+
+from google.adk.agents.run_config import RunConfig
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.genai.types import Content, Part
+from pydantic import BaseModel, Field
+
+# Options for consuming SSE streams (RunConfig(streaming_mode=StreamingMode.SSE), as in
+# chapter10/streaming_agent.py). With SSE the model yields one partial event per few
+# tokens, and a gateway that serializes and sends every one of them spends most of its
+# CPU on framing. StreamingRunner can:
+#
+#   * coalesce consecutive partial text events into larger chunks, flushed when they
+#     reach `coalesce_bytes` or when the oldest buffered text is `coalesce_ms` old;
+#   * let the agent run ahead of the consumer by at most `max_buffered_events`, so a
+#     slow consumer blocks the producer (backpressure) instead of growing memory;
+#   * record time to first token and the gaps between chunks for every invocation.
+#
+#   run_config = ExtendedRunConfig(
+#       streaming_mode=StreamingMode.SSE,
+#       streaming=StreamingOptions(coalesce_bytes=256, coalesce_ms=50),
+#   )
+#   async for event in runner.run_async(..., run_config=run_config): ...
+#   print(runner.latest_stream_metrics(session_id).to_record())
+#
+# Final (non-partial) events are never merged or altered, so what is stored in the
+# session is the same with or without these options.
+
+
+class StreamingOptions(BaseModel):
+    """How partial events are buffered and coalesced before reaching the consumer."""
+    # Flush coalesced text once it reaches this many bytes; 0 disables size-based flushing.
+    coalesce_bytes: int = Field(default=0, ge=0)
+    # Flush coalesced text once the oldest chunk is this old; 0 disables time-based flushing.
+    coalesce_ms: float = Field(default=0.0, ge=0)
+    # Send the first chunk as soon as it arrives, so coalescing does not delay TTFT.
+    flush_first_chunk: bool = True
+    # Events the agent may run ahead of the consumer before it blocks. With 0 it runs in
+    # lockstep: the next event is only produced when the consumer asks for it, and the
+    # time window is checked as chunks arrive rather than by a timer.
+    max_buffered_events: int = Field(default=0, ge=0)
+
+
+@dataclass
+class StreamMetrics:
+    session_id: str
+    invocation_id: Optional[str] = None
+    ttft_ms: Optional[float] = None
+    total_ms: float = 0.0
+    events_in: int = 0
+    events_out: int = 0
+    partial_events_in: int = 0
+    partial_events_out: int = 0
+    text_bytes: int = 0
+    producer_blocked_ms: float = 0.0
+    gaps_ms: list[float] = field(default_factory=list, repr=False)
+
+    def to_record(self) -> dict[str, Any]:
+        gaps = sorted(self.gaps_ms)
+        return {
+            "session_id": self.session_id,
+            "invocation_id": self.invocation_id,
+            "ttft_ms": round(self.ttft_ms, 2) if self.ttft_ms is not None else None,
+            "total_ms": round(self.total_ms, 2),
+            "events_in": self.events_in,
+            "events_out": self.events_out,
+            "partial_events_in": self.partial_events_in,
+            "partial_events_out": self.partial_events_out,
+            "text_bytes": self.text_bytes,
+            "producer_blocked_ms": round(self.producer_blocked_ms, 2),
+            "gap_ms_p50": round(statistics.median(gaps), 2) if gaps else None,
+            "gap_ms_p95": round(gaps[int(0.95 * (len(gaps) - 1))], 2) if gaps else None,
+            "gap_ms_max": round(gaps[-1], 2) if gaps else None,
+        }
+
+
+_STREAM_END = object()
+
+
+class _StreamFailure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _partial_text(event: Event) -> Optional[str]:
+    """The text of a partial event made only of text parts, else None."""
+    if not event.partial or not event.content or not event.content.parts:
+        return None
+    if any(p.text is None or p.function_call or p.function_response for p in event.content.parts):
+        return None
+    return "".join(p.text for p in event.content.parts)
+
+
+def _merge(events: list[Event], texts: list[str]) -> Event:
+    if len(events) == 1:
+        return events[0]
+    last = events[-1]
+    return last.model_copy(update={"content": Content(role=last.content.role, parts=[Part(text="".join(texts))])})
+
+
+class StreamingRunner(Runner):
+    """Runner that applies ExtendedRunConfig.streaming options to run_async."""
+
+    def __init__(self, *, max_metrics: int = 10_000, **kwargs):
+        super().__init__(**kwargs)
+        self.max_metrics = max_metrics
+        self._metrics: "OrderedDict[int, StreamMetrics]" = OrderedDict()
+        self._next_stream = 0
+
+    def get_stream_metrics(self, invocation_id: str) -> Optional[StreamMetrics]:
+        for metrics in reversed(self._metrics.values()):
+            if metrics.invocation_id == invocation_id:
+                return metrics
+        return None
+
+    def latest_stream_metrics(self, session_id: str) -> Optional[StreamMetrics]:
+        for metrics in reversed(self._metrics.values()):
+            if metrics.session_id == session_id:
+                return metrics
+        return None
+
+    async def run_async(
+        self,
+        *,
+        user_id: str,
+        session_id: str,
+        new_message: Content,
+        run_config: RunConfig = RunConfig(),
+    ) -> AsyncGenerator[Event, None]:
+        options: Optional[StreamingOptions] = getattr(run_config, "streaming", None)
+        events = super().run_async(
+            user_id=user_id, session_id=session_id, new_message=new_message, run_config=run_config
+        )
+        if options is None:
+            async for event in events:
+                yield event
+            return
+
+        metrics = StreamMetrics(session_id=session_id)
+        self._metrics[self._next_stream] = metrics
+        self._next_stream += 1
+        while len(self._metrics) > self.max_metrics:
+            self._metrics.popitem(last=False)
+
+        start = time.perf_counter()
+        lockstep = options.max_buffered_events == 0
+        queue: asyncio.Queue = asyncio.Queue(maxsize=options.max_buffered_events)
+
+        async def _produce():
+            end = _STREAM_END
+            try:
+                async for event in events:
+                    metrics.events_in += 1
+                    metrics.partial_events_in += bool(event.partial)
+                    if queue.full():
+                        blocked_since = time.perf_counter()
+                        await queue.put(event)
+                        metrics.producer_blocked_ms += (time.perf_counter() - blocked_since) * 1000
+                    else:
+                        queue.put_nowait(event)
+            except Exception as e:
+                end = _StreamFailure(e)
+            finally:
+                await events.aclose()
+            # Not reached when the consumer closed the stream early and cancelled us: nobody
+            # drains the queue any more, so a put could block forever.
+            await queue.put(end)
+
+        last_yield: Optional[float] = None
+
+        def _record(event: Event):
+            nonlocal last_yield
+            now = time.perf_counter()
+            metrics.invocation_id = metrics.invocation_id or event.invocation_id
+            metrics.events_out += 1
+            metrics.partial_events_out += bool(event.partial)
+            if event.content and any(p.text for p in event.content.parts or []):
+                if metrics.ttft_ms is None:
+                    metrics.ttft_ms = (now - start) * 1000
+                elif event.partial and last_yield is not None:
+                    metrics.gaps_ms.append((now - last_yield) * 1000)
+                if event.partial:
+                    last_yield = now
+
+        pending: list[Event] = []
+        pending_texts: list[str] = []
+        pending_bytes = 0
+        pending_since = 0.0
+        coalescing = options.coalesce_bytes > 0 or options.coalesce_ms > 0
+
+        def _buffer(event: Event, text: str):
+            nonlocal pending_bytes, pending_since
+            if not pending:
+                pending_since = time.perf_counter()
+            pending.append(event)
+            pending_texts.append(text)
+            pending_bytes += len(text.encode("utf-8"))
+
+        def _flush() -> Event:
+            nonlocal pending_bytes
+            merged = _merge(pending, pending_texts)
+            pending.clear()
+            pending_texts.clear()
+            pending_bytes = 0
+            _record(merged)
+            return merged
+
+        producer = None if lockstep else asyncio.create_task(_produce())
+        getter: Optional[asyncio.Task] = None
+        window = options.coalesce_ms / 1000
+        try:
+            while True:
+                if pending and window and time.perf_counter() - pending_since >= window:
+                    yield _flush()
+                if lockstep:
+                    try:
+                        item = await events.__anext__()
+                        metrics.events_in += 1
+                        metrics.partial_events_in += bool(item.partial)
+                    except StopAsyncIteration:
+                        item = _STREAM_END
+                elif getter is None and not queue.empty():
+                    item = queue.get_nowait()
+                else:
+                    if getter is None:
+                        getter = asyncio.ensure_future(queue.get())
+                    timeout = None
+                    if pending and window:
+                        timeout = max(0.0, pending_since + window - time.perf_counter())
+                    # The getter survives a timeout, so no event is lost while flushing.
+                    done, _ = await asyncio.wait({getter}, timeout=timeout)
+                    if not done:
+                        yield _flush()
+                        continue
+                    item = getter.result()
+                    getter = None
+
+                if item is _STREAM_END:
+                    if pending:
+                        yield _flush()
+                    break
+                if isinstance(item, _StreamFailure):
+                    raise item.error
+
+                text = _partial_text(item)
+                if text is not None:
+                    metrics.text_bytes += len(text.encode("utf-8"))
+                if coalescing and text is not None:
+                    # Chunks from different authors are never merged.
+                    if pending and pending[-1].author != item.author:
+                        yield _flush()
+                    _buffer(item, text)
+                    first_chunk = options.flush_first_chunk and metrics.partial_events_out == 0
+                    if first_chunk or (options.coalesce_bytes and pending_bytes >= options.coalesce_bytes):
+                        yield _flush()
+                    continue
+
+                if pending:
+                    yield _flush()
+                _record(item)
+                yield item
+        finally:
+            metrics.total_ms = (time.perf_counter() - start) * 1000
+            if getter is not None:
+                getter.cancel()
+            if producer is not None:
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+            else:
+                await events.aclose()
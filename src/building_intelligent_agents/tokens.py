@@ -0,0 +1,34 @@
+import json
+
+from google.adk.models.llm_request import LlmRequest
+
+# Rough token counts for text and model requests, for when the model's own count is
+# not available: FakeLlm reports them as usage, and HistoryCompactor measures how much
+# it saved with them.
+#
+#   tokens = estimate_request_tokens(llm_request)
+#
+# Roughly four characters per token, which is close enough for load modelling and for
+# comparing a request before and after it was trimmed. It is not a tokenizer.
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimated tokens in `text`; at least one for non-empty text."""
+    return max(1, len(text) // 4) if text else 0
+
+
+def estimate_request_tokens(llm_request: LlmRequest) -> int:
+    """Estimated prompt tokens of a request: its system instruction, texts, function calls
+    and function responses."""
+    total = 0
+    if llm_request.config and isinstance(llm_request.config.system_instruction, str):
+        total += estimate_tokens(llm_request.config.system_instruction)
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.text:
+                total += estimate_tokens(part.text)
+            elif part.function_call:
+                total += estimate_tokens(json.dumps(part.function_call.args or {}, default=str))
+            elif part.function_response:
+                total += estimate_tokens(json.dumps(part.function_response.response or {}, default=str))
+    return total
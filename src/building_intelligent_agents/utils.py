@@ -1,15 +1,47 @@
 import os
+import asyncio
+import concurrent.futures
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, Awaitable, Generator, Iterable, Optional, TypeVar
+
 from dotenv import load_dotenv
-from google.adk.runners import InMemoryRunner
+from google.adk.events import Event
+from google.adk.models.registry import LLMRegistry
+from google.adk.runners import InMemoryRunner, RunConfig, Runner
+from google.adk.sessions import Session
+from google.genai.types import Content
+
+from building_intelligent_agents.fake_llm import FakeLlm
+
+# Both defaults can be overridden from the environment, e.g. DEFAULT_LLM=fake selects
+# the offline FakeLlm for load testing and profiling without network access.
+DEFAULT_LLM=os.getenv("DEFAULT_LLM", "gemini-2.0-flash")#"gemini-2.5-flash-preview-05-20"
+DEFAULT_REASONING_LLM=os.getenv("DEFAULT_REASONING_LLM", "gemini-2.5-flash-preview-05-20")
+
+# Register the offline model so "fake" / "fake-*" model names resolve through the LLMRegistry.
+LLMRegistry.register(FakeLlm)
 
-DEFAULT_LLM="gemini-2.0-flash"#"gemini-2.5-flash-preview-05-20"
-DEFAULT_REASONING_LLM="gemini-2.5-flash-preview-05-20"
+_environment_loaded = False
+_environment_lock = threading.Lock()
 
-def load_environment_variables():
+def load_environment_variables(force: bool = False):
     """
     Load environment variables from a .env file located in the project root directory.
     Assumes utils.py is in src/your_package_name/
+
+    Every chapter module calls this at import, so the file is only read once per
+    process; pass `force=True` to read it again.
     """
+    global _environment_loaded
+    with _environment_lock:
+        if _environment_loaded and not force:
+            return
+        _environment_loaded = True
+        _load_dotenv_file()
+
+def _load_dotenv_file():
     # Get the directory of the current script (utils.py)
     # e.g., /path/to/project/src/building_intelligent_agents
     current_script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -52,4 +84,216 @@ def create_session(runner: InMemoryRunner, session_id: str, user_id: str, state=
         print("Session created successfully.")
     except Exception as e:
         print(f"Error creating session: {e}")
-        exit()
\ No newline at end of file
+        exit()
+
+
+# --- Bulk session provisioning ---
+
+@dataclass
+class SessionSpec:
+    """Describes one session to be created by `create_sessions_bulk`."""
+    user_id: str
+    session_id: Optional[str] = None
+    state: Optional[dict[str, Any]] = None
+
+
+@dataclass
+class SessionCreationResult:
+    """The outcome of creating a single session: either `session` or `error` is set."""
+    spec: SessionSpec
+    session: Optional[Session] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def create_sessions_bulk(
+    runner: Runner,
+    specs: Iterable[SessionSpec],
+    max_concurrency: int = 64,
+) -> list[SessionCreationResult]:
+    """
+    Create many sessions on the caller's event loop with bounded concurrency.
+
+    Unlike `create_session`, this never starts its own event loop and never exits the
+    process: failures are reported per session in the returned list, which preserves
+    the order of `specs`.
+
+    :param runner: The Runner whose session service and app name are used.
+    :param specs: The sessions to create.
+    :param max_concurrency: The maximum number of in-flight `create_session` calls.
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1.")
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _create_one(spec: SessionSpec) -> SessionCreationResult:
+        async with semaphore:
+            try:
+                session = await runner.session_service.create_session(
+                    app_name=runner.app_name,
+                    user_id=spec.user_id,
+                    session_id=spec.session_id,
+                    state=spec.state or {},
+                )
+                return SessionCreationResult(spec=spec, session=session)
+            except Exception as e:
+                return SessionCreationResult(spec=spec, error=e)
+
+    return await asyncio.gather(*(_create_one(spec) for spec in specs))
+
+
+def create_sessions_bulk_sync(
+    runner: Runner,
+    specs: Iterable[SessionSpec],
+    max_concurrency: int = 64,
+) -> list[SessionCreationResult]:
+    """
+    Synchronous shim around `create_sessions_bulk` for the chapter scripts.
+
+    The whole batch shares a single event loop instead of one loop per session.
+    """
+    return asyncio.run(create_sessions_bulk(runner, specs, max_concurrency=max_concurrency))
+
+
+# --- Persistent event-loop host for synchronous callers ---
+
+T = TypeVar("T")
+
+_STREAM_END = object()
+
+
+class AgentHost:
+    """
+    Runs a single long-lived asyncio event loop on a background thread and lets
+    synchronous code (from any number of threads) drive `Runner.run_async` on it.
+
+    `Runner.run` starts a new thread and a new event loop for every call. The host
+    starts one loop per process and reuses it, so repeated sync calls only pay for a
+    thread-safe hand-off. Events are streamed back through a bounded buffer: when a
+    caller stops consuming, the agent run on the loop waits instead of buffering
+    without limit.
+    """
+
+    def __init__(self, max_buffered_events: int = 64, name: str = "adk-agent-host"):
+        if max_buffered_events < 1:
+            raise ValueError("max_buffered_events must be at least 1.")
+        self.max_buffered_events = max_buffered_events
+        self._loop = asyncio.new_event_loop()
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, name=name, daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.call_soon(self._started.set)
+        self._loop.run_forever()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread.is_alive() and not self._loop.is_closed()
+
+    def submit(self, coro: Awaitable[T]) -> "concurrent.futures.Future[T]":
+        """Schedule a coroutine on the host loop and return a thread-safe future."""
+        if not self.is_running:
+            raise RuntimeError("AgentHost has been shut down.")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def call(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Run a coroutine on the host loop and block until its result is available."""
+        return self.submit(coro).result(timeout)
+
+    def run(
+        self,
+        runner: Runner,
+        *,
+        user_id: str,
+        session_id: str,
+        new_message: Content,
+        run_config: Optional[RunConfig] = None,
+    ) -> Generator[Event, None, None]:
+        """
+        Synchronous drop-in for `runner.run(...)` that executes on the shared loop.
+
+        :param runner: The Runner to drive.
+        :param user_id: The user ID of the session.
+        :param session_id: The session ID of the session.
+        :param new_message: The new message to append to the session.
+        :param run_config: The run config for the agent.
+        """
+        events: queue.SimpleQueue = queue.SimpleQueue()
+        # Created on the host loop; released by the consumer thread for every event it takes.
+        slots: list[asyncio.Semaphore] = []
+
+        async def _produce():
+            slots.append(asyncio.Semaphore(self.max_buffered_events))
+            try:
+                async for event in runner.run_async(
+                    user_id=user_id,
+                    session_id=session_id,
+                    new_message=new_message,
+                    run_config=run_config or RunConfig(),
+                ):
+                    await slots[0].acquire()
+                    events.put(event)
+            except BaseException as e:
+                events.put(e)
+                raise
+            finally:
+                events.put(_STREAM_END)
+
+        future = self.submit(_produce())
+        try:
+            while True:
+                item = events.get()
+                if item is _STREAM_END:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                self._loop.call_soon_threadsafe(slots[0].release)
+                yield item
+        finally:
+            # The caller stopped iterating early (or hit an error): stop the agent run.
+            if not future.done():
+                future.cancel()
+
+    def shutdown(self, timeout: Optional[float] = 5.0):
+        """Cancel outstanding work, stop the loop and join the loop thread."""
+        if not self.is_running:
+            return
+
+        async def _cancel_pending():
+            current = asyncio.current_task()
+            pending = [t for t in asyncio.all_tasks() if t is not current]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        try:
+            self.call(_cancel_pending(), timeout=timeout)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout)
+            if not self._thread.is_alive():
+                self._loop.close()
+
+
+_agent_host: Optional[AgentHost] = None
+_agent_host_lock = threading.Lock()
+
+
+def get_agent_host() -> AgentHost:
+    """Return the process-wide AgentHost, starting it on first use."""
+    global _agent_host
+    with _agent_host_lock:
+        if _agent_host is None or not _agent_host.is_running:
+            _agent_host = AgentHost()
+        return _agent_host